@@ -1,5 +1,22 @@
-from lnlp.services.downloaders import download_sentence_transformer
-from lnlp.services.downloaders import download_spacy_model
-from lnlp.services.pdf import PDFTextExtractor
-from lnlp.services.provider import LLMProvider
-from lnlp.services.splitters import TextSplitterSimilarity, TextSplitterSpacy
+import importlib
+
+# exported lazily so importing one submodule, such as lnlp.services.pdf in a
+# PDF parsing worker, does not load torch and the models behind the splitters
+_EXPORTS = {
+    'download_sentence_transformer': 'lnlp.services.downloaders',
+    'download_spacy_model': 'lnlp.services.downloaders',
+    'PDFTextExtractor': 'lnlp.services.pdf',
+    'LLMProvider': 'lnlp.services.provider',
+    'TextSplitterSimilarity': 'lnlp.services.splitters',
+    'TextSplitterSpacy': 'lnlp.services.splitters',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -1,32 +1,86 @@
+import asyncio
 import logging
 import signal
 import sys
 import time
 
 import torch
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
+from lnlp.api.deps import get_provider
 from lnlp.api.endpoints import chat, extract, split
-from lnlp.services.provider import LLMProvider
+from lnlp.config import get_settings
+from lnlp.services.pdf import shutdown_process_pool
 from lnlp.services.splitters import SplitterManager
+from lnlp.utils.aggregation import create_metrics_store
 from lnlp.utils.dashboard import dashboard_service
 from lnlp.utils.metrics import metrics_service
+from lnlp.utils.openmetrics import CONTENT_TYPE, render_openmetrics, runtime_state
+from lnlp.utils.timing import collect_stages, server_timing, set_enabled
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
 
 logger = logging.getLogger(__name__)
 
+# label for requests that match no route, so scanners cannot grow the endpoint table
+UNMATCHED_ROUTE = '<unmatched>'
 
-class MetricsMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        response = await call_next(request)
-        duration = time.time() - start_time
 
-        metrics_service.track_request(path=request.url.path, method=request.method, duration=duration)
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency and body sizes per route template.
 
-        return response
+    Unlike BaseHTTPMiddleware it adds no task or memory stream per request and
+    leaves streaming responses untouched; it only wraps receive and send to
+    count bytes. Requests are labelled with the matched route's template
+    (e.g. "/chat/{provider}") so path parameters do not create new series.
+
+    Stage timings from `lnlp.utils.timing` spans are summed per request and
+    recorded once; a request sent with an `X-Stage-Timing` header also gets
+    them back in a `Server-Timing` response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        request_bytes = response_bytes = 0
+        status = 500
+        stages = None
+        want_timing = any(name == b'x-stage-timing' for name, _ in scope.get('headers', ()))
+
+        async def counting_receive():
+            nonlocal request_bytes
+            message = await receive()
+            request_bytes += len(message.get('body', b''))
+            return message
+
+        async def counting_send(message):
+            nonlocal response_bytes, status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                if want_timing and stages:
+                    headers = [*message.get('headers', []), (b'server-timing', server_timing(stages).encode())]
+                    message = {**message, 'headers': headers}
+            elif message['type'] == 'http.response.body':
+                response_bytes += len(message.get('body', b''))
+            await send(message)
+
+        metrics_service.adjust_gauge('http_requests_in_flight', 1)
+        start = time.perf_counter_ns()
+        try:
+            with collect_stages() as stages:
+                await self.app(scope, counting_receive, counting_send)
+        finally:
+            metrics_service.adjust_gauge('http_requests_in_flight', -1)
+            route = getattr(scope.get('route'), 'path', None) or UNMATCHED_ROUTE
+            metrics_service.track_request(
+                path=route, method=scope['method'], duration=(time.perf_counter_ns() - start) / 1e9,
+                request_bytes=request_bytes, response_bytes=response_bytes, status=status
+            )
 
 
 app = FastAPI(
@@ -58,6 +112,17 @@ async def startup_event():
     """Initialize resources on startup"""
     logger.info('Application startup')
 
+    # Share metrics with the other workers and sample at a fixed interval, independent of dashboard views
+    settings = get_settings()
+    set_enabled(settings.stage_timing)
+    try:
+        store = create_metrics_store(settings)
+        if store is not None:
+            metrics_service.share(store)
+    except Exception as e:
+        logger.warning(f'Could not share metrics across workers: {e}')
+    metrics_service.start_sampler(settings.metrics_sample_interval)
+
     # Initialize services
     app.state.splitter_manager = SplitterManager()
     try:
@@ -66,8 +131,15 @@ async def startup_event():
         app.state.splitter_manager.get_spacy_splitter()
         app.state.splitter_manager.get_similarity_splitter()
         logger.info('Models verified successfully')
-        # Initialize provider
-        app.state.provider = LLMProvider()
+        # Initialize provider shared with the endpoint dependency
+        app.state.provider = get_provider()
+        if app.state.provider.openrouter_key:
+            try:
+                # warm the shared model catalogue so no request waits on resolution
+                await app.state.provider._fetch_openrouter_models()
+            except Exception as e:
+                logger.warning(f'Could not prefetch OpenRouter models: {e}')
+            app.state.catalogue_refresh = asyncio.create_task(app.state.provider.refresh_models_forever())
     except Exception as e:
         logger.error(f'Error during startup: {e}')
         app.state.provider = None
@@ -88,13 +160,23 @@ async def shutdown_event():
 
         # Clean up model resources
         if hasattr(app.state, 'splitter_manager'):
-            # Clear any loaded models
-            app.state.splitter_manager._spacy_splitter = None
-            app.state.splitter_manager._similarity_splitter = None
+            # Clear any loaded models and stop encode batching
+            app.state.splitter_manager.shutdown()
             logger.info('Cleared splitter models')
 
+        # Stop the system metrics sampler
+        metrics_service.stop_sampler()
+
+        # Stop PDF extraction worker processes
+        shutdown_process_pool()
+
+        # Stop background model catalogue refresh
+        if getattr(app.state, 'catalogue_refresh', None) is not None:
+            app.state.catalogue_refresh.cancel()
+
         # Clean up provider resources
-        if hasattr(app.state, 'provider'):
+        if getattr(app.state, 'provider', None) is not None:
+            await app.state.provider.aclose()
             app.state.provider = None
             logger.info('Cleared provider instance')
 
@@ -107,7 +189,8 @@ async def shutdown_event():
 async def http_exception_handler(request, exc):
     return JSONResponse(
         status_code=exc.status_code,
-        content={'detail': str(exc.detail)}
+        content={'detail': str(exc.detail)},
+        headers=getattr(exc, 'headers', None)
     )
 
 
@@ -128,13 +211,19 @@ async def general_exception_handler(request, exc):
 
 
 @app.get('/', response_class=HTMLResponse)
-def dashboard():
+def dashboard(resolution: str | None = None):
     """Get system dashboard with health and metrics.
+
+    `resolution` charts a downsampled system history such as 10s or 60s
+    instead of the raw samples.
     """
     from lnlp.utils.templates import render_dashboard
 
     dashboard_data = dashboard_service.get_dashboard_data(app)
-    metrics_data = metrics_service.get_metrics()
+    try:
+        metrics_data = metrics_service.get_metrics(resolution)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return render_dashboard(dashboard_data, metrics_data)
 
 
@@ -143,3 +232,17 @@ def health_check():
     """Simple health check for AWS load balancer.
     """
     return {'status': 'ok'}
+
+
+@app.get('/metrics')
+async def openmetrics():
+    """Metrics in OpenMetrics text format for Prometheus scraping.
+
+    Rendered from a copy of the counters, summed over every worker when
+    metrics are shared, without sampling the system history the dashboard
+    shows.
+    """
+    runtime = runtime_state(getattr(app.state, 'splitter_manager', None))
+    # reading other workers' snapshots may touch the disk or Redis
+    snapshot, workers = await asyncio.to_thread(metrics_service.aggregate)
+    return Response(render_openmetrics(snapshot, runtime, workers), media_type=CONTENT_TYPE)
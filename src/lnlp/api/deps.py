@@ -1,8 +1,11 @@
 from functools import lru_cache
 
 from fastapi import HTTPException
+from lnlp.config import get_settings
+from lnlp.services.mapreduce import MapReducePipeline
 from lnlp.services.pdf import PDFTextExtractor
 from lnlp.services.provider import LLMProvider
+from lnlp.services.response_cache import MemoryCacheBackend, ResponseCache
 from lnlp.services.splitters import SplitterManager
 
 
@@ -21,6 +24,24 @@ def get_splitter_manager():
     return SplitterManager()
 
 
+@lru_cache
+def get_mapreduce_pipeline():
+    """Dependency to get the long-document map-reduce pipeline"""
+    settings = get_settings()
+    return MapReducePipeline(
+        get_provider(),
+        get_splitter_manager(),
+        chunk_tokens=settings.mapreduce_chunk_tokens,
+        max_concurrency=settings.mapreduce_max_concurrency,
+        cache=ResponseCache(MemoryCacheBackend(max_entries=settings.mapreduce_cache_entries), name='mapreduce')
+    )
+
+
 def get_pdf_extractor(pdf_input: bytes | str):
     """Dependency to get PDF extractor instance"""
-    return PDFTextExtractor(pdf_input)
+    settings = get_settings()
+    return PDFTextExtractor(
+        pdf_input,
+        workers=settings.pdf_workers,
+        parallel_min_pages=settings.pdf_parallel_min_pages
+    )
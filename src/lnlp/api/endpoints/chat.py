@@ -1,9 +1,17 @@
+import json
 import logging
+import math
 
-from fastapi import APIRouter, Depends, HTTPException
-from lnlp.api.deps import get_provider
-from lnlp.schemas.chat import ModelInfo, ProviderRequest, ProviderResponse
+import openai
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from lnlp.api.deps import get_mapreduce_pipeline, get_provider
+from lnlp.config import get_settings
+from lnlp.schemas.chat import BatchRequest, MapReduceRequest, MapReduceResponse, ModelInfo
+from lnlp.schemas.chat import ProviderRequest, ProviderResponse
+from lnlp.services.mapreduce import MapReduceError, MapReducePipeline
 from lnlp.services.provider import LLMProvider
+from lnlp.services.ratelimit import RateLimitExceeded
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -18,7 +26,12 @@ async def query(
 
     The API automatically sets optimal parameters based on the model:
     - Temperature: 0.1 (fixed for consistency)
-    - Max tokens: Model's context_length (override with max_tokens parameter)
+    - Max tokens: context left after the prompt, capped at the model's completion
+      limit (a smaller max_tokens parameter is kept as is)
+
+    When the response cache is enabled, identical requests are answered from
+    the cache; set bypass_cache to force a fresh completion or cache_ttl to
+    override how long this response is kept.
 
     Example request:
         ```python
@@ -37,6 +50,8 @@ async def query(
 
     try:
         return await provider.query(request)
+    except RateLimitExceeded as e:
+        raise _rate_limited(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -44,18 +59,178 @@ async def query(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _rate_limited(e: RateLimitExceeded) -> HTTPException:
+    """Translate a limiter rejection into a 429/503 with Retry-After"""
+    logger.warning(f'Chat request rejected by rate limiter: {e}')
+    return HTTPException(status_code=e.status_code, detail=str(e),
+                         headers={'Retry-After': str(math.ceil(e.retry_after))})
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Event"""
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+@router.post('/chat/stream', tags=['ai'])
+async def stream(
+    request: ProviderRequest,
+    http_request: Request,
+    provider: LLMProvider = Depends(get_provider)
+):
+    """Streaming variant of /chat/query that relays tokens as Server-Sent Events.
+
+    Emits `delta` events with content fragments as OpenRouter produces them,
+    then a `done` event with id, model, finish_reason and usage. Upstream
+    failures after the stream has started are sent as an `error` event. If
+    the client disconnects the upstream request is aborted.
+    """
+    logger.info(f'Chat stream request - Model: {request.model}, Messages: {len(request.messages)}, '
+                f'max_tokens: {request.max_tokens or "auto"}')
+
+    try:
+        events = provider.stream(request)
+        first = await anext(events)
+    except StopAsyncIteration:
+        first = None
+    except RateLimitExceeded as e:
+        raise _rate_limited(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f'Chat stream error: {e}')
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def relay():
+        try:
+            if first is not None:
+                yield _sse(first.pop('event'), first)
+            async for event in events:
+                if await http_request.is_disconnected():
+                    logger.info('Client disconnected, aborting chat stream')
+                    break
+                yield _sse(event.pop('event'), event)
+        except Exception as e:
+            logger.error(f'Chat stream error: {e}')
+            yield _sse('error', {'detail': str(e)})
+        finally:
+            await events.aclose()
+
+    return StreamingResponse(
+        relay(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+def _batch_item(index: int, result: ProviderResponse | Exception) -> str:
+    """Format one /chat/batch result as an NDJSON line"""
+    if isinstance(result, ProviderResponse):
+        return json.dumps({'index': index, 'response': result.model_dump()}) + '\n'
+
+    error = {'status_code': 500, 'detail': str(result)}
+    if isinstance(result, RateLimitExceeded):
+        error.update(status_code=result.status_code, retry_after=math.ceil(result.retry_after))
+    elif isinstance(result, ValueError):
+        error['status_code'] = 400
+    elif isinstance(result, openai.APIStatusError):
+        error['status_code'] = result.status_code
+    else:
+        logger.error(f'Chat batch item {index} error: {result}')
+    return json.dumps({'index': index, 'error': error}) + '\n'
+
+
+@router.post('/chat/batch', tags=['ai'])
+async def batch(
+    request: BatchRequest,
+    http_request: Request,
+    provider: LLMProvider = Depends(get_provider)
+):
+    """Run many independent chat queries in one call, streamed back as NDJSON.
+
+    Requests are fanned out server-side with at most `max_concurrency`
+    (capped by CHAT_BATCH_MAX_CONCURRENCY) in flight. Each line is
+    `{"index": i, "response": {...}}` or `{"index": i, "error": {...}}` for
+    request i, written as soon as it completes, so one failure does not
+    affect the rest of the batch.
+    """
+    settings = get_settings()
+    if not request.requests:
+        raise HTTPException(status_code=400, detail='Batch contains no requests')
+    if len(request.requests) > settings.chat_batch_max_items:
+        raise HTTPException(status_code=400,
+                            detail=f'Batch of {len(request.requests)} exceeds the limit of {settings.chat_batch_max_items}')
+
+    max_concurrency = min(request.max_concurrency or settings.chat_batch_max_concurrency,
+                          settings.chat_batch_max_concurrency)
+    logger.info(f'Chat batch request - Requests: {len(request.requests)}, Concurrency: {max_concurrency}')
+
+    async def relay():
+        results = provider.query_batch(request.requests, max(max_concurrency, 1))
+        try:
+            async for index, result in results:
+                if await http_request.is_disconnected():
+                    logger.info('Client disconnected, cancelling chat batch')
+                    break
+                yield _batch_item(index, result)
+        finally:
+            await results.aclose()
+
+    return StreamingResponse(relay(), media_type='application/x-ndjson')
+
+
+@router.post('/chat/mapreduce', response_model=MapReduceResponse, tags=['ai'])
+async def mapreduce(
+    request: MapReduceRequest,
+    pipeline: MapReducePipeline = Depends(get_mapreduce_pipeline)
+):
+    """Answer a prompt over a document longer than the model's context.
+
+    The text is split into chunks of up to `chunk_tokens` tokens (spaCy
+    sentences, or similarity sections re-split when oversized), `map_prompt`
+    runs over each chunk concurrently and `reduce_prompt` combines the
+    partial answers hierarchically until one remains. `max_tokens` bounds
+    every map and reduce completion.
+
+    If some calls fail the request returns 502; finished chunks are cached,
+    so retrying the same request only reruns the failed ones.
+    """
+    logger.info(f'Chat map-reduce request - Model: {request.model}, Text length: {len(request.text):,} chars, '
+                f'Splitter: {request.splitter}')
+
+    try:
+        result = await pipeline.run(
+            request.text,
+            request.model,
+            request.map_prompt,
+            request.reduce_prompt,
+            max_tokens=request.max_tokens,
+            chunk_tokens=request.chunk_tokens,
+            max_concurrency=request.max_concurrency,
+            splitter=request.splitter
+        )
+    except MapReduceError as e:
+        logger.error(f'Chat map-reduce error: {e}')
+        raise HTTPException(status_code=502, detail=str(e))
+    except RateLimitExceeded as e:
+        raise _rate_limited(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f'Chat map-reduce error: {e}')
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return MapReduceResponse(
+        model=result.model,
+        content=result.content,
+        chunks=result.chunks,
+        levels=result.levels,
+        usage=result.usage
+    )
+
+
 @router.get('/models', response_model=list[ModelInfo], tags=['ai'])
 async def list_available_models(
     provider: LLMProvider = Depends(get_provider)
 ):
     """List available models with context lengths"""
-    available_models = await provider.get_available_models()
-    return [
-        ModelInfo(
-            name=model_name,
-            provider=model_name.split('/')[0] if '/' in model_name else 'openai',
-            context_length=context_length,
-            features=['chat']
-        )
-        for model_name, context_length in available_models
-    ]
+    return await provider.get_model_listing()
@@ -33,7 +33,10 @@ async def extract_ticker(
     request: TickerRequest,
     provider: LLMProvider = Depends(get_provider)
 ):
-    """Extract company ticker symbol from text using LLM.
+    """Extract company ticker symbol from text.
+
+    Explicit exchange listings in the header and previously resolved
+    companies are answered locally; otherwise one LLM call is made.
 
     Example request:
         ```python
@@ -4,10 +4,52 @@ All LLM requests are routed through OpenRouter.
 
 Optional environment variables:
 - OPENROUTER_API_KEY: OpenRouter API key (required for LLM features)
+- OPENROUTER_BASE_URL: OpenRouter API base URL
 - OPENROUTER_REFERER: OpenRouter referer URL
 - OPENROUTER_TITLE: OpenRouter app title
+- OPENROUTER_MAX_CONNECTIONS: Pooled connections kept to OpenRouter per event loop
+- OPENROUTER_KEEPALIVE_EXPIRY: Seconds an idle pooled connection is kept open
+- OPENROUTER_TIMEOUT: Overall request timeout in seconds
+- OPENROUTER_CONNECT_TIMEOUT: Connection establishment timeout in seconds
+- RESPONSE_CACHE_BACKEND: Chat response cache backend: none, memory or redis
+- RESPONSE_CACHE_TTL: Seconds a cached chat response stays valid
+- RESPONSE_CACHE_MAX_ENTRIES: Entry limit for the in-memory response cache
+- REDIS_URL: Redis connection URL for the redis response cache backend
+- LLM_MAX_CONCURRENCY: In-flight OpenRouter requests allowed per model family
+- LLM_TOKENS_PER_MINUTE: Estimated prompt tokens per minute per model family (0 disables)
+- LLM_MAX_QUEUE: Requests allowed to wait per model family before rejecting with 429
+- LLM_MAX_QUEUE_WAIT: Seconds a request may wait for a slot or token budget before 503
+- LLM_LIMITS: JSON per-family overrides, e.g. {"opus": {"max_concurrency": 4}}
+- LLM_MAX_ATTEMPTS: Attempts per OpenRouter call before a transient failure is returned
+- LLM_RETRY_BASE_DELAY: Base of the jittered exponential retry backoff in seconds
+- LLM_RETRY_MAX_DELAY: Cap on a single retry backoff in seconds
+- LLM_REQUEST_DEADLINE: Seconds an OpenRouter call may take across all attempts
+- LLM_HEDGE: Send a duplicate request once a call runs past the model's p95 latency (true/false)
+- LLM_HEDGE_MIN_DELAY: Minimum seconds to wait before hedging
+- LLM_CIRCUIT_FAILURES: Consecutive transient failures that open a model's circuit
+- LLM_CIRCUIT_RESET: Seconds an open circuit fails fast before probing again
+- CHAT_BATCH_MAX_CONCURRENCY: Requests from one /chat/batch call run concurrently
+- CHAT_BATCH_MAX_ITEMS: Largest number of requests accepted in one /chat/batch call
+- MAPREDUCE_CHUNK_TOKENS: Default token budget for /chat/mapreduce chunks and reduce groups
+- MAPREDUCE_MAX_CONCURRENCY: Map or reduce calls from one /chat/mapreduce run in flight at once
+- MAPREDUCE_CACHE_ENTRIES: Partial map-reduce results kept so retries skip finished chunks
+- TICKER_CACHE_DISK: Persist resolved tickers under ~/.cache/libb-nlp/tickers.json (true/false)
+- MODEL_CATALOGUE_TTL: Seconds before the OpenRouter model catalogue is refreshed
+- PDF_WORKERS: Worker processes for page-parallel PDF parsing (0 disables)
+- PDF_PARALLEL_MIN_PAGES: Page count below which PDF parsing stays in-process
+- ENCODE_BATCH_WAIT_MS: Time to gather concurrent sentence encodes into one batch (0 disables)
+- ENCODE_MAX_BATCH_SIZE: Sentence count that dispatches a batch without waiting
+- EMBEDDING_CACHE_MB: Memory budget for cached sentence embeddings (0 disables)
+- EMBEDDING_CACHE_DISK: Persist embeddings to per-model SQLite shards under ~/.cache/libb-nlp/embeddings (true/false)
+- METRICS_SAMPLE_INTERVAL: Seconds between background CPU, memory and GPU samples
+- METRICS_STORE: Where workers share metrics for whole-task totals: none, directory or redis.
+  `python -m lnlp.serve --workers N` sets up a shared directory itself; with plain
+  `uvicorn --workers N` each worker reports only its own metrics unless this is set
+- METRICS_DIR: Directory shared by the workers for the directory metrics store
+- STAGE_TIMING: Time PDF extraction and splitting stages into stage_* histograms (true/false)
 """
 
+import json
 import os
 from functools import lru_cache
 
@@ -17,10 +59,61 @@ from pydantic import BaseModel, ConfigDict, Field
 class Settings(BaseModel):
 
     openrouter_api_key: str | None = Field(default_factory=lambda: os.getenv('OPENROUTER_API_KEY'))
+    openrouter_base_url: str = Field(default_factory=lambda: os.getenv('OPENROUTER_BASE_URL', 'https://openrouter.ai/api/v1'))
 
     openrouter_referer: str = Field(default_factory=lambda: os.getenv('OPENROUTER_REFERER', 'http://localhost:8000'))
     openrouter_title: str = Field(default_factory=lambda: os.getenv('OPENROUTER_TITLE', 'Libb-NLP API'))
 
+    openrouter_max_connections: int = Field(default_factory=lambda: int(os.getenv('OPENROUTER_MAX_CONNECTIONS', '100')))
+    openrouter_keepalive_expiry: float = Field(default_factory=lambda: float(os.getenv('OPENROUTER_KEEPALIVE_EXPIRY', '60')))
+    openrouter_timeout: float = Field(default_factory=lambda: float(os.getenv('OPENROUTER_TIMEOUT', '600')))
+    openrouter_connect_timeout: float = Field(default_factory=lambda: float(os.getenv('OPENROUTER_CONNECT_TIMEOUT', '10')))
+
+    response_cache_backend: str = Field(default_factory=lambda: os.getenv('RESPONSE_CACHE_BACKEND', 'none').lower())
+    response_cache_ttl: float = Field(default_factory=lambda: float(os.getenv('RESPONSE_CACHE_TTL', '86400')))
+    response_cache_max_entries: int = Field(default_factory=lambda: int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '1024')))
+    redis_url: str = Field(default_factory=lambda: os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+
+    llm_max_concurrency: int = Field(default_factory=lambda: int(os.getenv('LLM_MAX_CONCURRENCY', '16')))
+    llm_tokens_per_minute: int = Field(default_factory=lambda: int(os.getenv('LLM_TOKENS_PER_MINUTE', '0')))
+    llm_max_queue: int = Field(default_factory=lambda: int(os.getenv('LLM_MAX_QUEUE', '64')))
+    llm_max_queue_wait: float = Field(default_factory=lambda: float(os.getenv('LLM_MAX_QUEUE_WAIT', '30')))
+    llm_limits: dict[str, dict] = Field(default_factory=lambda: json.loads(os.getenv('LLM_LIMITS', '{}')))
+
+    llm_max_attempts: int = Field(default_factory=lambda: int(os.getenv('LLM_MAX_ATTEMPTS', '3')))
+    llm_retry_base_delay: float = Field(default_factory=lambda: float(os.getenv('LLM_RETRY_BASE_DELAY', '0.5')))
+    llm_retry_max_delay: float = Field(default_factory=lambda: float(os.getenv('LLM_RETRY_MAX_DELAY', '8')))
+    llm_request_deadline: float = Field(default_factory=lambda: float(os.getenv('LLM_REQUEST_DEADLINE', '120')))
+    llm_hedge: bool = Field(default_factory=lambda: os.getenv('LLM_HEDGE', 'false').lower() in {'1', 'true', 'yes'})
+    llm_hedge_min_delay: float = Field(default_factory=lambda: float(os.getenv('LLM_HEDGE_MIN_DELAY', '1')))
+    llm_circuit_failures: int = Field(default_factory=lambda: int(os.getenv('LLM_CIRCUIT_FAILURES', '5')))
+    llm_circuit_reset: float = Field(default_factory=lambda: float(os.getenv('LLM_CIRCUIT_RESET', '30')))
+
+    chat_batch_max_concurrency: int = Field(default_factory=lambda: int(os.getenv('CHAT_BATCH_MAX_CONCURRENCY', '8')))
+    chat_batch_max_items: int = Field(default_factory=lambda: int(os.getenv('CHAT_BATCH_MAX_ITEMS', '500')))
+
+    mapreduce_chunk_tokens: int = Field(default_factory=lambda: int(os.getenv('MAPREDUCE_CHUNK_TOKENS', '4000')))
+    mapreduce_max_concurrency: int = Field(default_factory=lambda: int(os.getenv('MAPREDUCE_MAX_CONCURRENCY', '8')))
+    mapreduce_cache_entries: int = Field(default_factory=lambda: int(os.getenv('MAPREDUCE_CACHE_ENTRIES', '4096')))
+
+    ticker_cache_disk: bool = Field(default_factory=lambda: os.getenv('TICKER_CACHE_DISK', 'true').lower() in {'1', 'true', 'yes'})
+
+    model_catalogue_ttl: float = Field(default_factory=lambda: float(os.getenv('MODEL_CATALOGUE_TTL', '3600')))
+
+    pdf_workers: int = Field(default_factory=lambda: int(os.getenv('PDF_WORKERS', '0')))
+    pdf_parallel_min_pages: int = Field(default_factory=lambda: int(os.getenv('PDF_PARALLEL_MIN_PAGES', '32')))
+
+    encode_batch_wait_ms: float = Field(default_factory=lambda: float(os.getenv('ENCODE_BATCH_WAIT_MS', '5')))
+    encode_max_batch_size: int = Field(default_factory=lambda: int(os.getenv('ENCODE_MAX_BATCH_SIZE', '128')))
+
+    embedding_cache_mb: int = Field(default_factory=lambda: int(os.getenv('EMBEDDING_CACHE_MB', '256')))
+    embedding_cache_disk: bool = Field(default_factory=lambda: os.getenv('EMBEDDING_CACHE_DISK', 'false').lower() in {'1', 'true', 'yes'})
+
+    metrics_sample_interval: float = Field(default_factory=lambda: float(os.getenv('METRICS_SAMPLE_INTERVAL', '1')))
+    metrics_store: str = Field(default_factory=lambda: os.getenv('METRICS_STORE', 'none').lower())
+    metrics_dir: str | None = Field(default_factory=lambda: os.getenv('METRICS_DIR'))
+    stage_timing: bool = Field(default_factory=lambda: os.getenv('STAGE_TIMING', 'true').lower() in {'1', 'true', 'yes'})
+
     model_config = ConfigDict(case_sensitive=True, extra='ignore')
 
 
@@ -1,6 +1,6 @@
-from typing import Any
+from typing import Any, Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class ChatMessage(BaseModel):
@@ -11,6 +11,24 @@ class ProviderRequest(BaseModel):
     model: str
     messages: list[ChatMessage]
     max_tokens: int | None = None
+    bypass_cache: bool = False
+    cache_ttl: int | None = Field(default=None, gt=0)
+
+
+class BatchRequest(BaseModel):
+    requests: list[ProviderRequest]
+    max_concurrency: int | None = None
+
+
+class MapReduceRequest(BaseModel):
+    model: str
+    text: str
+    map_prompt: str
+    reduce_prompt: str
+    max_tokens: int = 1024
+    chunk_tokens: int | None = None
+    max_concurrency: int | None = None
+    splitter: Literal['spacy', 'similarity'] = 'spacy'
 
 
 class UsageInfo(BaseModel):
@@ -35,3 +53,11 @@ class ModelInfo(BaseModel):
     provider: str
     context_length: int | None = None
     features: list[str]
+
+
+class MapReduceResponse(BaseModel):
+    model: str
+    content: str
+    chunks: int
+    levels: int
+    usage: UsageInfo
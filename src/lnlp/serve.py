@@ -0,0 +1,203 @@
+"""Pre-fork serving entry point for the Libb-NLP API.
+
+The master process imports the app and loads the spaCy and
+sentence-transformer models once, binds the listening socket and then forks
+the uvicorn workers. Model weights are inherited copy-on-write, so each worker
+starts serving without reloading them and a crashed worker is replaced by a
+fresh fork in well under a second.
+
+    python -m lnlp.serve --workers 4 --port 8000
+
+CUDA cannot be used across fork, so on GPU hosts the models are left for
+each worker to load after it starts.
+
+Workers publish their metrics to a shared directory, so the dashboard and
+/metrics report totals for the whole task whichever worker answers; set
+METRICS_STORE to use another store instead.
+"""
+import argparse
+import gc
+import logging
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+
+import torch
+import uvicorn
+from lnlp.api.app import app
+from lnlp.config import get_settings
+from lnlp.services.splitters import SplitterManager
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+
+logger = logging.getLogger(__name__)
+
+# workers that die sooner than this after forking are restarted with a delay
+MIN_WORKER_LIFETIME = 1.0
+
+
+def preload_models() -> bool:
+    """Load the splitter models in the master so workers inherit them.
+
+    Returns
+        True when the models were loaded in this process
+    """
+    if torch.cuda.is_available():
+        logger.warning('CUDA is available; skipping preload so each worker initialises CUDA after fork')
+        return False
+
+    manager = SplitterManager()
+    manager.get_spacy_splitter()
+    manager.get_similarity_splitter()
+    logger.info('Preloaded splitter models in master process')
+    return True
+
+
+def share_metrics_directory() -> str | None:
+    """Point the workers at a fresh shared directory for whole-task metrics.
+
+    Does nothing when METRICS_STORE is already configured.
+
+    Returns
+        The directory to remove on exit, if one was created
+    """
+    if os.getenv('METRICS_STORE'):
+        return None
+    shm = '/dev/shm'
+    path = tempfile.mkdtemp(prefix='lnlp-metrics-', dir=shm if os.path.isdir(shm) else None)
+    os.environ['METRICS_STORE'] = 'directory'
+    os.environ['METRICS_DIR'] = path
+    get_settings.cache_clear()
+    logger.info(f'Workers share metrics through {path}')
+    return path
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    """Bind the shared listening socket before forking"""
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(sock: socket.socket, log_level: str, access_log: bool) -> None:
+    """Serve the app on the inherited socket inside a forked worker"""
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    config = uvicorn.Config(
+        app,
+        log_level=log_level,
+        access_log=access_log,
+        use_colors=False,
+    )
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+
+
+class Supervisor:
+    """Forks workers from the preloaded master and replaces any that exit"""
+
+    def __init__(self, sock: socket.socket, workers: int, log_level: str = 'info', access_log: bool = False):
+        self.sock = sock
+        self.workers = workers
+        self.log_level = log_level
+        self.access_log = access_log
+        self._children = {}
+        self._stopping = False
+
+    def spawn(self) -> int:
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                run_worker(self.sock, self.log_level, self.access_log)
+            except Exception:
+                logger.exception('Worker failed')
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+
+        self._children[pid] = time.monotonic()
+        logger.info(f'Started worker [{pid}]')
+        return pid
+
+    def stop(self, sig, frame):
+        """Forward shutdown to every worker"""
+        if not self._stopping:
+            logger.info('Received shutdown signal, stopping workers')
+        self._stopping = True
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> None:
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+
+        # keep the inherited heap out of the collector so workers touch fewer shared pages
+        gc.collect()
+        gc.freeze()
+
+        for _ in range(self.workers):
+            self.spawn()
+
+        while self._children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            started = self._children.pop(pid, None)
+            if started is None or self._stopping:
+                continue
+
+            logger.warning(f'Worker [{pid}] exited with status {os.waitstatus_to_exitcode(status)}, restarting')
+            if time.monotonic() - started < MIN_WORKER_LIFETIME:
+                time.sleep(MIN_WORKER_LIFETIME)
+            self.spawn()
+
+        self.sock.close()
+        logger.info('All workers stopped')
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description='Serve the Libb-NLP API from a preloaded master process')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=int(os.getenv('WEB_CONCURRENCY', '4')))
+    parser.add_argument('--log-level', default='info')
+    parser.add_argument('--access-log', action='store_true')
+    parser.add_argument('--no-preload', action='store_true', help='load models in each worker instead')
+    args = parser.parse_args(argv)
+
+    if not args.no_preload:
+        preload_models()
+
+    metrics_dir = share_metrics_directory() if args.workers > 1 else None
+
+    sock = bind_socket(args.host, args.port)
+    logger.info(f'Listening on {args.host}:{args.port} with {args.workers} workers')
+    try:
+        Supervisor(sock, args.workers, log_level=args.log_level, access_log=args.access_log).run()
+    finally:
+        if metrics_dir is not None:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+import logging
+import os
+import queue
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from threading import Lock, Thread
+
+import numpy as np
+from lnlp.utils.metrics import metrics_service
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    'EncodeBatcher',
+]
+
+_STOP = object()
+
+
+@dataclass
+class _EncodeRequest:
+    """Sentences from a single caller waiting to be encoded"""
+    sentences: list[str]
+    future: Future = field(default_factory=Future)
+
+
+class EncodeBatcher:
+    """Dynamic micro-batching scheduler in front of a sentence-transformer model.
+
+    Callers block in `encode` while a single worker thread collects sentences
+    from concurrent requests for up to `max_wait_ms` or until `max_batch_size`
+    sentences are queued, runs one `model.encode` call and scatters the
+    embeddings back to each caller in submission order.
+
+    The worker thread is started on first use in each process, so a batcher
+    created before the server forks its workers is safe to use after.
+    """
+
+    def __init__(self, model, max_batch_size: int = 128, max_wait_ms: float = 5.0):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = None
+        self._worker = None
+        self._pid = None
+        self._closed = False
+        self._start_lock = Lock()
+
+    def _submit(self, request: _EncodeRequest):
+        """Queue a request, starting the worker thread for this process if needed"""
+        with self._start_lock:
+            if self._closed:
+                raise RuntimeError('Encode batcher is closed')
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._worker = Thread(target=self._run, args=(self._queue,), name='encode-batcher', daemon=True)
+                self._worker.start()
+                self._pid = os.getpid()
+                logger.info(f'Started encode batcher (max_batch_size={self.max_batch_size}, '
+                            f'max_wait_ms={self.max_wait * 1000:g})')
+            self._queue.put(request)
+
+    def encode(self, sentences: list[str]) -> np.ndarray:
+        """Queue sentences for the next batch and wait for their embeddings"""
+        request = _EncodeRequest(list(sentences))
+        self._submit(request)
+        return request.future.result()
+
+    def close(self) -> None:
+        """Stop the worker thread once queued requests have been served"""
+        with self._start_lock:
+            self._closed = True
+            running = self._pid == os.getpid() and self._worker.is_alive()
+            if running:
+                self._queue.put(_STOP)
+        if running:
+            self._worker.join()
+            logger.info('Stopped encode batcher')
+
+    def _collect(self, pending: queue.Queue, first: _EncodeRequest) -> tuple[list[_EncodeRequest], bool]:
+        """Gather requests behind `first` until the batch is full or the wait expires"""
+        batch = [first]
+        size = len(first.sentences)
+        deadline = time.monotonic() + self.max_wait
+
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = pending.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is _STOP:
+                return batch, True
+            batch.append(request)
+            size += len(request.sentences)
+
+        return batch, False
+
+    def _run(self, pending: queue.Queue):
+        stopping = False
+        while not stopping:
+            first = pending.get()
+            if first is _STOP:
+                break
+            batch, stopping = self._collect(pending, first)
+            self._process(batch, queued=pending.qsize())
+
+        # fail anything that raced in behind the stop marker
+        while True:
+            try:
+                request = pending.get_nowait()
+            except queue.Empty:
+                break
+            if request is not _STOP:
+                request.future.set_exception(RuntimeError('Encode batcher is closed'))
+
+    def _process(self, batch: list[_EncodeRequest], queued: int = 0):
+        """Encode one batch and hand each caller its slice of the embeddings"""
+        sentences = [sentence for request in batch for sentence in request.sentences]
+        metrics_service.track_batch(batch_size=len(sentences), queue_depth=len(batch) + queued)
+
+        try:
+            embeddings = np.asarray(self.model.encode(sentences))
+        except Exception as e:
+            logger.error(f'Batched encode of {len(sentences)} sentences failed: {e}')
+            for request in batch:
+                request.future.set_exception(e)
+            return
+
+        offset = 0
+        for request in batch:
+            count = len(request.sentences)
+            request.future.set_result(embeddings[offset:offset + count].copy())
+            offset += count
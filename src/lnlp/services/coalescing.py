@@ -0,0 +1,73 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from lnlp.utils.metrics import metrics_service
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    'SingleFlight',
+]
+
+
+class _Flight:
+    """One in-flight call and the number of callers waiting on it"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one in-flight call.
+
+    The first caller for a key starts the call; callers arriving before it
+    finishes wait on the same task and receive its result or exception.
+    Nothing is kept once the call completes, so this only deduplicates
+    concurrent work and never serves stale results. A waiter that is
+    cancelled detaches from the call, and the call itself is cancelled once
+    no waiters remain.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights = {}
+
+    def _forget(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def _on_done(self, key: str, flight: _Flight, task: asyncio.Task):
+        self._forget(key, flight)
+        if not task.cancelled():
+            task.exception()  # mark retrieved; waiters re-raise it themselves
+
+    async def do(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `call` for key, or join the call already in flight for it"""
+        loop = asyncio.get_running_loop()
+        flight = self._flights.get(key)
+
+        if flight is not None and not flight.task.done() and flight.task.get_loop() is loop:
+            metrics_service.increment(f'{self.name}_coalesced')
+            logger.debug(f'Coalesced {self.name} request onto in-flight call')
+        else:
+            flight = _Flight(loop.create_task(call()))
+            flight.task.add_done_callback(lambda task, key=key, flight=flight: self._on_done(key, flight, task))
+            self._flights[key] = flight
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if not flight.task.done() and flight.waiters == 1:
+                flight.task.cancel()
+                self._forget(key, flight)
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def in_flight(self) -> int:
+        return len(self._flights)
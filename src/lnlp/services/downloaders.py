@@ -41,3 +41,18 @@ def download_sentence_transformer(model_name: str):
         model = SentenceTransformer(model_name, tokenizer_kwargs=tokenizer_kwargs)
         print('Download complete!')
     return model
+
+
+def download_tiktoken_encodings(*names: str) -> None:
+    """Download tiktoken encodings so token counting works offline"""
+    import tiktoken
+
+    # Set up encoding cache directory in user's home
+    cache_dir = Path.home() / '.cache' / 'libb-nlp' / 'tiktoken'
+    Path(cache_dir).mkdir(exist_ok=True, parents=True)
+    os.environ['TIKTOKEN_CACHE_DIR'] = str(cache_dir)
+
+    for name in names:
+        print(f'Downloading tiktoken encoding {name}...')
+        tiktoken.get_encoding(name)
+    print('Download complete!')
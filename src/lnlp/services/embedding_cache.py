@@ -0,0 +1,160 @@
+import hashlib
+import logging
+import os
+import sqlite3
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+
+import numpy as np
+from lnlp.utils.metrics import metrics_service
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    'EmbeddingCache',
+]
+
+
+def sentence_key(text: str) -> str:
+    """Content address of a sentence"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class EmbeddingCache:
+    """Content-addressed sentence embedding cache keyed by (model name, text hash).
+
+    The memory tier is an LRU bounded by `max_bytes` of embedding data. The
+    optional disk tier keeps one SQLite shard per model under `cache_dir`,
+    holding float32 rows so cached and fresh embeddings are identical, and a
+    restart or a retried document skips `model.encode` for everything seen
+    before. Forked workers open their own connections and share the shard.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024**2, cache_dir: str | Path | None = None):
+        self.max_bytes = max_bytes
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+        self._disk_lock = Lock()
+        self._shards = {}
+        self._shards_pid = None
+
+    def _shard(self, model_name: str) -> sqlite3.Connection:
+        """Connection to the model's shard, opened once per process"""
+        pid = os.getpid()
+        if self._shards_pid != pid:
+            self._shards, self._shards_pid = {}, pid
+        shard = self._shards.get(model_name)
+        if shard is None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self.cache_dir / f"{model_name.replace('/', '--')}.sqlite3"
+            shard = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+            shard.execute('PRAGMA journal_mode=WAL')
+            shard.execute('CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, embedding BLOB NOT NULL)')
+            self._shards[model_name] = shard
+        return shard
+
+    def _read_disk(self, model_name: str, keys: list[str]) -> dict[str, np.ndarray]:
+        if self.cache_dir is None or not keys:
+            return {}
+        found = {}
+        try:
+            with self._disk_lock:
+                shard = self._shard(model_name)
+                for start in range(0, len(keys), 500):
+                    batch = keys[start:start + 500]
+                    rows = shard.execute(
+                        f"SELECT key, embedding FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                        batch).fetchall()
+                    found.update((key, np.frombuffer(blob, dtype=np.float32)) for key, blob in rows)
+        except sqlite3.Error as e:
+            logger.warning(f'Could not read embedding cache for {model_name}: {e}')
+        return found
+
+    def _write_disk(self, model_name: str, keys: list[str], rows: list[np.ndarray]):
+        if self.cache_dir is None or not keys:
+            return
+        try:
+            with self._disk_lock:
+                self._shard(model_name).executemany(
+                    'INSERT OR IGNORE INTO embeddings (key, embedding) VALUES (?, ?)',
+                    [(key, embedding.tobytes()) for key, embedding in zip(keys, rows)])
+        except sqlite3.Error as e:
+            logger.warning(f'Could not write embedding cache for {model_name}: {e}')
+
+    def _put_memory(self, cache_key: tuple[str, str], embedding: np.ndarray) -> int:
+        """Insert into the LRU tier, returning the number of evictions"""
+        if embedding.nbytes > self.max_bytes:
+            return 0
+        if cache_key in self._entries:
+            self._entries.move_to_end(cache_key)
+            return 0
+        self._entries[cache_key] = embedding
+        self._bytes += embedding.nbytes
+        evictions = 0
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            evictions += 1
+        return evictions
+
+    def get_many(self, model_name: str, sentences: list[str]) -> list[np.ndarray | None]:
+        """Look up embeddings for sentences, None for each miss"""
+        keys = [sentence_key(sentence) for sentence in sentences]
+        results = [None] * len(keys)
+        disk_lookups = []
+
+        with self._lock:
+            for idx, key in enumerate(keys):
+                embedding = self._entries.get((model_name, key))
+                if embedding is not None:
+                    self._entries.move_to_end((model_name, key))
+                    results[idx] = embedding
+                else:
+                    disk_lookups.append(idx)
+
+        found = self._read_disk(model_name, list({keys[idx] for idx in disk_lookups}))
+        disk_hits = {idx: found[keys[idx]] for idx in disk_lookups if keys[idx] in found}
+
+        evictions = 0
+        with self._lock:
+            for idx, embedding in disk_hits.items():
+                results[idx] = embedding
+                evictions += self._put_memory((model_name, keys[idx]), embedding)
+
+        hits = len(keys) - len(disk_lookups) + len(disk_hits)
+        metrics_service.track_cache('embeddings', hits=hits, misses=len(keys) - hits, evictions=evictions)
+        return results
+
+    def put_many(self, model_name: str, sentences: list[str], embeddings: np.ndarray):
+        """Store freshly encoded embeddings in both tiers"""
+        keys = [sentence_key(sentence) for sentence in sentences]
+        rows = [np.array(embedding, dtype=np.float32) for embedding in embeddings]
+
+        evictions = 0
+        with self._lock:
+            for key, embedding in zip(keys, rows):
+                evictions += self._put_memory((model_name, key), embedding)
+
+        self._write_disk(model_name, keys, rows)
+
+        if evictions:
+            metrics_service.track_cache('embeddings', evictions=evictions)
+
+    def clear(self):
+        """Drop the memory tier; the disk tier is left in place"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'disk': str(self.cache_dir) if self.cache_dir is not None else None
+            }
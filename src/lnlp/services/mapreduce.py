@@ -0,0 +1,182 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+
+from lnlp.schemas.chat import ChatMessage, ProviderRequest, ProviderResponse
+from lnlp.services.response_cache import MemoryCacheBackend, ResponseCache
+from lnlp.services.tokens import token_counter
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    'MapReduceError',
+    'MapReducePipeline',
+    'MapReduceResult',
+]
+
+PARTIAL_SEPARATOR = '\n\n---\n\n'
+
+
+class MapReduceError(Exception):
+    """Raised when some chunks of a map or reduce stage fail"""
+
+    def __init__(self, stage: str, failed: dict[int, Exception], total: int):
+        first = next(iter(failed.values()))
+        super().__init__(f'{len(failed)} of {total} {stage} calls failed (chunks {sorted(failed)}): {first}')
+        self.stage = stage
+        self.failed = failed
+
+
+@dataclass
+class MapReduceResult:
+    """Final answer of a map-reduce run and what it took to produce it"""
+    content: str
+    model: str
+    chunks: int
+    levels: int
+    usage: dict = field(default_factory=lambda: {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0})
+
+
+class MapReducePipeline:
+    """Answer a prompt over documents longer than a model's context.
+
+    The text is split on sentence boundaries into chunks of at most
+    `chunk_tokens`, the map prompt runs over every chunk concurrently, and
+    the partial answers are combined with the reduce prompt in groups that
+    fit the same budget, level by level, until a single answer remains.
+
+    Every map and reduce result is cached by its exact inputs, so when a run
+    fails part way a retry of the same request only reruns the calls that
+    did not succeed.
+    """
+
+    def __init__(self, provider, splitter_manager, chunk_tokens: int = 4000, max_concurrency: int = 8,
+                 cache: ResponseCache | None = None):
+        self.provider = provider
+        self.splitter_manager = splitter_manager
+        self.chunk_tokens = chunk_tokens
+        self.max_concurrency = max_concurrency
+        self.cache = cache or ResponseCache(MemoryCacheBackend(max_entries=4096), name='mapreduce')
+
+    def split(self, text: str, model: str, chunk_tokens: int, splitter: str = 'spacy') -> list[str]:
+        """Split text into chunks of at most `chunk_tokens` tokens for `model`"""
+        spacy_splitter = self.splitter_manager.get_spacy_splitter()
+
+        def count(chunk: str) -> int:
+            return token_counter.count(chunk, model)
+
+        def by_tokens(chunk: str) -> list[str]:
+            return spacy_splitter.split_text(chunk, chunk_size=chunk_tokens, chunk_overlap=0, length_function=count)
+
+        if splitter == 'similarity':
+            sections = self.splitter_manager.get_similarity_splitter().split_text(text)
+            return [piece for section in sections
+                    for piece in ([section] if count(section) <= chunk_tokens else by_tokens(section))]
+        if splitter != 'spacy':
+            raise ValueError(f'Unknown splitter: {splitter}')
+        return by_tokens(text)
+
+    def group(self, partials: list[str], model: str, budget: int) -> list[list[str]]:
+        """Pack consecutive partial answers into groups that fit the token budget.
+
+        A partial that alone exceeds the budget is truncated to it, never
+        passed on whole or paired with another.
+        """
+        partials = [self._fit(partial, model, budget) for partial in partials]
+        groups, current, used = [], [], 0
+        for partial in partials:
+            tokens = token_counter.count(partial, model)
+            if current and used + tokens > budget:
+                groups.append(current)
+                current, used = [], 0
+            current.append(partial)
+            used += tokens
+        if current:
+            groups.append(current)
+
+        # always make progress: when no two partials fit together, halve them and pair them
+        if len(groups) == len(partials) > 1:
+            half = [self._fit(partial, model, max(budget // 2, 1)) for partial in partials]
+            groups = [half[i:i + 2] for i in range(0, len(half), 2)]
+        return groups
+
+    @staticmethod
+    def _fit(partial: str, model: str, budget: int) -> str:
+        if token_counter.count(partial, model) <= budget:
+            return partial
+        logger.warning(f'Truncating a partial answer to the {budget:,} token reduce budget')
+        return token_counter.truncate(partial, budget, model)
+
+    async def _complete(self, request: ProviderRequest) -> ProviderResponse:
+        """Run one call, answering from and filling the partial-result cache"""
+        key = ResponseCache.make_key({
+            'model': request.model,
+            'messages': [m.model_dump() for m in request.messages],
+            'max_tokens': request.max_tokens,
+        })
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return cached
+        response = await self.provider.query(request)
+        await self.cache.set(key, response)
+        return response
+
+    async def _stage(self, stage: str, model: str, prompt: str, inputs: list[str], max_tokens: int,
+                     max_concurrency: int, result: MapReduceResult) -> list[str]:
+        """Run `prompt` over each input with bounded concurrency, failing if any call fails"""
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(content: str) -> ProviderResponse:
+            async with semaphore:
+                return await self._complete(ProviderRequest(
+                    model=model,
+                    messages=[ChatMessage(content=f'{prompt}\n\n{content}')],
+                    max_tokens=max_tokens
+                ))
+
+        responses = await asyncio.gather(*(run(content) for content in inputs), return_exceptions=True)
+        failed = {i: r for i, r in enumerate(responses) if isinstance(r, BaseException)}
+        if failed:
+            raise MapReduceError(stage, failed, len(inputs))
+
+        for response in responses:
+            for name in result.usage:
+                result.usage[name] += getattr(response.usage, name)
+        return [response.choices[0]['message']['content'] or '' for response in responses]
+
+    async def _check_budget(self, model: str, prompts: tuple[str, ...], chunk_tokens: int, max_tokens: int):
+        """Reject a chunk size that cannot fit the model's context with its prompt and answer"""
+        context_length = await self.provider.context_length(model)
+        if not context_length:
+            return
+        prompt_tokens = max(token_counter.count_messages([{'content': f'{prompt}\n\n'}], model) for prompt in prompts)
+        if prompt_tokens + chunk_tokens + max_tokens > context_length:
+            raise ValueError(f'chunk_tokens ({chunk_tokens:,}) plus max_tokens ({max_tokens:,}) and the prompt '
+                             f'(about {prompt_tokens:,} tokens) exceed the {context_length:,} token context of {model}')
+
+    async def run(self, text: str, model: str, map_prompt: str, reduce_prompt: str, max_tokens: int = 1024,
+                  chunk_tokens: int | None = None, max_concurrency: int | None = None,
+                  splitter: str = 'spacy') -> MapReduceResult:
+        """Map `map_prompt` over the chunks of `text` and reduce to one answer"""
+        chunk_tokens = chunk_tokens or self.chunk_tokens
+        max_concurrency = min(max_concurrency or self.max_concurrency, self.max_concurrency)
+        await self._check_budget(model, (map_prompt, reduce_prompt), chunk_tokens, max_tokens)
+
+        chunks = await asyncio.to_thread(self.split, text, model, chunk_tokens, splitter)
+        if not chunks:
+            raise ValueError('No text to process')
+        logger.info(f'Map-reduce over {len(chunks)} chunks of up to {chunk_tokens:,} tokens with {model}')
+
+        result = MapReduceResult(content='', model=model, chunks=len(chunks), levels=0)
+        partials = await self._stage('map', model, map_prompt, chunks, max_tokens, max_concurrency, result)
+
+        while len(partials) > 1:
+            groups = self.group(partials, model, chunk_tokens)
+            result.levels += 1
+            logger.debug(f'Reduce level {result.levels}: {len(partials)} partials in {len(groups)} groups')
+            partials = await self._stage('reduce', model, reduce_prompt, [PARTIAL_SEPARATOR.join(g) for g in groups],
+                                         max_tokens, max_concurrency, result)
+
+        result.content = partials[0]
+        return result
@@ -1,20 +1,26 @@
 """Dynamic Anthropic model resolution via OpenRouter.
 
-Queries the OpenRouter models API and caches the latest haiku,
-sonnet, and opus model IDs. Cache expires at midnight EST daily.
+Queries the OpenRouter models API and resolves the latest haiku,
+sonnet, and opus model IDs from it.
+
+Callers share one indexed catalogue through `ModelCatalogue`, refreshed
+every MODEL_CATALOGUE_TTL seconds: concurrent misses wait on a single
+in-flight fetch, and a catalogue nearing expiry is served as-is while a
+background task refreshes it.
 """
 
+import asyncio
 import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
 
-import cachu
 import pendulum
 from lnlp.config import get_settings
-from openai import OpenAI
+from lnlp.schemas.chat import ModelInfo
 
 logger = logging.getLogger(__name__)
 
-cachu.configure(backend_default='memory')
-
 
 def _seconds_until_midnight_est() -> int:
     """Compute seconds remaining until midnight EST.
@@ -24,51 +30,162 @@ def _seconds_until_midnight_est() -> int:
     return int((midnight - now).total_seconds())
 
 
-def _resolve_latest_model(family: str) -> str:
-    """Query OpenRouter for the latest Anthropic model in a family.
+def _latest_in_family(models: list[dict], family: str) -> str:
+    """Pick the newest Anthropic model in a family from a model list.
     """
-    settings = get_settings()
-    if not settings.openrouter_api_key:
-        raise ValueError('OpenRouter API key not configured')
-
-    client = OpenAI(
-        api_key=settings.openrouter_api_key,
-        base_url='https://openrouter.ai/api/v1',
-        default_headers={
-            'HTTP-Referer': settings.openrouter_referer,
-            'X-Title': settings.openrouter_title,
-            },
-        )
-
-    response = client.models.list()
     candidates = [
-        m for m in response.data
-        if family in m.id and 'anthropic' in m.id
+        m for m in models
+        if family in m['id'] and 'anthropic' in m['id']
         ]
     if not candidates:
         raise ValueError(f'No {family} models found on OpenRouter')
 
-    latest = max(candidates, key=lambda m: m.created)
-    logger.debug(f'Resolved latest {family} model: {latest.id}')
-    return latest.id
+    latest = max(candidates, key=lambda m: m.get('created') or 0)
+    logger.debug(f'Resolved latest {family} model: {latest["id"]}')
+    return latest['id']
+
+
+MODEL_FAMILIES = ('haiku', 'sonnet', 'opus')
+
+
+@dataclass(frozen=True)
+class CatalogueSnapshot:
+    """Immutable, indexed view of one OpenRouter model list fetch"""
+    models: list[dict]
+    by_id: dict[str, dict]
+    available: list[tuple[str, int | None]]
+    listing: list[ModelInfo]
+    latest: dict[str, str]
+
+    @classmethod
+    def build(cls, models: list[dict]) -> 'CatalogueSnapshot':
+        by_id = {}
+        for model in models:
+            by_id[model['id']] = model
+            by_id[f"openrouter/{model['id']}"] = model
+
+        available = [(f"openrouter/{model['id']}", model.get('context_length')) for model in models]
+        listing = [
+            ModelInfo(
+                name=name,
+                provider=name.split('/')[0] if '/' in name else 'openai',
+                context_length=context_length,
+                features=['chat']
+            )
+            for name, context_length in available
+        ]
 
+        latest = {}
+        for family in MODEL_FAMILIES:
+            try:
+                latest[family] = _latest_in_family(models, family)
+            except ValueError:
+                pass
 
-@cachu.cache(ttl=lambda _result: _seconds_until_midnight_est())
-def get_latest_haiku() -> str:
-    """Get the latest Anthropic Haiku model ID from OpenRouter.
-    """
-    return _resolve_latest_model('haiku')
+        return cls(models=models, by_id=by_id, available=available, listing=listing, latest=latest)
 
+    def lookup(self, model: str) -> dict | None:
+        """Find a model by id or openrouter/ alias"""
+        return self.by_id.get(model)
 
-@cachu.cache(ttl=lambda _result: _seconds_until_midnight_est())
-def get_latest_sonnet() -> str:
-    """Get the latest Anthropic Sonnet model ID from OpenRouter.
-    """
-    return _resolve_latest_model('sonnet')
 
+class ModelCatalogue:
+    """Single-flight, stale-while-revalidate catalogue of OpenRouter models.
+
+    Each fetch is indexed once into a `CatalogueSnapshot`. Within
+    `refresh_ahead` seconds of the TTL expiring (capped at half the TTL, so a
+    short TTL is not refreshed on every call) or after it, callers get the
+    current snapshot immediately while one background task fetches a fresh
+    copy. A failed refresh keeps serving the last good snapshot and backs off
+    exponentially, from `retry_delay` up to `max_retry_delay`, before the next
+    attempt. Only a cold catalogue makes callers wait, and then all of them
+    share one fetch.
+    """
 
-@cachu.cache(ttl=lambda _result: _seconds_until_midnight_est())
-def get_latest_opus() -> str:
-    """Get the latest Anthropic Opus model ID from OpenRouter.
+    def __init__(self, ttl: Callable[[], float] = _seconds_until_midnight_est, refresh_ahead: float = 300,
+                 retry_delay: float = 5, max_retry_delay: float = 300):
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._snapshot = None
+        self._expires_at = 0.0
+        self._refresh_at = 0.0
+        self._retry_at = 0.0
+        self._failures = 0
+        self._inflight = None
+
+    @property
+    def snapshot(self) -> CatalogueSnapshot | None:
+        return self._snapshot
+
+    def _store(self, models: list[dict]) -> CatalogueSnapshot:
+        self._snapshot = CatalogueSnapshot.build(models)
+        ttl = max(self.ttl(), 0)
+        now = time.monotonic()
+        self._expires_at = now + ttl
+        self._refresh_at = self._expires_at - min(self.refresh_ahead, ttl / 2)
+        self._retry_at = 0.0
+        self._failures = 0
+        return self._snapshot
+
+    def _start_fetch(self, fetch: Callable[[], Awaitable[list[dict]]]) -> asyncio.Task:
+        """Return the in-flight fetch for this loop, starting one if needed"""
+        loop = asyncio.get_running_loop()
+        if self._inflight is None or self._inflight.done() or self._inflight.get_loop() is not loop:
+            self._inflight = loop.create_task(self._fetch(fetch))
+            self._inflight.add_done_callback(self._on_fetch_done)
+        return self._inflight
+
+    async def _fetch(self, fetch: Callable[[], Awaitable[list[dict]]]) -> CatalogueSnapshot:
+        snapshot = self._store(await fetch())
+        logger.debug(f'Indexed {len(snapshot.models)} models from OpenRouter API')
+        return snapshot
+
+    def _on_fetch_done(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            self._failures += 1
+            delay = min(self.retry_delay * 2 ** (self._failures - 1), self.max_retry_delay)
+            self._retry_at = time.monotonic() + delay
+            logger.warning(f'Model catalogue fetch failed, next attempt in {delay:.0f}s: {task.exception()}')
+
+    async def get(self, fetch: Callable[[], Awaitable[list[dict]]]) -> CatalogueSnapshot:
+        """Get the current snapshot, fetching with `fetch` when cold or near expiry"""
+        if self._snapshot is None:
+            return await asyncio.shield(self._start_fetch(fetch))
+
+        now = time.monotonic()
+        if now >= self._refresh_at and now >= self._retry_at:
+            self._start_fetch(fetch)
+
+        return self._snapshot
+
+    async def run_refresh_loop(self, fetch: Callable[[], Awaitable[list[dict]]], retry_interval: float = 60):
+        """Keep the catalogue fresh in the background until cancelled"""
+        while True:
+            delay = max(self._refresh_at, self._retry_at) - time.monotonic()
+            await asyncio.sleep(max(delay, 1) if self._snapshot is not None else 0)
+            try:
+                await asyncio.shield(self._start_fetch(fetch))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                await asyncio.sleep(retry_interval)
+
+    def clear(self):
+        self._snapshot = None
+        self._expires_at = self._refresh_at = self._retry_at = 0.0
+        self._failures = 0
+
+
+model_catalogue = ModelCatalogue(ttl=lambda: get_settings().model_catalogue_ttl)
+
+
+async def resolve_latest_model(family: str, fetch: Callable[[], Awaitable[list[dict]]]) -> str:
+    """Resolve the latest Anthropic model in a family from the shared catalogue.
     """
-    return _resolve_latest_model('opus')
+    snapshot = await model_catalogue.get(fetch)
+    if family in snapshot.latest:
+        return snapshot.latest[family]
+    return _latest_in_family(snapshot.models, family)
+
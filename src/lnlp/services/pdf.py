@@ -1,16 +1,141 @@
 import logging
+import math
+import multiprocessing
 import operator
 import re
 import statistics
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
 from io import BytesIO
 from statistics import mean, stdev
+from threading import Lock
 
+import numpy as np
 import pdfplumber
+from lnlp.utils.timing import span, timed
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class PageWords:
+    """Words parsed from a single PDF page, shared by every extraction pass"""
+    page_num: int
+    width: float
+    height: float
+    words: list[dict] = field(default_factory=list)
+
+
+# word attributes read by header/footer detection, line grouping and formatting
+WORD_KEYS = ('text', 'x0', 'x1', 'top', 'bottom', 'fontname', 'size')
+
+_process_pool = None
+_process_pool_workers = 0
+_process_pool_lock = Lock()
+
+
+def _page_words(page: pdfplumber.page.Page, page_num: int, options: dict) -> PageWords:
+    """Extract compact word records for a single page"""
+    words = [{key: word[key] for key in WORD_KEYS if key in word}
+             for word in page.extract_words(**options)]
+    return PageWords(page_num=page_num, width=page.width, height=page.height, words=words)
+
+
+def _extract_page_range(pdf_source: bytes | str, start: int, stop: int, options: dict) -> list[PageWords]:
+    """Worker entry point: open the PDF independently and parse pages [start, stop)"""
+    pdf_input = BytesIO(pdf_source) if isinstance(pdf_source, bytes) else pdf_source
+    with pdfplumber.open(pdf_input) as pdf:
+        return [_page_words(pdf.pages[idx], idx + 1, options) for idx in range(start, stop)]
+
+
+def _page_ranges(page_count: int, shards: int) -> list[tuple[int, int]]:
+    """Split page indices into contiguous ranges, at most one per shard and never empty"""
+    if page_count <= 0:
+        return []
+    shards = max(1, min(shards, page_count))
+    size = math.ceil(page_count / shards)
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def get_process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Get or create the shared process pool used for page-parallel extraction.
+
+    Workers are spawned rather than forked so the pool is safe to create from
+    threaded servers and after CUDA initialisation.
+    """
+    global _process_pool, _process_pool_workers
+    with _process_pool_lock:
+        if _process_pool is None or _process_pool_workers != max_workers:
+            if _process_pool is not None:
+                _process_pool.shutdown(wait=False)
+            _process_pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            _process_pool_workers = max_workers
+            logger.info(f'Started PDF extraction process pool with {max_workers} workers')
+        return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    """Shut down the shared extraction process pool if it was started"""
+    global _process_pool, _process_pool_workers
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=True, cancel_futures=True)
+            _process_pool = None
+            _process_pool_workers = 0
+            logger.info('Shut down PDF extraction process pool')
+
+
+@lru_cache
+def _compile_alternation(patterns: tuple[str, ...], flags: int = 0) -> re.Pattern | None:
+    """Combine regex patterns into a single compiled alternation"""
+    if not patterns:
+        return None
+    return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns), flags)
+
+
+class LineFilter:
+    """Precompiled matcher deciding which extracted lines are running headers,
+    footers or page numbers.
+
+    Regex categories are folded into one alternation each (cached per pattern
+    set, so built once per extractor class) and the detected header/footer
+    strings are matched with a set for exact lookups and a single escaped
+    alternation for substring lookups.
+    """
+
+    def __init__(self, headers: set[str], footers: set[str],
+                 footer_patterns: list[str], page_number_patterns: list[str]):
+        self.headers = frozenset(headers)
+        self.footers = frozenset(footers)
+        self.known = self.headers | self.footers
+        # longest literals first so overlapping strings resolve deterministically
+        literals = sorted(self.known, key=len, reverse=True)
+        self._known_regex = re.compile('|'.join(re.escape(text) for text in literals)) if literals else None
+        self._footer_regex = _compile_alternation(tuple(footer_patterns), re.IGNORECASE)
+        self._page_number_regex = _compile_alternation(tuple(page_number_patterns), re.IGNORECASE)
+
+    def is_header_footer(self, text: str) -> bool:
+        """Check for an exact detected header/footer line"""
+        return text in self.known
+
+    def contains_header_footer(self, text: str) -> bool:
+        """Check whether any detected header/footer occurs within the line"""
+        return self._known_regex is not None and self._known_regex.search(text) is not None
+
+    def is_footer_pattern(self, text: str) -> bool:
+        """Check the line against the footer patterns (search semantics)"""
+        return self._footer_regex is not None and self._footer_regex.search(text) is not None
+
+    def is_page_number(self, text: str) -> bool:
+        """Check the line against the page number patterns (match semantics)"""
+        return self._page_number_regex is not None and self._page_number_regex.match(text) is not None
+
+
 def fmt_default(lines: list[dict], **kwargs) -> str:
     """Convert structured text data into HTML with consistent styling.
 
@@ -132,6 +257,7 @@ class PDFTextExtractor:
     POSITION_VARIANCE_THRESHOLD = 0.015  # maximum allowed variance in positions
     CLUSTERING_THRESHOLD = 0.02  # maximum distance for position clustering
     MIN_CLUSTER_SIZE = 2  # minimum number of items to form a cluster
+    PARALLEL_MIN_PAGES = 32  # minimum page count before sharding across processes
 
     PAGE_NUMBER_PATTERNS = [
         r'^\d+$',
@@ -170,6 +296,15 @@ class PDFTextExtractor:
         r'.*\bInternal\s+Use\s+Only\b.*'  # internal Use Only
     ]
 
+    # single word extraction profile covering every consumer of the word store
+    WORD_EXTRACTION_OPTIONS = {
+        'keep_blank_chars': True,
+        'use_text_flow': True,
+        'x_tolerance': 1,
+        'y_tolerance': 3,
+        'extra_attrs': ['fontname', 'size'],
+    }
+
     def __init__(self, pdf_input, **kwargs):
         """Initialize the PDF text extractor.
 
@@ -181,6 +316,9 @@ class PDFTextExtractor:
                 min_repetition_ratio: Override MIN_REPETITION_RATIO
                 clustering_threshold: Override CLUSTERING_THRESHOLD
                 min_cluster_size: Override MIN_CLUSTER_SIZE
+                workers: Number of worker processes for page-parallel parsing
+                    (0 or 1 keeps extraction in-process)
+                parallel_min_pages: Override PARALLEL_MIN_PAGES
         """
         # Document-wide analysis results
         self.doc_metrics = None  # Will store baseline metrics
@@ -191,24 +329,32 @@ class PDFTextExtractor:
             self.pdf_input = BytesIO(pdf_input)
         if isinstance(pdf_input, str):
             self.pdf_input = pdf_input
+        self.pdf_source = pdf_input  # raw bytes or path handed to worker processes
 
         self.repeated_lines = defaultdict(list)
         self.page_heights = []
         self.font_stats = defaultdict(list)
 
+        # per-document word store, populated on first use
+        self._pages = None
+        self._headers_footers = None
+        self._line_filter = None
+
         # allow configuration override
         self.config = {
             'header_threshold': kwargs.get('header_threshold', self.HEADER_THRESHOLD),
             'footer_threshold': kwargs.get('footer_threshold', self.FOOTER_THRESHOLD),
             'min_repetition_ratio': kwargs.get('min_repetition_ratio', self.MIN_REPETITION_RATIO),
             'clustering_threshold': kwargs.get('clustering_threshold', self.CLUSTERING_THRESHOLD),
-            'min_cluster_size': kwargs.get('min_cluster_size', self.MIN_CLUSTER_SIZE)
+            'min_cluster_size': kwargs.get('min_cluster_size', self.MIN_CLUSTER_SIZE),
+            'workers': kwargs.get('workers') or 0,
+            'parallel_min_pages': kwargs.get('parallel_min_pages', self.PARALLEL_MIN_PAGES)
         }
 
-    def _analyze_document_metrics(self, pdf):
+    def _analyze_document_metrics(self, pages: list[PageWords]):
         """Analyze document-wide metrics"""
         metrics = {
-            'pages': len(pdf.pages),
+            'pages': len(pages),
             'dimensions': [],
             'fonts': defaultdict(list),
             'positions': defaultdict(list),
@@ -227,14 +373,10 @@ class PDFTextExtractor:
         paragraph_spacings = []
         font_sizes = []
 
-        for page in pdf.pages:
+        for page in pages:
             metrics['dimensions'].append((page.width, page.height))
 
-            elements = page.extract_words(
-                keep_blank_chars=True,
-                use_text_flow=True,
-                extra_attrs=['fontname', 'size', 'weight']
-            )
+            elements = page.words
 
             if not elements:
                 continue
@@ -320,7 +462,7 @@ class PDFTextExtractor:
         text = re.sub(r'[ \t]+', ' ', text)
         return text.rstrip()
 
-    def _detect_footers(self, pages: list[pdfplumber.page.Page]) -> set[str]:
+    def _detect_footers(self, text_positions: dict[str, list[dict]], total_pages: int) -> set[str]:
         """
         Detect footers using multiple heuristics:
         1. Consistent vertical position
@@ -330,11 +472,10 @@ class PDFTextExtractor:
         5. Special handling for page numbers
         """
         footers = set()
-        text_positions = self._analyze_vertical_positions(pages)
-        total_pages = len(pages)
 
         # regular expression for page numbers
         page_number_pattern = re.compile(r'^\d+$|^Page\s+\d+$|^\d+\s+of\s+\d+$')
+        footer_regex = _compile_alternation(tuple(self.FOOTER_PATTERNS), re.IGNORECASE)
 
         for text, positions in text_positions.items():
             if len(positions) < total_pages * self.config['min_repetition_ratio']:
@@ -350,8 +491,7 @@ class PDFTextExtractor:
                 position_threshold = self.config['footer_threshold'] if not is_page_number else 0.95
 
                 # stricter checks for copyright/footer text
-                is_copyright = any(re.search(pattern, text, re.IGNORECASE)
-                                   for pattern in self.FOOTER_PATTERNS)
+                is_copyright = footer_regex is not None and footer_regex.search(text) is not None
 
                 position_consistency = pos_std < (0.008 if is_copyright else 0.015)
                 position_requirement = pos_mean > (0.93 if is_copyright else position_threshold)
@@ -370,11 +510,9 @@ class PDFTextExtractor:
 
         return footers
 
-    def _detect_headers(self, pages: list[pdfplumber.page.Page]) -> set[str]:
+    def _detect_headers(self, text_positions: dict[str, list[dict]]) -> set[str]:
         """Detect headers using multiple heuristics"""
         headers = set()
-        text_positions = self._analyze_vertical_positions(pages)
-        total_pages = len(pages)
 
         for text, positions in text_positions.items():
             # Only consider as running header if:
@@ -579,59 +717,16 @@ class PDFTextExtractor:
 
         return f'<div{style_str}>{item["text"]}</div>'
 
-    def _analyze_vertical_positions(self, pages: list[pdfplumber.page.Page]) -> dict[str, list[float]]:
+    @timed('pdf_vertical_positions')
+    def _analyze_vertical_positions(self, pages: list[PageWords]) -> dict[str, list[dict]]:
         """Analyze vertical positions and font characteristics of text across all pages"""
         positions = defaultdict(list)
 
-        def cluster_positions(positions: list[float]) -> list[list[float]]:
-            """Cluster similar vertical positions together using dynamic thresholds"""
-            if not positions:
-                return []
-
-            positions = sorted(positions)
+        self.page_heights = [page.height for page in pages]
 
-            # calculate dynamic threshold based on page height
-            avg_height = mean(self.page_heights)
-            dynamic_threshold = min(
-                self.config['clustering_threshold'],
-                (15 / avg_height)  # approximately 15 points in PDF units
-            )
-
-            clusters = [[positions[0]]]
-            cluster_stats = [(positions[0], 0)]  # (mean, std_dev)
-
-            for pos in positions[1:]:
-                # find best matching cluster
-                best_cluster_idx = None
-                min_distance = float('inf')
-
-                for idx, (cluster_mean, cluster_std) in enumerate(cluster_stats):
-                    distance = abs(pos - cluster_mean)
-                    if distance < min_distance and distance < (dynamic_threshold + cluster_std):
-                        min_distance = distance
-                        best_cluster_idx = idx
-
-                if best_cluster_idx is not None:
-                    clusters[best_cluster_idx].append(pos)
-                    # update cluster statistics
-                    new_mean = mean(clusters[best_cluster_idx])
-                    new_std = stdev(clusters[best_cluster_idx]) if len(clusters[best_cluster_idx]) > 1 else 0
-                    cluster_stats[best_cluster_idx] = (new_mean, new_std)
-                else:
-                    clusters.append([pos])
-                    cluster_stats.append((pos, 0))
-
-            return [c for c in clusters if len(c) >= self.config['min_cluster_size']]
-
-        for page_num, page in enumerate(pages, 1):
-            self.page_heights.append(page.height)
-            words = page.extract_words(
-                keep_blank_chars=True,
-                use_text_flow=True,
-                extra_attrs=['fontname', 'size', 'upright', 'stroking_color', 'non_stroking_color']
-            )
-
-            for word in words:
+        for page in pages:
+            page_num = page.page_num
+            for word in page.words:
                 text = word['text']
                 relative_top = word['top'] / page.height
                 font_info = (word['fontname'], word['size'])
@@ -651,20 +746,82 @@ class PDFTextExtractor:
                     'cluster': None  # will be set during clustering
                 })
 
+        if not positions:
+            return positions
+
+        # calculate dynamic threshold based on page height
+        avg_height = float(np.mean(self.page_heights))
+        dynamic_threshold = min(
+            self.config['clustering_threshold'],
+            (15 / avg_height)  # approximately 15 points in PDF units
+        )
+
         # perform clustering on positions
-        for text, pos_list in positions.items():
-            tops = [p['top'] for p in pos_list]
-            clusters = cluster_positions(tops)
+        for pos_list in positions.values():
+            # a text seen fewer times than the minimum cluster size cannot form a cluster
+            if len(pos_list) < self.config['min_cluster_size']:
+                continue
+
+            tops = np.fromiter((p['top'] for p in pos_list), dtype=float, count=len(pos_list))
+            cluster_means = self._cluster_vertical_positions(tops, dynamic_threshold)
+            if not len(cluster_means):
+                continue
 
-            # assign cluster IDs to positions
-            for pos in pos_list:
-                for i, cluster in enumerate(clusters):
-                    if abs(pos['top'] - mean(cluster)) < self.config['clustering_threshold']:
-                        pos['cluster'] = i
-                        break
+            # assign each position to the first cluster whose mean is within threshold
+            matches = np.abs(tops[:, None] - cluster_means[None, :]) < self.config['clustering_threshold']
+            matched = matches.any(axis=1)
+            cluster_ids = matches.argmax(axis=1)
+            for pos, is_matched, cluster_id in zip(pos_list, matched.tolist(), cluster_ids.tolist()):
+                if is_matched:
+                    pos['cluster'] = cluster_id
 
         return positions
 
+    def _cluster_vertical_positions(self, tops: np.ndarray, threshold: float) -> np.ndarray:
+        """Cluster similar vertical positions together using dynamic thresholds.
+
+        Positions are visited in sorted order and each joins the nearest cluster
+        whose mean lies within threshold plus the cluster's standard deviation.
+        Cluster statistics are maintained with Welford's running mean/variance
+        so every update is O(1).
+
+        Returns
+            Means of the clusters reaching min_cluster_size, in creation order
+        """
+        size = len(tops)
+        means = np.empty(size)
+        m2 = np.empty(size)        # running sum of squared deviations
+        stds = np.empty(size)      # sample standard deviation per cluster
+        counts = np.empty(size, dtype=np.int64)
+        n_clusters = 0
+
+        for pos in np.sort(tops).tolist():
+            best = -1
+            if n_clusters:
+                distance = np.abs(pos - means[:n_clusters])
+                distance[distance >= threshold + stds[:n_clusters]] = np.inf
+                best = int(distance.argmin())
+                if distance[best] == np.inf:
+                    best = -1
+
+            if best < 0:
+                means[n_clusters] = pos
+                m2[n_clusters] = 0.0
+                stds[n_clusters] = 0.0
+                counts[n_clusters] = 1
+                n_clusters += 1
+                continue
+
+            # update cluster statistics
+            counts[best] += 1
+            delta = pos - means[best]
+            means[best] += delta / counts[best]
+            m2[best] += delta * (pos - means[best])
+            stds[best] = math.sqrt(m2[best] / (counts[best] - 1))
+
+        keep = counts[:n_clusters] >= self.config['min_cluster_size']
+        return means[:n_clusters][keep]
+
     def _validate_page_numbers(self, page_numbers: list[int]) -> bool:
         """Validate if the sequence represents legitimate page numbers"""
         if not page_numbers:
@@ -676,16 +833,67 @@ class PDFTextExtractor:
 
         return all(1 <= gap <= 3 for gap in gaps)
 
-    def detect_headers_footers(self, pages: list[pdfplumber.page.Page]) -> tuple[set[str], set[str]]:
+    def _should_parallelize(self, page_count: int) -> bool:
+        """Check whether a document is large enough to shard across processes"""
+        return self.config['workers'] > 1 and page_count > 0 and page_count >= self.config['parallel_min_pages']
+
+    def _load_pages_parallel(self, page_count: int) -> list[PageWords]:
+        """Shard page ranges across the process pool and merge results in page order"""
+        workers = self.config['workers']
+        ranges = _page_ranges(page_count, workers)
+        if not ranges:
+            return []
+        logger.debug(f'Parsing {page_count} pages across {len(ranges)} worker processes')
+
+        pool = get_process_pool(workers)
+        futures = [pool.submit(_extract_page_range, self.pdf_source, start, stop,
+                               self.WORD_EXTRACTION_OPTIONS)
+                   for start, stop in ranges]
+
+        pages = []
+        for future in futures:
+            pages.extend(future.result())
+        return pages
+
+    def load_pages(self) -> list[PageWords]:
+        """Parse every page once and cache the word store for all extraction methods"""
+        if self._pages is None:
+            with span('pdf_parse'):
+                with pdfplumber.open(self.pdf_input) as pdf:
+                    page_count = len(pdf.pages)
+                    if not self._should_parallelize(page_count):
+                        self._pages = [_page_words(page, page_num, self.WORD_EXTRACTION_OPTIONS)
+                                       for page_num, page in enumerate(pdf.pages, 1)]
+                if self._pages is None:
+                    self._pages = self._load_pages_parallel(page_count)
+            logger.debug(f'Loaded word store for {len(self._pages)} pages')
+        return self._pages
+
+    def detect_headers_footers(self, pages: list[PageWords]) -> tuple[set[str], set[str]]:
         """Main method to detect both headers and footers"""
-        headers = self._detect_headers(pages)
-        footers = self._detect_footers(pages)
+        text_positions = self._analyze_vertical_positions(pages)
+        with span('pdf_header_footer'):
+            headers = self._detect_headers(text_positions)
+            footers = self._detect_footers(text_positions, len(pages))
 
-        # remove any overlapping detections
-        footers -= headers
+            # remove any overlapping detections
+            footers -= headers
 
         return headers, footers
 
+    def _get_headers_footers(self) -> tuple[set[str], set[str]]:
+        """Detect headers and footers once per document from the word store"""
+        if self._headers_footers is None:
+            self._headers_footers = self.detect_headers_footers(self.load_pages())
+        return self._headers_footers
+
+    def _get_line_filter(self) -> LineFilter:
+        """Build the header/footer/page-number line filter once per document"""
+        if self._line_filter is None:
+            headers, footers = self._get_headers_footers()
+            self._line_filter = LineFilter(headers, footers, self.FOOTER_PATTERNS, self.PAGE_NUMBER_PATTERNS)
+        return self._line_filter
+
     def _analyze_font_style(self, word):
         """Analyze font properties to determine text style"""
         font_name = word.get('fontname', '').lower()
@@ -744,6 +952,7 @@ class PDFTextExtractor:
             bool(text.strip())
         )
 
+    @timed('pdf_line_grouping')
     def _calculate_line_spacing(self, words: list) -> list:
         """Calculate vertical spacing between lines of text"""
         if not words:
@@ -813,55 +1022,49 @@ class PDFTextExtractor:
         extracted_lines = []
         last_y_position = None
 
-        with pdfplumber.open(self.pdf_input) as pdf:
-            headers, footers = self.detect_headers_footers(pdf.pages)
+        pages = self.load_pages()
+        line_filter = self._get_line_filter()
 
-            for page_num, page in enumerate(pdf.pages, 1):
-                words = page.extract_words(
-                    keep_blank_chars=True,
-                    use_text_flow=True,
-                    x_tolerance=1,
-                    y_tolerance=3
-                )
+        for page in pages:
+            words = page.words
 
-                if not words:
-                    continue
+            if not words:
+                continue
 
-                if include_page_numbers:
-                    extracted_lines.append(f'Page {page_num}')
+            if include_page_numbers:
+                extracted_lines.append(f'Page {page.page_num}')
 
-                line_groups = self._calculate_line_spacing(words)
+            line_groups = self._calculate_line_spacing(words)
 
-                for group in line_groups:
-                    # combine words in the line
-                    line_text = ' '.join(w['text'] for w in group['words'])
-                    line_text = self.clean_text(line_text)
+            for group in line_groups:
+                # combine words in the line
+                line_text = ' '.join(w['text'] for w in group['words'])
+                line_text = self.clean_text(line_text)
 
-                    if line_text \
-                        and not any(header in line_text for header in headers) \
-                        and not any(footer in line_text for footer in footers) \
-                        and not any(re.search(pattern, line_text, re.IGNORECASE) for pattern in self.FOOTER_PATTERNS) \
-                        and (include_page_numbers or not any(re.match(pattern, line_text, re.IGNORECASE) for pattern in self.PAGE_NUMBER_PATTERNS)) \
-                        and len(line_text) > 1:
+                if line_text \
+                    and not line_filter.contains_header_footer(line_text) \
+                    and not line_filter.is_footer_pattern(line_text) \
+                    and (include_page_numbers or not line_filter.is_page_number(line_text)) \
+                    and len(line_text) > 1:
 
-                        # only add newline for significant paragraph breaks
-                        if last_y_position is not None:
-                            spacing = group['top'] - last_y_position
-                            if spacing > page.height * 0.06:  # ~6% of page height
-                                extracted_lines.extend(('', line_text))
-                            else:
-                                # append to previous line if it exists and not a significant break
-                                if extracted_lines and extracted_lines[-1]:
-                                    extracted_lines[-1] = extracted_lines[-1] + ' ' + line_text
-                                else:
-                                    extracted_lines.append(line_text)
+                    # only add newline for significant paragraph breaks
+                    if last_y_position is not None:
+                        spacing = group['top'] - last_y_position
+                        if spacing > page.height * 0.06:  # ~6% of page height
+                            extracted_lines.extend(('', line_text))
                         else:
-                            extracted_lines.append(line_text)
-                        last_y_position = group['top']
+                            # append to previous line if it exists and not a significant break
+                            if extracted_lines and extracted_lines[-1]:
+                                extracted_lines[-1] = extracted_lines[-1] + ' ' + line_text
+                            else:
+                                extracted_lines.append(line_text)
+                    else:
+                        extracted_lines.append(line_text)
+                    last_y_position = group['top']
 
-                # reset position tracking between pages
-                last_y_position = None
-                extracted_lines.append('')
+            # reset position tracking between pages
+            last_y_position = None
+            extracted_lines.append('')
 
         return [line for line in extracted_lines if line is not None]
 
@@ -869,35 +1072,31 @@ class PDFTextExtractor:
         """Main extraction method"""
         content = []
 
-        with pdfplumber.open(self.pdf_input) as pdf:
-            # First detect headers/footers
-            headers, footers = self.detect_headers_footers(pdf.pages)
+        pages = self.load_pages()
+        # First detect headers/footers
+        headers, footers = self._get_headers_footers()
 
-            for page_num, page in enumerate(pdf.pages, 1):
-                logger.debug(f'Processing page {page_num}')
+        if self.doc_metrics is None:
+            self.doc_metrics = self._analyze_document_metrics(pages)
 
-                # Extract words with all needed properties
-                words = page.extract_words(
-                    keep_blank_chars=True,
-                    use_text_flow=True,
-                    x_tolerance=1,
-                    y_tolerance=3,
-                    extra_attrs=['fontname', 'size', 'weight', 'upright']
-                )
+        for page in pages:
+            logger.debug(f'Processing page {page.page_num}')
 
-                if not words:
-                    continue
+            words = page.words
 
-                # Process page content
-                page_content = self._process_page_content(
-                    words,
-                    page,
-                    headers,
-                    footers,
-                    include_page_numbers
-                )
+            if not words:
+                continue
+
+            # Process page content
+            page_content = self._process_page_content(
+                words,
+                page,
+                headers,
+                footers,
+                include_page_numbers
+            )
 
-                content.extend(page_content)
+            content.extend(page_content)
 
         return self._format_content(content)
 
@@ -1045,71 +1244,77 @@ class PDFTextExtractor:
         current_list_items = []
         last_indent = None
 
-        with pdfplumber.open(self.pdf_input) as pdf:
-            headers, footers = self.detect_headers_footers(pdf.pages)
+        pages = self.load_pages()
+        line_filter = self._get_line_filter()
 
-            for page_num, page in enumerate(pdf.pages, 1):
-                words = page.extract_words(
-                    keep_blank_chars=True,
-                    use_text_flow=True,
-                    x_tolerance=1,
-                    y_tolerance=3,
-                    extra_attrs=['fontname', 'size']
-                )
+        for page in pages:
+            words = page.words
 
-                if include_page_numbers:
-                    extracted_lines.append({
-                        'text': f'Page {page_num}',
-                        'type': 'page_number'
-                    })
+            if include_page_numbers:
+                extracted_lines.append({
+                    'text': f'Page {page.page_num}',
+                    'type': 'page_number'
+                })
 
-                if not words:
-                    continue
+            if not words:
+                continue
 
-                line_groups = self._calculate_line_spacing(words)
+            line_groups = self._calculate_line_spacing(words)
 
-                for group in line_groups:
-                    line_text = ' '.join(w['text'] for w in group['words'])
-                    line_text = self.clean_text(line_text)
+            for group in line_groups:
+                line_text = ' '.join(w['text'] for w in group['words'])
+                line_text = self.clean_text(line_text)
 
-                    # skip headers, footers and empty lines without adding breaks
-                    if line_text in headers \
-                        or line_text in footers \
-                        or any(re.search(pattern, line_text, re.IGNORECASE) for pattern in self.FOOTER_PATTERNS) \
-                        or any(re.match(pattern, line_text, re.IGNORECASE) for pattern in self.PAGE_NUMBER_PATTERNS) \
-                        or not line_text:
-                        continue
+                # skip headers, footers and empty lines without adding breaks
+                if line_filter.is_header_footer(line_text) \
+                    or line_filter.is_footer_pattern(line_text) \
+                    or line_filter.is_page_number(line_text) \
+                    or not line_text:
+                    continue
 
-                    # Get indentation level
-                    current_indent = group['words'][0].get('x0', 0)
+                # Get indentation level
+                current_indent = group['words'][0].get('x0', 0)
 
-                    # Check if this is a list item
-                    is_list_item = self._is_list_item(line_text, current_indent, page.width)
+                # Check if this is a list item
+                is_list_item = self._is_list_item(line_text, current_indent, page.width)
 
-                    if is_list_item:
-                        if not in_list:
-                            in_list = True
-                        current_list_items.append({
+                if is_list_item:
+                    if not in_list:
+                        in_list = True
+                    current_list_items.append({
+                        'text': line_text,
+                        'spacing_after': group['spacing_after'],
+                        'bold': group['bold'],
+                        'italic': group['italic']
+                    })
+                else:
+                    # If we were in a list and hit non-list content, close the list
+                    if in_list and current_list_items:
+                        extracted_lines.append({
+                            'type': 'list',
+                            'items': current_list_items,
+                            'spacing_after': current_list_items[-1]['spacing_after']
+                        })
+                        current_list_items = []
+                        in_list = False
+
+                    # Regular text handling
+                    if group['spacing_after'] > page.height * 0.06 or \
+                       group['heading_level'] or \
+                       (extracted_lines and extracted_lines[-1].get('heading_level')):
+                        extracted_lines.append({
                             'text': line_text,
-                            'spacing_after': group['spacing_after'],
+                            'type': 'text',
+                            'heading_level': group['heading_level'],
                             'bold': group['bold'],
-                            'italic': group['italic']
+                            'italic': group['italic'],
+                            'spacing_after': group['spacing_after']
                         })
                     else:
-                        # If we were in a list and hit non-list content, close the list
-                        if in_list and current_list_items:
-                            extracted_lines.append({
-                                'type': 'list',
-                                'items': current_list_items,
-                                'spacing_after': current_list_items[-1]['spacing_after']
-                            })
-                            current_list_items = []
-                            in_list = False
-
-                        # Regular text handling
-                        if group['spacing_after'] > page.height * 0.06 or \
-                           group['heading_level'] or \
-                           (extracted_lines and extracted_lines[-1].get('heading_level')):
+                        # append to previous text if it exists
+                        if extracted_lines and extracted_lines[-1]['type'] == 'text':
+                            extracted_lines[-1]['text'] += ' ' + line_text
+                        else:
                             extracted_lines.append({
                                 'text': line_text,
                                 'type': 'text',
@@ -1118,19 +1323,6 @@ class PDFTextExtractor:
                                 'italic': group['italic'],
                                 'spacing_after': group['spacing_after']
                             })
-                        else:
-                            # append to previous text if it exists
-                            if extracted_lines and extracted_lines[-1]['type'] == 'text':
-                                extracted_lines[-1]['text'] += ' ' + line_text
-                            else:
-                                extracted_lines.append({
-                                    'text': line_text,
-                                    'type': 'text',
-                                    'heading_level': group['heading_level'],
-                                    'bold': group['bold'],
-                                    'italic': group['italic'],
-                                    'spacing_after': group['spacing_after']
-                                })
 
         # Handle any remaining list items at end of document
         if current_list_items:
@@ -1140,7 +1332,8 @@ class PDFTextExtractor:
                 'spacing_after': current_list_items[-1]['spacing_after']
             })
 
-        return formatter(extracted_lines)
+        with span('pdf_format'):
+            return formatter(extracted_lines)
 
     def _classify_elements(self, elements):
         """Classify elements using document metrics context"""
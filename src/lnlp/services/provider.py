@@ -1,30 +1,178 @@
+import asyncio
 import logging
-import re
+import time
+from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack
+from pathlib import Path
+from weakref import WeakKeyDictionary
 
+import httpx
 from lnlp.config import get_settings
-from lnlp.schemas.chat import ProviderRequest, ProviderResponse
-from lnlp.services.models import get_latest_haiku
-from openai import AsyncOpenAI
+from lnlp.schemas.chat import ModelInfo, ProviderRequest, ProviderResponse
+from lnlp.services.coalescing import SingleFlight
+from lnlp.services.models import CatalogueSnapshot, model_catalogue, resolve_latest_model
+from lnlp.services.ratelimit import RateLimiter
+from lnlp.services.resilience import Resilience
+from lnlp.services.response_cache import MemoryCacheBackend, RedisCacheBackend, ResponseCache
+from lnlp.services.tickers import TickerCache, find_company_name, find_exchange_ticker, parse_ticker_reply, same_company
+from lnlp.services.tokens import token_counter
+from lnlp.utils.metrics import metrics_service
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 
 logger = logging.getLogger(__name__)
 
+TICKER_RESPONSE_FORMAT = {
+    'type': 'json_schema',
+    'json_schema': {
+        'name': 'ticker',
+        'strict': True,
+        'schema': {
+            'type': 'object',
+            'properties': {
+                'company_name': {'type': ['string', 'null']},
+                'ticker': {'type': ['string', 'null']},
+            },
+            'required': ['company_name', 'ticker'],
+            'additionalProperties': False,
+        },
+    },
+}
+
+
+def _trace_new_connections(request: httpx.Request):
+    """Attach an httpcore trace hook that flags requests opening a new TCP connection"""
+    async def trace(event_name: str, info: dict):
+        if event_name == 'connection.connect_tcp.complete':
+            request.extensions['lnlp_new_connection'] = True
+    request.extensions['trace'] = trace
+
+
+async def _on_request(request: httpx.Request):
+    _trace_new_connections(request)
+
+
+async def _on_response(response: httpx.Response):
+    new_connection = response.request.extensions.get('lnlp_new_connection', False)
+    metrics_service.track_connection('openrouter', new_connection=new_connection)
+
+
+def _record_usage(usage: dict | None):
+    """Count the tokens an upstream completion consumed"""
+    if usage:
+        metrics_service.increment('openrouter_prompt_tokens', usage.get('prompt_tokens') or 0)
+        metrics_service.increment('openrouter_completion_tokens', usage.get('completion_tokens') or 0)
+
 
 class LLMProvider:
     """Unified provider for LLM API access with automatic parameter optimization"""
 
-    _models_cache = None
     DEFAULT_TEMPERATURE = 0.1
 
+    # leading slice of a transcript shown to the model when naming the company
+    TICKER_CONTEXT_TOKENS = 750
+
     def __init__(self):
         settings = get_settings()
 
         self.openrouter_key = settings.openrouter_api_key
+        self.openrouter_base_url = settings.openrouter_base_url
         self.openrouter_referer = settings.openrouter_referer
         self.openrouter_title = settings.openrouter_title
 
+        self.max_connections = settings.openrouter_max_connections
+        self.keepalive_expiry = settings.openrouter_keepalive_expiry
+        self.timeout = settings.openrouter_timeout
+        self.connect_timeout = settings.openrouter_connect_timeout
+
+        # one pooled client per event loop, since httpx pools are loop-bound
+        self._clients = WeakKeyDictionary()
+
+        self.response_cache = self._create_response_cache(settings)
+
+        ticker_path = Path.home() / '.cache' / 'libb-nlp' / 'tickers.json' if settings.ticker_cache_disk else None
+        self.ticker_cache = TickerCache(ticker_path)
+
+        # identical concurrent upstream calls share one request
+        self._inflight = SingleFlight('openrouter')
+
+        self.rate_limiter = RateLimiter(
+            max_concurrency=settings.llm_max_concurrency,
+            tokens_per_minute=settings.llm_tokens_per_minute,
+            max_queue=settings.llm_max_queue,
+            max_wait=settings.llm_max_queue_wait,
+            overrides=settings.llm_limits
+        )
+
+        # retries live here rather than in the client so they pass through the limiter
+        self.resilience = Resilience(
+            max_attempts=settings.llm_max_attempts,
+            base_delay=settings.llm_retry_base_delay,
+            max_delay=settings.llm_retry_max_delay,
+            deadline=settings.llm_request_deadline,
+            hedge=settings.llm_hedge,
+            hedge_min_delay=settings.llm_hedge_min_delay,
+            failure_threshold=settings.llm_circuit_failures,
+            reset_timeout=settings.llm_circuit_reset
+        )
+
         if not self.openrouter_key:
             logger.warning('OpenRouter API key not configured - LLM features will be unavailable')
 
+    def _create_response_cache(self, settings) -> ResponseCache | None:
+        """Build the opt-in chat completion cache from settings"""
+        backend = settings.response_cache_backend
+        if backend == 'memory':
+            cache_backend = MemoryCacheBackend(max_entries=settings.response_cache_max_entries)
+        elif backend == 'redis':
+            cache_backend = RedisCacheBackend(url=settings.redis_url)
+        elif backend in {'', 'none'}:
+            return None
+        else:
+            raise ValueError(f'Unknown response cache backend: {backend}')
+
+        logger.info(f'Chat response cache enabled ({backend}, ttl={settings.response_cache_ttl}s)')
+        return ResponseCache(cache_backend, default_ttl=settings.response_cache_ttl)
+
+    def _create_client(self) -> AsyncOpenAI:
+        """Build an OpenRouter client on a tuned, long-lived connection pool"""
+        http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=self.keepalive_expiry
+            ),
+            timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+            event_hooks={'request': [_on_request], 'response': [_on_response]}
+        )
+        return AsyncOpenAI(
+            api_key=self.openrouter_key,
+            base_url=self.openrouter_base_url,
+            default_headers={
+                'HTTP-Referer': self.openrouter_referer,
+                'X-Title': self.openrouter_title
+            },
+            http_client=http_client,
+            max_retries=0
+        )
+
+    def _get_client(self) -> AsyncOpenAI:
+        """Get the shared client for the running event loop"""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = self._create_client()
+            self._clients[loop] = client
+            logger.info(f'Created pooled OpenRouter client (max_connections={self.max_connections}, '
+                        f'keepalive_expiry={self.keepalive_expiry}s)')
+        return client
+
+    async def aclose(self):
+        """Close the client owned by the running event loop"""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+            logger.info('Closed pooled OpenRouter client')
+
     def _strip_openrouter_prefix(self, model: str) -> str:
         """Remove openrouter/ prefix from model name if present"""
         if model.startswith('openrouter/'):
@@ -32,27 +180,82 @@ class LLMProvider:
         return model
 
     async def _get_model_info(self, model: str) -> dict | None:
-        """Get model information from OpenRouter API"""
-        models = await self._fetch_openrouter_models()
-        for model_info in models:
-            if model_info['id'] == model:
-                return model_info
-        return None
+        """Get model information from the OpenRouter model catalogue"""
+        snapshot = await self._get_catalogue()
+        return snapshot.lookup(model) if snapshot is not None else None
+
+    async def context_length(self, model: str) -> int | None:
+        """Context window of a model in tokens, or None when the catalogue does not know it"""
+        model_info = await self._get_model_info(self._strip_openrouter_prefix(model))
+        return (model_info or {}).get('context_length')
 
     async def query(self, request: ProviderRequest) -> ProviderResponse:
         """Send chat completion request to OpenRouter with optimized parameters"""
         if not self.openrouter_key:
             raise ValueError('OpenRouter API key not configured')
 
+        params, prompt_tokens = await self._openrouter_params(request)
         total_chars = sum(len(m.content) for m in request.messages)
-        estimated_tokens = total_chars // 4
         logger.info(f'Query request - Model: {request.model}, Messages: {len(request.messages)}, '
-                    f'Total chars: {total_chars:,}, Estimated tokens: {estimated_tokens:,}')
+                    f'Total chars: {total_chars:,}, Prompt tokens: {prompt_tokens:,}, '
+                    f'max_tokens: {params.get("max_tokens", "unspecified")}')
+
+        cache_key = ResponseCache.make_key(params)
+        use_cache = self.response_cache is not None and not request.bypass_cache
+
+        if use_cache:
+            cached = await self.response_cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f'Serving cached response for {params["model"]}')
+                return cached
+
+        async def complete() -> ProviderResponse:
+            response = await self._call_upstream(params, prompt_tokens, lambda: self._openrouter_completion(params))
+            if self.response_cache is not None:
+                await self.response_cache.set(cache_key, response, ttl=request.cache_ttl)
+            return response
+
+        return await self._inflight.do(f'query:{cache_key}', complete)
+
+    async def query_batch(self, requests: list[ProviderRequest],
+                          max_concurrency: int) -> AsyncIterator[tuple[int, ProviderResponse | Exception]]:
+        """Run many queries with at most `max_concurrency` in flight.
+
+        Yields `(index, result)` pairs in completion order, where result is the
+        exception for a request that failed. Each item goes through `query`,
+        so it shares the pooled client, rate limiter and response cache.
+        Closing the generator cancels the requests still running.
+        """
+        pending = iter(enumerate(requests))
+        completed = asyncio.Queue()
+
+        async def worker():
+            for index, request in pending:
+                try:
+                    result = await self.query(request)
+                except Exception as e:
+                    result = e
+                await completed.put((index, result))
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(max_concurrency, len(requests)))]
+        try:
+            for _ in range(len(requests)):
+                yield await completed.get()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _openrouter_params(self, request: ProviderRequest) -> tuple[dict, int]:
+        """Build OpenRouter completion parameters with automatic optimization.
 
-        return await self._openrouter_completion(request)
+        max_tokens is clamped to the context left after the prompt and to the
+        model's completion limit, so upstream neither rejects the request nor
+        reserves more than can be generated.
 
-    async def _openrouter_completion(self, request: ProviderRequest) -> ProviderResponse:
-        """Handle OpenRouter API requests with automatic parameter optimization"""
+        Returns
+            Tuple of (params, prompt_tokens)
+        """
         model = self._strip_openrouter_prefix(request.model)
 
         model_info = await self._get_model_info(model)
@@ -65,23 +268,35 @@ class LLMProvider:
             'temperature': self.DEFAULT_TEMPERATURE,
         }
 
-        if request.max_tokens is not None:
-            params['max_tokens'] = request.max_tokens
-        elif model_info and model_info.get('context_length'):
-            params['max_tokens'] = model_info['context_length']
+        prompt_tokens = token_counter.count_messages(params['messages'], model)
+        max_tokens = request.max_tokens
+        model_info = model_info or {}
+
+        context_length = model_info.get('context_length')
+        if context_length:
+            available = context_length - prompt_tokens
+            if available <= 0:
+                raise ValueError(f'Prompt of about {prompt_tokens:,} tokens exceeds the '
+                                 f'{context_length:,} token context of {model}')
+            max_tokens = min(max_tokens or available, available)
 
-        logger.debug(f'Querying {model} with params: temperature={params["temperature"]}, '
+        max_completion = (model_info.get('top_provider') or {}).get('max_completion_tokens')
+        if max_completion:
+            max_tokens = min(max_tokens or max_completion, max_completion)
+
+        if max_tokens is not None:
+            params['max_tokens'] = max_tokens
+
+        return params, prompt_tokens
+
+    async def _openrouter_completion(self, params: dict) -> ProviderResponse:
+        """Handle OpenRouter API requests"""
+        logger.debug(f'Querying {params["model"]} with params: temperature={params["temperature"]}, '
                      f'max_tokens={params.get("max_tokens", "unspecified")}')
 
-        client = AsyncOpenAI(
-            api_key=self.openrouter_key,
-            base_url='https://openrouter.ai/api/v1',
-            default_headers={
-                'HTTP-Referer': self.openrouter_referer,
-                'X-Title': self.openrouter_title
-            }
-        )
+        client = self._get_client()
         response = await client.chat.completions.create(**params)
+        _record_usage(response.usage.model_dump())
 
         return ProviderResponse(
             id=response.id,
@@ -91,30 +306,127 @@ class LLMProvider:
             created=response.created
         )
 
-    async def _fetch_openrouter_models(self) -> list[dict]:
-        """Fetch available models from OpenRouter API with caching"""
+    async def stream(self, request: ProviderRequest) -> AsyncIterator[dict]:
+        """Stream a chat completion from OpenRouter as delta events.
 
-        if self._models_cache is not None:
-            return self._models_cache
+        Yields `{'event': 'delta', ...}` for each content fragment and a final
+        `{'event': 'done', ...}` carrying usage. Closing the generator (for
+        example when the client disconnects) closes the upstream stream, which
+        aborts the OpenRouter request.
+        """
+        if not self.openrouter_key:
+            raise ValueError('OpenRouter API key not configured')
+
+        params, prompt_tokens = await self._openrouter_params(request)
+        params['stream'] = True
+        params['stream_options'] = {'include_usage': True}
+
+        logger.info(f'Stream request - Model: {params["model"]}, Messages: {len(request.messages)}, '
+                    f'Prompt tokens: {prompt_tokens:,}')
+
+        started = time.monotonic()
+        first_token = None
+        response_id = response_model = finish_reason = None
+        usage = None
+
+        client = self._get_client()
+
+        async def open_stream():
+            # each attempt takes its own slot, so retry backoff never holds one
+            slot = AsyncExitStack()
+            await slot.enter_async_context(self.rate_limiter.acquire(params['model'], prompt_tokens))
+            try:
+                return await client.chat.completions.create(**params), slot
+            except BaseException:
+                await slot.aclose()
+                raise
+
+        # retry opening the stream, but never hedge or replay one that has started
+        upstream, slot = await self.resilience.call(params['model'], open_stream, hedge=False)
+        async with slot:
+            try:
+                async for chunk in upstream:
+                    response_id = response_id or chunk.id
+                    response_model = response_model or chunk.model
+                    if chunk.usage is not None:
+                        usage = chunk.usage.model_dump()
+                    if not chunk.choices:
+                        continue
+
+                    choice = chunk.choices[0]
+                    finish_reason = choice.finish_reason or finish_reason
+                    if choice.delta and choice.delta.content:
+                        if first_token is None:
+                            first_token = time.monotonic() - started
+                            metrics_service.observe('openrouter_time_to_first_token', first_token)
+                            logger.debug(f'First token from {params["model"]} after {first_token:.3f}s')
+                        yield {'event': 'delta', 'content': choice.delta.content}
+            finally:
+                await upstream.close()
+                _record_usage(usage)
+
+        yield {
+            'event': 'done',
+            'id': response_id,
+            'model': response_model,
+            'finish_reason': finish_reason,
+            'usage': usage,
+            'time_to_first_token': first_token,
+        }
+
+    async def _call_upstream(self, params: dict, prompt_tokens: int, call):
+        """Run an upstream call with retries, each attempt admitted by the rate limiter"""
+        async def attempt():
+            async with self.rate_limiter.acquire(params['model'], prompt_tokens):
+                started = time.monotonic()
+                try:
+                    return await call()
+                finally:
+                    metrics_service.observe('openrouter_upstream_latency', time.monotonic() - started)
+
+        return await self.resilience.call(params['model'], attempt)
+
+    async def _create_completion(self, params: dict):
+        """Send a raw completion, sharing it with identical in-flight calls"""
+        client = self._get_client()
+        prompt_tokens = token_counter.count_messages(params['messages'], params['model'])
+
+        async def create():
+            response = await self._call_upstream(params, prompt_tokens,
+                                                 lambda: client.chat.completions.create(**params))
+            _record_usage(response.usage.model_dump() if getattr(response, 'usage', None) else None)
+            return response
+
+        return await self._inflight.do(f'create:{ResponseCache.make_key(params)}', create)
+
+    async def _list_openrouter_models(self) -> list[dict]:
+        """Fetch the model list from the OpenRouter API"""
+        client = self._get_client()
+        models_response = await client.models.list()
+        return [model.model_dump() for model in models_response.data]
 
+    async def _get_catalogue(self) -> CatalogueSnapshot | None:
+        """Get the indexed model catalogue, fetching it on first use"""
         if not self.openrouter_key:
             logger.warning('OpenRouter API key not configured - cannot fetch models')
-            return []
+            return None
 
-        client = AsyncOpenAI(
-            api_key=self.openrouter_key,
-            base_url='https://openrouter.ai/api/v1',
-            default_headers={
-                'HTTP-Referer': self.openrouter_referer,
-                'X-Title': self.openrouter_title
-            }
-        )
+        return await model_catalogue.get(self._list_openrouter_models)
 
-        models_response = await client.models.list()
-        self._models_cache = [model.dict() for model in models_response.data]
+    async def _fetch_openrouter_models(self) -> list[dict]:
+        """Fetch available models from OpenRouter API with caching"""
+        snapshot = await self._get_catalogue()
+        return snapshot.models if snapshot is not None else []
 
-        logger.debug(f'Fetched {len(self._models_cache)} models from OpenRouter API')
-        return self._models_cache
+    async def refresh_models_forever(self):
+        """Refresh the model catalogue on its TTL until cancelled"""
+        await model_catalogue.run_refresh_loop(self._list_openrouter_models)
+
+    async def get_latest_model(self, family: str) -> str:
+        """Resolve the latest Anthropic model in a family (haiku, sonnet, opus)"""
+        if not self.openrouter_key:
+            raise ValueError('OpenRouter API key not configured')
+        return await resolve_latest_model(family, self._list_openrouter_models)
 
     async def get_available_models(self) -> list[tuple[str, int | None]]:
         """Get list of available models with context lengths from OpenRouter"""
@@ -123,17 +435,29 @@ class LLMProvider:
             return []
 
         try:
-            openrouter_models = await self._fetch_openrouter_models()
-            return [
-                (f"openrouter/{model['id']}", model.get('context_length'))
-                for model in openrouter_models
-            ]
+            return (await self._get_catalogue()).available
+        except Exception as e:
+            logger.error(f'Failed to fetch OpenRouter models: {e}')
+            return []
+
+    async def get_model_listing(self) -> list[ModelInfo]:
+        """Get the precomputed /models response from the catalogue"""
+        if not self.openrouter_key:
+            logger.warning('OpenRouter API key not configured - no models available')
+            return []
+
+        try:
+            return (await self._get_catalogue()).listing
         except Exception as e:
             logger.error(f'Failed to fetch OpenRouter models: {e}')
             return []
 
     async def extract_ticker(self, text: str) -> tuple[str | None, str | None]:
-        """Extract company ticker symbol from source text using LLM.
+        """Extract company ticker symbol from source text.
+
+        Tries, in order: an explicit listing such as "(NASDAQ: SPOT)" in the
+        header, the ticker cache keyed by the company named in the call
+        greeting, and finally a single LLM call returning both fields.
 
         Args
             text: Source text to extract ticker from (e.g., earnings transcript)
@@ -141,74 +465,67 @@ class LLMProvider:
         Returns
             Tuple of (ticker_symbol, company_name)
         """
+        logger.info(f'Ticker extraction - Input text length: {len(text):,} chars')
+
+        ticker, company_name = find_exchange_ticker(text)
+        if ticker:
+            company_name = company_name or self.ticker_cache.by_ticker(ticker)
+            if company_name:
+                await self.ticker_cache.set(ticker, company_name)
+            metrics_service.increment('ticker_listing_matched')
+            logger.debug(f'Found exchange listing in header: {ticker} ({company_name})')
+            return ticker, company_name
+
+        local_name = find_company_name(text)
+        cached = self.ticker_cache.get(local_name) if local_name else None
+        if cached is not None:
+            metrics_service.increment('ticker_cache_hit')
+            logger.debug(f'Ticker cache hit for {local_name}: {cached[0]}')
+            return cached
+
+        ticker, company_name = await self._extract_ticker_llm(text)
+        if ticker and company_name:
+            # only alias the greeting's name when it really is this company
+            aliases = (local_name,) if local_name and same_company(local_name, company_name) else ()
+            await self.ticker_cache.set(ticker, company_name, *aliases)
+        return ticker, company_name
+
+    async def _extract_ticker_llm(self, text: str) -> tuple[str | None, str | None]:
+        """Ask the model for the company name and ticker in one structured call"""
         if not self.openrouter_key:
             raise ValueError('OpenRouter API key required for ticker extraction')
 
-        logger.info(f'Ticker extraction - Input text length: {len(text):,} chars, '
-                    f'Estimated tokens: {len(text) // 4:,}')
-
-        client = AsyncOpenAI(
-            api_key=self.openrouter_key,
-            base_url='https://openrouter.ai/api/v1',
-            default_headers={
-                'HTTP-Referer': self.openrouter_referer,
-                'X-Title': self.openrouter_title
-            }
-        )
+        haiku_model = await self.get_latest_model('haiku')
+        excerpt = token_counter.truncate(text, self.TICKER_CONTEXT_TOKENS, haiku_model)
+        metrics_service.increment('ticker_llm_calls')
+        logger.info(f'Ticker extraction via {haiku_model} - Excerpt tokens: {token_counter.count(excerpt, haiku_model):,}')
 
-        haiku_model = get_latest_haiku()
+        prompt = """Identify the company this earnings transcript is about and its primary stock ticker symbol.
+Reply with only a JSON object: {"company_name": "...", "ticker": "..."} (e.g. "AAPL", "TSLA", "MSFT").
+Use null for a field you cannot determine."""
 
-        company_name_prompt = """Extract only the company name from this earnings transcript.
-Reply with just the company name, nothing else. No explanations."""
+        params = {
+            'model': haiku_model,
+            'messages': [{'role': 'user', 'content': f'{prompt}\n\n{excerpt}'}],
+            'max_tokens': 100,
+            'temperature': 0,
+        }
+        model_info = await self._get_model_info(haiku_model) or {}
+        if 'structured_outputs' in (model_info.get('supported_parameters') or []):
+            params['response_format'] = TICKER_RESPONSE_FORMAT
 
         try:
-            response = await client.chat.completions.create(
-                model=haiku_model,
-                messages=[{'role': 'user', 'content': f'{company_name_prompt}\n\n{text[:3000]}'}],
-                max_tokens=100,
-                temperature=0,
-            )
-            company_name = response.choices[0].message.content.strip()
-
-            if not company_name:
-                logger.warning('Failed to extract company name from text')
-                return None, None
-
-            logger.debug(f'Extracted company name: {company_name}')
+            response = await self._create_completion(params)
+            reply = (response.choices[0].message.content or '').strip()
         except Exception as e:
-            logger.error(f'Error extracting company name: {e}')
+            logger.error(f'Error extracting ticker symbol: {e}')
             return None, None
 
-        ticker_prompt = f"""What is the stock ticker symbol for {company_name}?
-Reply with ONLY the ticker symbol itself (e.g., AAPL, TSLA, MSFT).
-Do not include any explanation, markdown, formatting, or additional information. Just the ticker."""
+        ticker, company_name = parse_ticker_reply(reply)
+        if not company_name:
+            logger.warning('Failed to extract company name from text')
+        if not ticker:
+            logger.warning(f'Could not extract valid ticker from response: {reply[:100]}')
 
-        try:
-            response = await client.chat.completions.create(
-                model=haiku_model,
-                messages=[{'role': 'user', 'content': ticker_prompt}],
-                max_tokens=50,
-                temperature=0,
-            )
-            ticker_response = response.choices[0].message.content.strip()
-
-            match = re.search(r'\(([A-Z]{1,5})\)', ticker_response)
-            if match:
-                ticker = match.group(1)
-            else:
-                match = re.search(r'\b([A-Z]{1,5})\b', ticker_response)
-                if match:
-                    ticker = match.group(1)
-                else:
-                    ticker = re.sub(r'[^A-Z]', '', ticker_response.upper())[:5]
-
-            if not ticker:
-                logger.warning(f'Could not extract valid ticker from response: {ticker_response}')
-                return None, company_name
-
-            logger.debug(f'Extracted ticker from response: {ticker_response[:100]} -> {ticker}')
-            return ticker, company_name
-
-        except Exception as e:
-            logger.error(f'Error extracting ticker symbol: {e}')
-            return None, company_name
+        logger.debug(f'Extracted ticker from response: {reply[:100]} -> {ticker} ({company_name})')
+        return ticker, company_name
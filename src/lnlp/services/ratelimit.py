@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from lnlp.utils.metrics import metrics_service
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    'RateLimitExceeded',
+    'ModelLimiter',
+    'RateLimiter',
+    'model_family',
+]
+
+MODEL_FAMILIES = ('haiku', 'sonnet', 'opus')
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request cannot be admitted within the queue bounds"""
+
+    def __init__(self, message: str, retry_after: float, status_code: int = 429):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+
+def model_family(model: str) -> str:
+    """Map a model id to the family its limits are configured under"""
+    model = model.removeprefix('openrouter/')
+    for family in MODEL_FAMILIES:
+        if family in model:
+            return family
+    return model.split('/')[0] if '/' in model else 'default'
+
+
+class TokenBucket:
+    """Tokens-per-minute bucket; capacity is one minute of tokens"""
+
+    def __init__(self, tokens_per_minute: int):
+        self.rate = tokens_per_minute / 60
+        self.capacity = tokens_per_minute
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, tokens: int) -> float:
+        """Seconds until `tokens` would be available"""
+        self._refill()
+        deficit = min(tokens, self.capacity) - self._tokens
+        return max(deficit, 0) / self.rate
+
+    async def acquire(self, tokens: int, deadline: float):
+        tokens = min(tokens, self.capacity)
+        while True:
+            wait = self.wait_time(tokens)
+            if wait <= 0:
+                self._tokens -= tokens
+                return
+            if time.monotonic() + wait > deadline:
+                raise RateLimitExceeded(f'Token budget exhausted, {tokens:,} tokens needed', retry_after=wait, status_code=503)
+            await asyncio.sleep(wait)
+
+
+class ModelLimiter:
+    """Concurrency cap and token bucket for one model family.
+
+    Requests beyond `max_concurrency` queue for at most `max_wait` seconds;
+    once `max_queue` requests are already waiting new ones are rejected
+    immediately with 429. A request that cannot get a slot or its token
+    budget before the wait expires is rejected with 503.
+    """
+
+    def __init__(self, family: str, max_concurrency: int, tokens_per_minute: int = 0,
+                 max_queue: int = 64, max_wait: float = 30):
+        self.family = family
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._bucket = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self._waiting = 0
+
+    def _retry_after(self, tokens: int) -> float:
+        if self._bucket is not None:
+            return max(self._bucket.wait_time(tokens), 1)
+        return 1
+
+    @asynccontextmanager
+    async def acquire(self, tokens: int = 0):
+        """Hold a concurrency slot and `tokens` of budget for the duration of a call"""
+        if self._waiting >= self.max_queue:
+            metrics_service.increment(f'ratelimit_{self.family}_rejected')
+            raise RateLimitExceeded(f'Too many queued requests for {self.family} models',
+                                    retry_after=self._retry_after(tokens))
+
+        started = time.monotonic()
+        deadline = started + self.max_wait
+        self._waiting += 1
+        try:
+            try:
+                if self._semaphore.locked():
+                    await asyncio.wait_for(self._semaphore.acquire(), timeout=self.max_wait)
+                else:
+                    await self._semaphore.acquire()
+            except TimeoutError:
+                metrics_service.increment(f'ratelimit_{self.family}_timed_out')
+                raise RateLimitExceeded(f'Timed out waiting for a {self.family} request slot',
+                                        retry_after=self._retry_after(tokens), status_code=503)
+            try:
+                if self._bucket is not None and tokens:
+                    await self._bucket.acquire(tokens, deadline)
+            except BaseException:
+                self._semaphore.release()
+                raise
+        finally:
+            self._waiting -= 1
+            metrics_service.observe(f'ratelimit_{self.family}_queue_wait', time.monotonic() - started)
+
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+
+class RateLimiter:
+    """Registry of per-family limiters built from default and override settings"""
+
+    def __init__(self, max_concurrency: int = 16, tokens_per_minute: int = 0, max_queue: int = 64,
+                 max_wait: float = 30, overrides: dict[str, dict] | None = None):
+        self.defaults = {
+            'max_concurrency': max_concurrency,
+            'tokens_per_minute': tokens_per_minute,
+            'max_queue': max_queue,
+            'max_wait': max_wait,
+        }
+        self.overrides = overrides or {}
+        self._limiters = {}
+
+    def for_model(self, model: str) -> ModelLimiter:
+        family = model_family(model)
+        limiter = self._limiters.get(family)
+        if limiter is None:
+            options = {**self.defaults, **self.overrides.get(family, {})}
+            limiter = ModelLimiter(family, **options)
+            self._limiters[family] = limiter
+            logger.info(f'Created rate limiter for {family} models: {options}')
+        return limiter
+
+    def acquire(self, model: str, tokens: int = 0):
+        return self.for_model(model).acquire(tokens)
@@ -0,0 +1,238 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import openai
+from lnlp.services.ratelimit import RateLimitExceeded
+from lnlp.utils.metrics import metrics_service
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    'CircuitBreaker',
+    'CircuitOpenError',
+    'Resilience',
+    'is_retryable',
+]
+
+RETRYABLE_STATUS = {408, 409, 425, 429}
+
+
+class CircuitOpenError(RateLimitExceeded):
+    """Raised without calling upstream while a model's circuit is open"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message, retry_after=retry_after, status_code=503)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Whether an upstream failure is transient: rate limited, 5xx or a timeout"""
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code in RETRYABLE_STATUS or exc.status_code >= 500
+    return isinstance(exc, openai.APIConnectionError | TimeoutError)
+
+
+def retry_after(exc: BaseException) -> float | None:
+    """Seconds the upstream asked us to wait before retrying, if it said"""
+    response = getattr(exc, 'response', None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if 'retry-after-ms' in headers:
+            return float(headers['retry-after-ms']) / 1000
+        if 'retry-after' in headers:
+            return float(headers['retry-after'])
+    except ValueError:
+        pass
+    return None
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one model.
+
+    After `failure_threshold` transient failures in a row the circuit opens
+    and calls fail fast for `reset_timeout` seconds. The first call after
+    that is let through as a probe: success closes the circuit, failure
+    opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    def allow(self):
+        """Admit a call or raise CircuitOpenError"""
+        if self.state == self.CLOSED:
+            return
+        remaining = self._opened_at + self.reset_timeout - time.monotonic()
+        if self.state == self.OPEN and remaining <= 0:
+            self.state = self.HALF_OPEN
+            logger.info(f'Circuit for {self.name} half-open, sending probe')
+        if self.state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return
+        metrics_service.increment('openrouter_circuit_rejected')
+        raise CircuitOpenError(f'Upstream for {self.name} is failing, circuit open', retry_after=max(remaining, 1))
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            logger.info(f'Circuit for {self.name} closed')
+        self.state = self.CLOSED
+        self._failures = 0
+        self._probing = False
+
+    def record_failure(self):
+        self._failures += 1
+        self._probing = False
+        if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                metrics_service.increment('openrouter_circuit_opened')
+                logger.warning(f'Circuit for {self.name} opened after {self._failures} failures')
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def release(self):
+        """End a call whose outcome says nothing about upstream health"""
+        self._probing = False
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies"""
+
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, q: float, min_samples: int = 20) -> float | None:
+        if len(self._samples) < min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class Resilience:
+    """Retries, hedging and per-model circuit breaking for upstream calls.
+
+    `call` runs a zero-argument coroutine factory. Transient failures are
+    retried with full-jitter exponential backoff, honouring Retry-After,
+    until `max_attempts` or the per-request `deadline` is reached. With
+    hedging on, an attempt still running after the model's p95 latency (at
+    least `hedge_min_delay`) gets a duplicate request; the first success
+    wins and the other is cancelled.
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8,
+                 deadline: float = 120, hedge: bool = False, hedge_min_delay: float = 1,
+                 failure_threshold: int = 5, reset_timeout: float = 30):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers = {}
+        self._latency = {}
+
+    def breaker(self, model: str) -> CircuitBreaker:
+        if model not in self._breakers:
+            self._breakers[model] = CircuitBreaker(model, self.failure_threshold, self.reset_timeout)
+        return self._breakers[model]
+
+    def _tracker(self, model: str) -> LatencyTracker:
+        if model not in self._latency:
+            self._latency[model] = LatencyTracker()
+        return self._latency[model]
+
+    def backoff(self, attempt: int, exc: BaseException | None = None) -> float:
+        """Full-jitter delay before retry number `attempt`, at least any Retry-After"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        return max(delay, retry_after(exc) or 0) if exc is not None else delay
+
+    def hedge_delay(self, model: str) -> float | None:
+        """Delay before sending a hedge, or None until enough latencies are known"""
+        p95 = self._tracker(model).percentile(0.95)
+        return None if p95 is None else max(p95, self.hedge_min_delay)
+
+    async def call(self, model: str, factory: Callable[[], Awaitable[Any]], hedge: bool | None = None) -> Any:
+        """Run `factory` against `model` under the retry, hedge and breaker policy"""
+        breaker = self.breaker(model)
+        hedge = self.hedge if hedge is None else hedge
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+
+        while True:
+            attempt += 1
+            breaker.allow()
+            started = time.monotonic()
+            try:
+                delay = self.hedge_delay(model) if hedge else None
+                attempt_call = self._hedged(factory, delay) if delay is not None else factory()
+                result = await asyncio.wait_for(attempt_call, timeout=max(deadline - started, 0))
+            except Exception as e:
+                if not is_retryable(e):
+                    if isinstance(e, openai.APIStatusError):
+                        breaker.record_success()
+                    else:
+                        breaker.release()
+                    raise
+                breaker.record_failure()
+                wait = self.backoff(attempt, e)
+                if attempt >= self.max_attempts or time.monotonic() + wait >= deadline:
+                    metrics_service.increment('openrouter_retries_exhausted')
+                    logger.error(f'Giving up on {model} after {attempt} attempts: {e}')
+                    raise
+                metrics_service.increment('openrouter_retries')
+                logger.warning(f'Attempt {attempt} for {model} failed ({e}), retrying in {wait:.2f}s')
+                await asyncio.sleep(wait)
+                continue
+            except BaseException:
+                breaker.release()
+                raise
+
+            breaker.record_success()
+            self._tracker(model).record(time.monotonic() - started)
+            return result
+
+    async def _hedged(self, factory: Callable[[], Awaitable[Any]], delay: float) -> Any:
+        """Race the first request against a duplicate sent after `delay`"""
+        tasks = [asyncio.ensure_future(factory())]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                metrics_service.increment('openrouter_hedged')
+                tasks.append(asyncio.ensure_future(factory()))
+
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not tasks[0]:
+                            metrics_service.increment('openrouter_hedge_won')
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
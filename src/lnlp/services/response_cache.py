@@ -0,0 +1,135 @@
+import hashlib
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from threading import Lock
+
+from lnlp.schemas.chat import ProviderResponse
+from lnlp.utils.metrics import metrics_service
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    'ResponseCache',
+    'MemoryCacheBackend',
+    'RedisCacheBackend',
+]
+
+
+class ResponseCacheBackend(ABC):
+
+    @abstractmethod
+    async def get(self, key: str) -> str | None:
+        """Return the cached payload for key, or None
+        """
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: float | None = None) -> None:
+        """Store a payload, expiring after ttl seconds when given
+        """
+
+
+class MemoryCacheBackend(ResponseCacheBackend):
+    """In-process LRU bounded by entry count, with per-entry expiry.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    async def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value: str, ttl: float | None = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class RedisCacheBackend(ResponseCacheBackend):
+    """Redis-backed store shared by every worker and task.
+
+    Any `redis.asyncio`-compatible client can be passed in, which lets tests
+    use a local stand-in instead of a server.
+    """
+
+    def __init__(self, url: str | None = None, client=None, prefix: str = 'lnlp:chat:'):
+        if client is None:
+            import redis.asyncio as redis
+            client = redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> str | None:
+        value = await self.client.get(self.prefix + key)
+        return value.decode() if isinstance(value, bytes) else value
+
+    async def set(self, key: str, value: str, ttl: float | None = None) -> None:
+        await self.client.set(self.prefix + key, value, px=max(int(ttl * 1000), 1) if ttl is not None else None)
+
+
+class ResponseCache:
+    """Exact-match cache of chat completion responses.
+
+    Keys are a SHA-256 over the canonical JSON of the parameters actually
+    sent upstream (model, messages, max_tokens, temperature), so any change
+    that could alter the completion produces a different key. Backend errors
+    are logged and treated as misses.
+    """
+
+    def __init__(self, backend: ResponseCacheBackend, default_ttl: float | None = 86400, name: str = 'responses'):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.name = name
+
+    @staticmethod
+    def make_key(params: dict) -> str:
+        normalised = {
+            'model': params['model'],
+            'messages': params['messages'],
+            'max_tokens': params.get('max_tokens'),
+            'temperature': params.get('temperature'),
+        }
+        payload = json.dumps(normalised, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    async def get(self, key: str) -> ProviderResponse | None:
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            logger.warning(f'Response cache lookup failed: {e}')
+            value = None
+
+        if value is None:
+            metrics_service.track_cache(self.name, misses=1)
+            return None
+
+        response = ProviderResponse.model_validate_json(value)
+        metrics_service.track_cache(self.name, hits=1, tokens_saved=response.usage.total_tokens)
+        return response
+
+    async def set(self, key: str, response: ProviderResponse, ttl: float | None = None) -> None:
+        """Store a response for `ttl` seconds (the default when None); a ttl of 0 or less stores nothing"""
+        ttl = ttl if ttl is not None else self.default_ttl
+        if ttl is not None and ttl <= 0:
+            return
+        try:
+            await self.backend.set(key, response.model_dump_json(), ttl)
+        except Exception as e:
+            logger.warning(f'Response cache store failed: {e}')
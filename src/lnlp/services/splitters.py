@@ -3,14 +3,20 @@ import math
 import os
 import warnings
 from abc import ABC, abstractmethod
+from collections.abc import Callable
+from pathlib import Path
 from threading import Lock
 
 import numpy as np
 import regex as re
 import torch
 from langchain.text_splitter import SpacyTextSplitter
+from lnlp.config import get_settings
+from lnlp.services.batching import EncodeBatcher
 from lnlp.services.downloaders import download_sentence_transformer
 from lnlp.services.downloaders import download_spacy_model
+from lnlp.services.embedding_cache import EmbeddingCache
+from lnlp.utils.timing import span
 
 logger = logging.getLogger(__name__)
 
@@ -43,11 +49,16 @@ class TextSplitterSpacy(BaseTextSplitter):
         """
         download_spacy_model(model_name)
         self.splitter = SpacyTextSplitter(pipeline=model_name)
+        # the shared splitter is reconfigured per call
+        self._lock = Lock()
 
-    def split_text(self, text: str, chunk_size: int = 4000, chunk_overlap: int = 200) -> list[str]:
+    def split_text(self, text: str, chunk_size: int = 4000, chunk_overlap: int = 200,
+                   length_function: Callable[[str], int] = len) -> list[str]:
         r"""Break text into chunks of approximately max_chunk_size characters,
         respecting sentence boundaries using LangChain's SpacyTextSplitter.
 
+        Pass a token counter as `length_function` to size chunks in tokens.
+
         >>> chunker = TextSplitterSpacy()
         >>> text = ("Thanks, Ray. Good morning and thank you for joining us to discuss our results. Let me begin by"
         ... " thanking the employees across Winnebago Industries and our portfolio of outdoor recreation brands for their"
@@ -81,11 +92,14 @@ class TextSplitterSpacy(BaseTextSplitter):
         Chunk 5:The new vehicle was featured at last month's Hershey RV show and RV de...
         Chunk 6:In light of the continued market uncertainty, we are being appropriate...
         """
-        self.splitter._chunk_size = chunk_size
-        self.splitter._chunk_overlap = chunk_overlap
-        with warnings.catch_warnings():
+        with self._lock, warnings.catch_warnings():
+            self.splitter._chunk_size = chunk_size
+            self.splitter._chunk_overlap = chunk_overlap
+            self.splitter._length_function = length_function
             warnings.simplefilter('ignore', UserWarning)
-            return [s.replace('\n\n', ' ') for s in self.splitter.split_text(text)]
+            with span('spacy_split'):
+                chunks = self.splitter.split_text(text)
+            return [s.replace('\n\n', ' ') for s in chunks]
 
 
 class TextSplitterSimilarity(BaseTextSplitter):
@@ -102,6 +116,8 @@ class TextSplitterSimilarity(BaseTextSplitter):
         self.model_name = model_name
         self.seg = pysbd.Segmenter(language='en', clean=False)
         self._model = None  # Defer loading
+        self._batcher = None  # Optional cross-request encode batching
+        self._cache = None  # Optional content-addressed embedding cache
 
     @property
     def model(self):
@@ -110,82 +126,147 @@ class TextSplitterSimilarity(BaseTextSplitter):
             self._model = download_sentence_transformer(self.model_name)
         return self._model
 
+    def enable_batching(self, max_batch_size: int = 128, max_wait_ms: float = 5.0):
+        """Route encoding through a shared micro-batching scheduler"""
+        if self._batcher is None:
+            self._batcher = EncodeBatcher(self.model, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+
+    def enable_cache(self, cache: EmbeddingCache):
+        """Serve repeated sentences from an embedding cache"""
+        self._cache = cache
+
+    def close(self):
+        """Stop the batching scheduler if one was started"""
+        if self._batcher is not None:
+            self._batcher.close()
+            self._batcher = None
+
+    def _encode_uncached(self, sentences: list[str]) -> np.ndarray:
+        """Encode sentences, batching with concurrent callers when enabled"""
+        if self._batcher is not None:
+            return self._batcher.encode(sentences)
+        return self.model.encode(sentences)
+
+    def _encode(self, sentences: list[str]) -> np.ndarray:
+        """Encode sentences, sending only cache misses to the model"""
+        if self._cache is None or not sentences:
+            return self._encode_uncached(sentences)
+
+        cached = self._cache.get_many(self.model_name, sentences)
+        missing = list(dict.fromkeys(s for s, embedding in zip(sentences, cached) if embedding is None))
+        if missing:
+            encoded = self._encode_uncached(missing)
+            self._cache.put_many(self.model_name, missing, encoded)
+            fresh = dict(zip(missing, encoded))
+            cached = [fresh[s] if embedding is None else embedding for s, embedding in zip(sentences, cached)]
+
+        return np.stack(cached).astype(np.float32, copy=False)
+
     def _rev_sigmoid(self, x:float)->float:
         """Reversed sigmoid function"""
         return (1 / (1 + math.exp(0.5*x)))
 
-    def _activate_similarities(self, similarities:np.array, p_size=10)->np.array:
-        """Function returns list of weighted sums of activated sentence similarities
+    def _similarity_bands(self, embeddings:np.array, p_size=10)->np.array:
+        """Function returns the first p_size diagonals of the cosine similarity matrix
         Args:
-            similarities (numpy array): square matrix where each sentence corresponds to another with cosine similarity
+            embeddings (numpy array): normalised sentence embeddings, one row per sentence
+            p_size (int): number of diagonals to the right of the main diagonal to compute
+        Returns:
+            numpy array: p_size x N array where row k holds similarity(i, i+k), zero padded
+        """
+        n = embeddings.shape[0]
+        bands = np.zeros((min(p_size, n), n), dtype=embeddings.dtype)
+
+        # Only the offsets that carry activation weight are needed
+        for offset in range(bands.shape[0]):
+            bands[offset, :n-offset] = np.einsum('ij,ij->i', embeddings[:n-offset], embeddings[offset:])
+
+        return bands
+
+    def _activate_bands(self, bands:np.array, p_size=10)->np.array:
+        """Function returns list of weighted sums of activated similarity bands
+        Args:
+            bands (numpy array): p_size x N array of zero padded similarity diagonals
             p_size (int): number of sentences used to calculate weighted sum
         Returns:
             list: list of weighted sums
         """
         # If text is too short, return array of zeros
-        if similarities.shape[0] <= p_size:
-            return np.zeros(similarities.shape[0])
+        if bands.shape[1] <= p_size:
+            return np.zeros(bands.shape[1])
 
         # Create weights for sigmoid function
         x = np.linspace(-10,10,p_size)
         y = np.vectorize(self._rev_sigmoid)
-        activation_weights = np.pad(y(x),(0,similarities.shape[0]-p_size))
+        activation_weights = y(x)
 
-        # Take each diagonal to the right of the main diagonal
-        diagonals = [similarities.diagonal(each) for each in range(similarities.shape[0])]
+        # Apply activation weights to each diagonal
+        bands = bands[:p_size].copy()
+        bands *= activation_weights.reshape(-1, 1)
 
-        # Pad each diagonal with zeros at the end
-        diagonals = [np.pad(each, (0,similarities.shape[0]-len(each))) for each in diagonals]
+        # Calculate weighted sum of activated similarities
+        activated_similarities = np.sum(bands, axis=0)
 
-        # Stack diagonals into new matrix
-        diagonals = np.stack(diagonals)
+        return activated_similarities
 
-        # Apply activation weights to each row
-        diagonals *= activation_weights.reshape(-1, 1)
+    def _activate_similarities(self, similarities:np.array, p_size=10)->np.array:
+        """Function returns list of weighted sums of activated sentence similarities
+        Args:
+            similarities (numpy array): square matrix where each sentence corresponds to another with cosine similarity
+            p_size (int): number of sentences used to calculate weighted sum
+        Returns:
+            list: list of weighted sums
+        """
+        n = similarities.shape[0]
+        bands = np.zeros((min(p_size, n), n), dtype=similarities.dtype)
 
-        # Calculate weighted sum of activated similarities
-        activated_similarities = np.sum(diagonals, axis=0)
+        # Take each weighted diagonal to the right of the main diagonal
+        for offset in range(bands.shape[0]):
+            bands[offset, :n-offset] = similarities.diagonal(offset)
 
-        return activated_similarities
+        return self._activate_bands(bands, p_size=p_size)
 
     def _process_text(self, text: str):
-        """Process text and return sentences, similarities, activated
+        """Process text and return sentences, similarity bands, activated
         similarities and minimas
 
         Args:
             text (str): Input text to process
         Returns:
-            tuple: (sentences, similarities, activated_similarities, minimas)
+            tuple: (sentences, similarity bands, activated_similarities, minimas)
         """
         from scipy.signal import argrelextrema
-        from sklearn.metrics.pairwise import cosine_similarity
 
-        # Replace newlines
-        text = re.sub(r'[\n\r]', '', text).strip()
+        with span('similarity_segment'):
+            # Replace newlines
+            text = re.sub(r'[\n\r]', '', text).strip()
 
-        # Split text into sentences using pysbd
-        sentences = self.seg.segment(text)
+            # Split text into sentences using pysbd
+            sentences = self.seg.segment(text)
 
-        # Split into sentences again
-        sentences = text.split('. ')
+            # Split into sentences again
+            sentences = text.split('. ')
 
         # Get embeddings
-        embeddings = self.model.encode(sentences)
+        with span('similarity_encode'):
+            embeddings = self._encode(sentences)
 
-        # Normalize embeddings
-        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
-        embeddings /= norms
+        with span('similarity_scores'):
+            # Normalize embeddings
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= norms
 
-        # Calculate similarities
-        similarities = cosine_similarity(embeddings)
+            # Calculate only the banded similarities that get activation weight
+            bands = self._similarity_bands(embeddings, p_size=10)
 
-        # Get activated similarities
-        activated_similarities = self._activate_similarities(similarities, p_size=10)
+            # Get activated similarities
+            activated_similarities = self._activate_bands(bands, p_size=10)
 
         # Find relative minima
-        minimas = argrelextrema(activated_similarities, np.less, order=2)
+        with span('similarity_minima'):
+            minimas = argrelextrema(activated_similarities, np.less, order=2)
 
-        return sentences, similarities, activated_similarities, minimas
+        return sentences, bands, activated_similarities, minimas
 
     def split_text(self, text: str) -> list[str]:
         r"""Split text into paragraphs using sentence embeddings and similarity
@@ -301,9 +382,28 @@ class SplitterManager:
         with self._lock:
             if self._similarity_splitter is None:
                 self._similarity_splitter = TextSplitterSimilarity()
+                settings = get_settings()
+                if settings.encode_batch_wait_ms > 0 and settings.encode_max_batch_size > 1:
+                    self._similarity_splitter.enable_batching(
+                        max_batch_size=settings.encode_max_batch_size,
+                        max_wait_ms=settings.encode_batch_wait_ms
+                    )
+                if settings.embedding_cache_mb > 0:
+                    cache_dir = Path.home() / '.cache' / 'libb-nlp' / 'embeddings' if settings.embedding_cache_disk else None
+                    self._similarity_splitter.enable_cache(
+                        EmbeddingCache(max_bytes=settings.embedding_cache_mb * 1024**2, cache_dir=cache_dir)
+                    )
                 logger.info('Initialized similarity splitter')
             return self._similarity_splitter
 
+    def shutdown(self):
+        """Release loaded splitters and stop background batching"""
+        with self._lock:
+            if self._similarity_splitter is not None:
+                self._similarity_splitter.close()
+            self._spacy_splitter = None
+            self._similarity_splitter = None
+
     def health_check(self) -> dict:
         """Check health status of splitter instances."""
         return {
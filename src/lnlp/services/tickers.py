@@ -0,0 +1,182 @@
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import re
+import tempfile
+from pathlib import Path
+from threading import Lock
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    'TickerCache',
+    'find_company_name',
+    'find_exchange_ticker',
+    'parse_ticker_reply',
+    'same_company',
+]
+
+# how much of a transcript's opening is searched for identifying patterns
+HEADER_CHARS = 5000
+
+_TICKER = r'[A-Z]{1,5}(?:\.[A-Z])?'
+_EXCHANGES = r'NYSE(?:\s+American)?|NASDAQ|Nasdaq(?:GS|GM|CM)?|AMEX|TSXV?|LSE|ASX'
+# a word ending in "." (a sentence end or an abbreviation) ends the name
+_NAME = r"[A-Z][\w&.'-]*(?:(?<!\.),?\s+(?:[A-Z][\w&.'-]*|&|of|and|de))*?"
+
+EXCHANGE_PATTERNS = (
+    # Spotify Technology S.A. (NYSE: SPOT)
+    re.compile(rf'(?:({_NAME})\s*)?\((?:{_EXCHANGES})\s*:\s*({_TICKER})\)'),
+    # SPOT US Equity
+    re.compile(rf'()\b({_TICKER})\s+[A-Z]{{2}}\s+Equity\b'),
+    # Ticker: SPOT
+    re.compile(rf'()\b(?:Ticker|Symbol)\s*:\s*({_TICKER})\b'),
+)
+
+_PERIOD = r"(?:First|Second|Third|Fourth|Q[1-4]|FY|Fiscal|Full[- ]Year|Annual|\d{4})"
+COMPANY_PATTERNS = (
+    # welcome to Spotify's Fourth Quarter 2024 Earnings Call
+    re.compile(rf"\b[Ww]elcome (?:everyone )?to (?:the )?(?!{_PERIOD}\b)({_NAME})(?:'s|’s)?\s+{_PERIOD}\b"),
+    # Spotify Technology SA Q4 2024 Earnings Call
+    re.compile(rf'^\s*(?!{_PERIOD}\b)({_NAME})\s+{_PERIOD}\b[^.]{{0,40}}\bEarnings Call'),
+)
+
+_LEGAL_SUFFIXES = re.compile(
+    r'[,\s]+(?:inc|incorporated|corp|corporation|co|company|ltd|limited|plc|llc|lp|sa|s\.a|ag|nv|n\.v|se|group|holdings?)\.?$'
+)
+
+
+def normalise_company(name: str) -> str:
+    """Cache key for a company name, ignoring case, punctuation and legal suffixes"""
+    key = re.sub(r"['’]s$", '', name.strip().lower())
+    while True:
+        stripped = _LEGAL_SUFFIXES.sub('', key)
+        if stripped == key:
+            break
+        key = stripped
+    return re.sub(r'[^a-z0-9&]+', ' ', key).strip()
+
+
+def same_company(alias: str, company_name: str) -> bool:
+    """Whether `alias` names the same company, e.g. "Spotify" for "Spotify Technology S.A."
+
+    The alias must be the normalised name or its leading words, so neither a
+    stray greeting match such as "Our" nor an inner word such as
+    "Technology" becomes an alias.
+    """
+    alias, name = normalise_company(alias), normalise_company(company_name)
+    return bool(alias) and f'{name} '.startswith(f'{alias} ')
+
+
+def find_exchange_ticker(text: str) -> tuple[str | None, str | None]:
+    """Find an explicit exchange listing such as "(NASDAQ: SPOT)" in the header.
+
+    Returns
+        Tuple of (ticker, company_name), either of which may be None
+    """
+    header = text[:HEADER_CHARS]
+    for pattern in EXCHANGE_PATTERNS:
+        match = pattern.search(header)
+        if match:
+            return match.group(2), (match.group(1) or '').strip(' ,') or None
+    return None, None
+
+
+def find_company_name(text: str) -> str | None:
+    """Find the company named in an earnings call greeting or title"""
+    header = text[:HEADER_CHARS]
+    for pattern in COMPANY_PATTERNS:
+        match = pattern.search(header)
+        if match:
+            return re.sub(r"['’]s$", '', match.group(1).strip(' ,'))
+    return None
+
+
+def clean_ticker(value: str | None) -> str | None:
+    """Pull a ticker symbol out of a model reply"""
+    if not value:
+        return None
+    match = re.search(r'\(([A-Z]{1,5})\)', value) or re.search(rf'\b({_TICKER})\b', value)
+    if match:
+        return match.group(1)
+    return re.sub(r'[^A-Z]', '', value.upper())[:5] or None
+
+
+def parse_ticker_reply(reply: str) -> tuple[str | None, str | None]:
+    """Parse the JSON {company_name, ticker} reply, tolerating surrounding prose"""
+    match = re.search(r'\{.*\}', reply, re.DOTALL)
+    try:
+        data = json.loads(match.group()) if match else {}
+    except json.JSONDecodeError:
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+
+    company_name = data.get('company_name')
+    ticker = clean_ticker(data.get('ticker')) if data else clean_ticker(reply)
+    return ticker, company_name.strip() if isinstance(company_name, str) and company_name.strip() else None
+
+
+class TickerCache:
+    """Company name to ticker mapping, optionally persisted as JSON.
+
+    Entries are keyed by normalised company name, so "Spotify",
+    "Spotify's" and "Spotify Technology S.A." share one entry. Writes run
+    off the event loop and merge with the file on disk under an exclusive
+    lock, so workers sharing it do not drop each other's entries.
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self._entries = {}
+        self._lock = Lock()
+        if path is not None:
+            self._entries.update(self._read())
+
+    def _read(self) -> dict:
+        try:
+            return json.loads(self.path.read_text())
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f'Ignoring unreadable ticker cache {self.path}: {e}')
+            return {}
+
+    def get(self, company_name: str) -> tuple[str, str] | None:
+        """Return (ticker, company_name) for a known company"""
+        entry = self._entries.get(normalise_company(company_name))
+        return (entry['ticker'], entry['company_name']) if entry else None
+
+    def by_ticker(self, ticker: str) -> str | None:
+        """Return the company name last stored for a ticker"""
+        for entry in list(self._entries.values()):
+            if entry['ticker'] == ticker:
+                return entry['company_name']
+        return None
+
+    async def set(self, ticker: str, company_name: str, *aliases: str) -> None:
+        """Store a ticker under a company name and any alternative names"""
+        entry = {'ticker': ticker, 'company_name': company_name}
+        updates = {normalise_company(name): entry for name in (company_name, *aliases) if name}
+        with self._lock:
+            self._entries = {**self._entries, **updates}
+        if self.path is not None:
+            await asyncio.to_thread(self._write, updates)
+
+    def _write(self, updates: dict) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path.with_name(f'{self.path.name}.lock'), 'w') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                entries = {**self._read(), **updates}
+                fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix='.tmp')
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(entries, f, indent=1, sort_keys=True)
+                os.replace(tmp, self.path)
+            with self._lock:
+                self._entries = {**entries, **self._entries}
+        except OSError as e:
+            logger.warning(f'Could not persist ticker cache to {self.path}: {e}')
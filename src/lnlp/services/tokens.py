@@ -0,0 +1,94 @@
+import logging
+import math
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    'TokenCounter',
+    'token_counter',
+]
+
+# (tiktoken encoding, correction factor) per model vendor. Anthropic's
+# tokenizer is not public; cl100k scaled up slightly never undercounts it
+# by much, which is the side that matters when reserving context.
+FAMILY_ENCODINGS = {
+    'openai': ('o200k_base', 1.0),
+    'anthropic': ('cl100k_base', 1.15),
+}
+DEFAULT_ENCODING = ('cl100k_base', 1.1)
+
+# chat formatting overhead per message and for priming the reply
+MESSAGE_OVERHEAD = 4
+REPLY_OVERHEAD = 3
+
+# word-ish pieces close to how BPE pre-tokenizes text
+_PIECES = re.compile(r"\s?[^\W\d_]+|\s?\d{1,3}|\s?[^\w\s]+|\s+")
+
+
+@lru_cache(maxsize=None)
+def _load_encoding(name: str):
+    """Load a tiktoken encoding once, or None when it is unavailable"""
+    os.environ.setdefault('TIKTOKEN_CACHE_DIR', str(Path.home() / '.cache' / 'libb-nlp' / 'tiktoken'))
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        logger.warning(f'Tokenizer {name} unavailable, using approximate token counts: {e}')
+        return None
+
+
+def _piece_tokens(piece: str) -> int:
+    return max(1, math.ceil(len(piece.strip() or piece) / 6))
+
+
+def approximate_tokens(text: str) -> int:
+    """Fast tokenizer-free estimate, tighter than chars / 4 on prose and code"""
+    return sum(_piece_tokens(piece) for piece in _PIECES.findall(text))
+
+
+class TokenCounter:
+    """Count and budget prompt tokens per model vendor.
+
+    Tokenizers are loaded lazily and cached per encoding. When tiktoken or
+    its encoding files are unavailable, counts fall back to a regex-based
+    approximation.
+    """
+
+    def _encoding(self, model: str):
+        vendor = model.removeprefix('openrouter/').split('/')[0]
+        name, factor = FAMILY_ENCODINGS.get(vendor, DEFAULT_ENCODING)
+        return _load_encoding(name), factor
+
+    def count(self, text: str, model: str) -> int:
+        """Tokens `text` is expected to take for `model`"""
+        encoding, factor = self._encoding(model)
+        if encoding is None:
+            return approximate_tokens(text)
+        return math.ceil(len(encoding.encode(text, disallowed_special=())) * factor)
+
+    def count_messages(self, messages: list[dict], model: str) -> int:
+        """Prompt tokens for a list of chat messages, including formatting overhead"""
+        return sum(self.count(m['content'], model) + MESSAGE_OVERHEAD for m in messages) + REPLY_OVERHEAD
+
+    def truncate(self, text: str, max_tokens: int, model: str) -> str:
+        """Cut `text` to at most `max_tokens` tokens for `model`"""
+        encoding, factor = self._encoding(model)
+        if encoding is None:
+            total = 0
+            for match in _PIECES.finditer(text):
+                total += _piece_tokens(match.group())
+                if total > max_tokens:
+                    return text[:match.start()]
+            return text
+
+        tokens = encoding.encode(text, disallowed_special=())
+        limit = int(max_tokens / factor)
+        return text if len(tokens) <= limit else encoding.decode(tokens[:limit])
+
+
+token_counter = TokenCounter()
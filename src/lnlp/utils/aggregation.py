@@ -0,0 +1,196 @@
+import fcntl
+import json
+import logging
+import os
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from pathlib import Path
+from threading import Lock
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    'DirectoryMetricsStore',
+    'MemoryMetricsStore',
+    'MetricsStore',
+    'RETIRED_WORKER',
+    'RedisMetricsStore',
+    'create_metrics_store',
+]
+
+# entry holding the summed counts of workers that stopped publishing
+RETIRED_WORKER = 'retired'
+
+# folds a stopped worker's snapshot into the retired one (None before the first)
+Fold = Callable[[dict | None, dict], dict]
+
+
+class MetricsStore(ABC):
+    """Where each worker publishes its latest metrics snapshot for the others to read"""
+
+    @abstractmethod
+    def publish(self, worker_id: str, snapshot: dict) -> None:
+        """Replace the worker's published snapshot
+        """
+
+    @abstractmethod
+    def collect(self) -> dict[str, tuple[float, dict]]:
+        """Return {worker_id: (published_at, snapshot)} for every worker that has published
+        """
+
+    @abstractmethod
+    def retire(self, worker_id: str, published_at: float, fold: Fold) -> bool:
+        """Fold a stopped worker into the RETIRED_WORKER entry and delete its own entry.
+
+        Does nothing and returns False when the worker has published since
+        `published_at` or another worker already retired it.
+        """
+
+
+class MemoryMetricsStore(MetricsStore):
+    """In-process store, for a single process or tests standing in for several workers.
+    """
+
+    def __init__(self):
+        self._snapshots = {}
+        self._lock = Lock()
+
+    def publish(self, worker_id: str, snapshot: dict) -> None:
+        with self._lock:
+            self._snapshots[worker_id] = (time.time(), snapshot)
+
+    def collect(self) -> dict[str, tuple[float, dict]]:
+        with self._lock:
+            return dict(self._snapshots)
+
+    def retire(self, worker_id: str, published_at: float, fold: Fold) -> bool:
+        with self._lock:
+            entry = self._snapshots.get(worker_id)
+            if entry is None or entry[0] != published_at:
+                return False
+            retired = self._snapshots.get(RETIRED_WORKER)
+            self._snapshots[RETIRED_WORKER] = (time.time(), fold(retired[1] if retired else None, entry[1]))
+            del self._snapshots[worker_id]
+            return True
+
+
+class DirectoryMetricsStore(MetricsStore):
+    """One JSON file per worker in a directory shared by the workers on a host.
+
+    `lnlp.serve` creates the directory on /dev/shm when it is available, so
+    publishing is a memory write. Files are replaced atomically; a worker
+    that stops publishing is folded into `retired.json` under a lock file and
+    its own file removed, so its counts stay in the totals.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def publish(self, worker_id: str, snapshot: dict) -> None:
+        payload = json.dumps({'published_at': time.time(), 'snapshot': snapshot}, separators=(',', ':'))
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(payload)
+            os.replace(tmp, self.path / f'{worker_id}.json')
+        except OSError:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def _load(self, file: Path) -> tuple[float, dict] | None:
+        try:
+            data = json.loads(file.read_text())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f'Ignoring unreadable metrics file {file}: {e}')
+            return None
+        return data['published_at'], data['snapshot']
+
+    def collect(self) -> dict[str, tuple[float, dict]]:
+        snapshots = {}
+        for file in self.path.glob('*.json'):
+            entry = self._load(file)
+            if entry is not None:
+                snapshots[file.stem] = entry
+        return snapshots
+
+    def retire(self, worker_id: str, published_at: float, fold: Fold) -> bool:
+        with open(self.path / '.retire.lock', 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            entry = self._load(self.path / f'{worker_id}.json')
+            if entry is None or entry[0] != published_at:
+                return False
+            retired = self._load(self.path / f'{RETIRED_WORKER}.json')
+            self.publish(RETIRED_WORKER, fold(retired[1] if retired else None, entry[1]))
+            (self.path / f'{worker_id}.json').unlink(missing_ok=True)
+            return True
+
+
+class RedisMetricsStore(MetricsStore):
+    """Redis hash of worker snapshots, shared across hosts.
+
+    Publishing happens on the sampler thread, so this takes a synchronous
+    `redis` client; any compatible client can be passed in for tests. Every
+    publish pushes the hash's expiry out by `ttl` seconds, so the hash of a
+    deployment that is gone disappears on its own.
+    """
+
+    def __init__(self, url: str | None = None, client=None, key: str = 'lnlp:metrics', ttl: int = 86400):
+        if client is None:
+            import redis
+            client = redis.from_url(url)
+        self.client = client
+        self.key = key
+        self.ttl = ttl
+
+    @staticmethod
+    def _encode(snapshot: dict) -> str:
+        return json.dumps({'published_at': time.time(), 'snapshot': snapshot}, separators=(',', ':'))
+
+    def publish(self, worker_id: str, snapshot: dict) -> None:
+        self.client.hset(self.key, worker_id, self._encode(snapshot))
+        self.client.expire(self.key, self.ttl)
+
+    def collect(self) -> dict[str, tuple[float, dict]]:
+        snapshots = {}
+        for worker_id, payload in self.client.hgetall(self.key).items():
+            data = json.loads(payload)
+            worker_id = worker_id.decode() if isinstance(worker_id, bytes) else worker_id
+            snapshots[worker_id] = (data['published_at'], data['snapshot'])
+        return snapshots
+
+    def retire(self, worker_id: str, published_at: float, fold: Fold) -> bool:
+        lock = f'{self.key}:retire-lock'
+        if not self.client.set(lock, worker_id, nx=True, px=10000):
+            return False
+        try:
+            payload, retired = self.client.hmget(self.key, [worker_id, RETIRED_WORKER])
+            if payload is None or json.loads(payload)['published_at'] != published_at:
+                return False
+            retired = json.loads(retired)['snapshot'] if retired is not None else None
+            self.client.hset(self.key, RETIRED_WORKER, self._encode(fold(retired, json.loads(payload)['snapshot'])))
+            self.client.hdel(self.key, worker_id)
+            return True
+        finally:
+            self.client.delete(lock)
+
+
+def create_metrics_store(settings) -> MetricsStore | None:
+    """Build the cross-worker metrics store from settings"""
+    store = settings.metrics_store
+    if store == 'directory':
+        if not settings.metrics_dir:
+            raise ValueError('METRICS_DIR is required for the directory metrics store')
+        return DirectoryMetricsStore(settings.metrics_dir)
+    if store == 'redis':
+        return RedisMetricsStore(url=settings.redis_url)
+    if store == 'memory':
+        return MemoryMetricsStore()
+    if store in {'', 'none'}:
+        return None
+    raise ValueError(f'Unknown metrics store: {store}')
@@ -99,10 +99,11 @@ class DashboardService:
         except FileNotFoundError:
             gpu_info = 'nvidia-smi not found'
 
+        cpu_percent = psutil.cpu_percent()
         return {
             'cpu': {
-                'usage_percent': psutil.cpu_percent(),
-                'healthy': psutil.cpu_percent() < 80.0
+                'usage_percent': cpu_percent,
+                'healthy': cpu_percent < 80.0
             },
             'memory': {
                 'usage_percent': psutil.virtual_memory().percent,
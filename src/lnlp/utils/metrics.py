@@ -1,10 +1,114 @@
-from collections import deque
-from dataclasses import dataclass
-from threading import Lock
+import logging
+import os
+import socket
+import time
+from bisect import bisect_left
+from dataclasses import asdict, dataclass, field, replace
+from threading import Event, Lock, Thread
 
+import numpy as np
 import pendulum
 import psutil
 import torch
+from lnlp.utils.aggregation import RETIRED_WORKER
+
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyHistogram:
+    """Log-linear histogram of nanosecond durations, in the style of HdrHistogram.
+
+    Each power of two is split into 2**SUB_BUCKET_BITS linear buckets, so any
+    recorded value is reported within about 3% of its true value while the
+    whole range from 1ns to ~18 minutes takes a fixed ~1200 counters.
+    Recording is a couple of integer operations and an increment with no
+    lock; it is only called from the event loop thread.
+    """
+
+    SUB_BUCKET_BITS = 5
+    MAX_BITS = 40
+
+    def __init__(self):
+        sub_buckets = 1 << self.SUB_BUCKET_BITS
+        self.counts = [0] * ((self.MAX_BITS - self.SUB_BUCKET_BITS + 1) * sub_buckets)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        shift = max(value.bit_length() - self.SUB_BUCKET_BITS, 0)
+        return min((shift << self.SUB_BUCKET_BITS) + (value >> shift), len(self.counts) - 1)
+
+    def _range(self, index: int) -> tuple[int, int]:
+        """Lowest value and width of a bucket"""
+        shift = index >> self.SUB_BUCKET_BITS
+        return (index - (shift << self.SUB_BUCKET_BITS)) << shift, 1 << shift
+
+    def _value(self, index: int) -> int:
+        """Midpoint of the range of values that land in a bucket"""
+        low, width = self._range(index)
+        return low + width // 2
+
+    def upper_bounds(self) -> list[tuple[int, int]]:
+        """(exclusive upper edge in ns, count) for every non-empty bucket, in order"""
+        return [(sum(self._range(index)), count) for index, count in enumerate(self.counts) if count]
+
+    def copy(self) -> 'LatencyHistogram':
+        histogram = LatencyHistogram()
+        histogram.counts = list(self.counts)
+        histogram.count, histogram.total, histogram.max = self.count, self.total, self.max
+        return histogram
+
+    def merge(self, other: 'LatencyHistogram'):
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def to_dict(self) -> dict:
+        """Compact form holding only the non-empty buckets"""
+        return {
+            'buckets': [[index, count] for index, count in enumerate(self.counts) if count],
+            'count': self.count,
+            'total': self.total,
+            'max': self.max
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'LatencyHistogram':
+        histogram = cls()
+        for index, count in data['buckets']:
+            histogram.counts[index] = count
+        histogram.count, histogram.total, histogram.max = data['count'], data['total'], data['max']
+        return histogram
+
+    def record(self, value: int):
+        value = max(int(value), 0)
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentiles(self, *quantiles: float) -> list[int]:
+        """Values at the given quantiles, capped at the exact maximum"""
+        counts = list(self.counts)
+        total = sum(counts)
+        if total == 0:
+            return [0] * len(quantiles)
+
+        results = []
+        for q in quantiles:
+            target, seen = max(q * total, 1), 0
+            for index, bucket in enumerate(counts):
+                seen += bucket
+                if seen >= target:
+                    results.append(min(self._value(index), self.max))
+                    break
+        return results
 
 
 @dataclass
@@ -14,24 +118,309 @@ class EndpointMetric:
     count: int = 0
     total_time: float = 0.0
     last_called: float = 0.0
+    errors: int = 0
+    request_bytes: int = 0
+    response_bytes: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram, repr=False)
 
     @property
     def avg_time(self) -> float:
         return self.total_time / self.count if self.count > 0 else 0
 
 
+@dataclass
+class CacheMetric:
+    name: str
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    tokens_saved: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0
+
+
+@dataclass
+class ConnectionMetric:
+    name: str
+    requests: int = 0
+    new_connections: int = 0
+
+    @property
+    def reuse_rate(self) -> float:
+        return 1 - self.new_connections / self.requests if self.requests > 0 else 0
+
+
+@dataclass
+class Histogram:
+    """Bucketed counts of observed values; the last bucket catches everything above the bounds"""
+    bounds: tuple[float, ...]
+    counts: list[int] | None = None
+    count: int = 0
+    total: float = 0.0
+
+    def __post_init__(self):
+        if self.counts is None:
+            self.counts = [0] * (len(self.bounds) + 1)
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count > 0 else 0
+
+    def to_dict(self) -> dict:
+        labels = [f'<={bound:g}' for bound in self.bounds] + [f'>{self.bounds[-1]:g}']
+        return {
+            'buckets': dict(zip(labels, self.counts)),
+            'count': self.count,
+            'mean': self.mean
+        }
+
+
+class RingBuffer:
+    """Fixed number of (timestamp, value) points in a preallocated NumPy array.
+
+    There is one writer, the sampler. Readers take no lock. They copy the
+    array and retry if a point was appended meanwhile. One spare slot keeps
+    the point being written out of any snapshot.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = np.zeros((capacity + 1, 2))
+        self._written = 0
+
+    def __len__(self) -> int:
+        return min(self._written, self.capacity)
+
+    def append(self, timestamp: float, value: float):
+        self._data[self._written % len(self._data)] = (timestamp, value)
+        self._written += 1
+
+    def snapshot(self) -> np.ndarray:
+        """Points in time order as an (n, 2) array"""
+        while True:
+            written = self._written
+            data = self._data.copy()
+            if written == self._written:
+                break
+        start = written % len(data)
+        ordered = np.concatenate((data[start:], data[:start])) if written >= len(data) else data[:written]
+        return ordered[-self.capacity:] if len(ordered) > self.capacity else ordered
+
+    def to_list(self) -> list[tuple[float, float]]:
+        return [(t, v) for t, v in self.snapshot().tolist()]
+
+
+class Rollup:
+    """Means of a series over fixed periods, kept in their own ring buffer"""
+
+    def __init__(self, period: float, capacity: int):
+        self.period = period
+        self.points = RingBuffer(capacity)
+        self._bucket = None
+        self._total = 0.0
+        self._count = 0
+
+    def add(self, timestamp: float, value: float):
+        bucket = timestamp // self.period
+        if self._bucket is not None and bucket != self._bucket and self._count:
+            self.points.append(self._bucket * self.period, self._total / self._count)
+            self._total, self._count = 0.0, 0
+        self._bucket = bucket
+        self._total += value
+        self._count += 1
+
+
+# period in seconds and points kept for each downsampled series: 1s for an hour, 10s for a day, 60s for a week
+ROLLUPS = {'1s': (1, 3600), '10s': (10, 8640), '60s': (60, 10080)}
+
+
+class TimeSeries:
+    """Raw samples of one system metric plus its downsampled rollups"""
+
+    def __init__(self, capacity: int, interval: float = 1.0):
+        self.raw = RingBuffer(capacity)
+        # rollups no coarser than the sampling interval would only repeat the raw points
+        self.rollups = {name: Rollup(period, points) for name, (period, points) in ROLLUPS.items()
+                        if period > interval}
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def append(self, timestamp: float, value: float):
+        self.raw.append(timestamp, value)
+        for rollup in self.rollups.values():
+            rollup.add(timestamp, value)
+
+    def to_list(self, resolution: str | None = None) -> list[tuple[float, float]]:
+        """Raw points, or the points of the named rollup"""
+        if resolution is None:
+            return self.raw.to_list()
+        return self.rollups[resolution].points.to_list()
+
+
+# sentences per encode call and requests waiting when a batch is dispatched
+BATCH_SIZE_BOUNDS = (1, 8, 16, 32, 64, 128, 256, 512)
+QUEUE_DEPTH_BOUNDS = (1, 2, 4, 8, 16, 32)
+
+# seconds, for queue waits and other latencies
+LATENCY_BOUNDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# a worker that has not published for this many sample intervals is reported as down
+WORKER_STALE_INTERVALS = 5
+
+# and after this many it is folded into the retired entry and its own entry deleted
+WORKER_RETIRE_INTERVALS = 60
+
+# seconds a retired worker id is remembered, to skip its entry if a scrape still sees it
+RETIRED_ID_TTL = 3600
+
+
+_process = None
+
+
+def current_process() -> psutil.Process:
+    """psutil handle for this process, renewed after a fork"""
+    global _process
+    if _process is None or _process.pid != os.getpid():
+        _process = psutil.Process()
+    return _process
+
+
+def encode_snapshot(snapshot: dict) -> dict:
+    """JSON-serialisable form of `MetricsService.snapshot()`"""
+    return {
+        **snapshot,
+        'endpoints': [{**asdict(replace(m, latency=None)), 'latency': m.latency.to_dict()}
+                      for m in snapshot['endpoints']],
+        'histograms': {name: asdict(h) for name, h in snapshot['histograms'].items()},
+        'caches': [asdict(m) for m in snapshot['caches']],
+        'connections': [asdict(m) for m in snapshot['connections']],
+    }
+
+
+def decode_snapshot(data: dict) -> dict:
+    """Inverse of `encode_snapshot`"""
+    return {
+        **data,
+        'endpoints': [EndpointMetric(**{**m, 'latency': LatencyHistogram.from_dict(m['latency'])})
+                      for m in data['endpoints']],
+        'histograms': {name: Histogram(tuple(h['bounds']), h['counts'], h['count'], h['total'])
+                       for name, h in data['histograms'].items()},
+        'caches': [CacheMetric(**m) for m in data['caches']],
+        'connections': [ConnectionMetric(**m) for m in data['connections']],
+    }
+
+
+def merge_snapshots(snapshots: list[dict]) -> dict:
+    """Sum snapshots from several workers into one"""
+    endpoints, histograms, caches, connections = {}, {}, {}, {}
+    counters, gauges = {}, {}
+
+    for snapshot in snapshots:
+        for name, value in snapshot['counters'].items():
+            counters[name] = counters.get(name, 0) + value
+        for name, value in snapshot['gauges'].items():
+            gauges[name] = gauges.get(name, 0) + value
+
+        for metric in snapshot['endpoints']:
+            key = (metric.path, metric.method)
+            if key not in endpoints:
+                endpoints[key] = EndpointMetric(metric.path, metric.method)
+            merged = endpoints[key]
+            merged.count += metric.count
+            merged.total_time += metric.total_time
+            merged.last_called = max(merged.last_called, metric.last_called)
+            merged.errors += metric.errors
+            merged.request_bytes += metric.request_bytes
+            merged.response_bytes += metric.response_bytes
+            merged.latency.merge(metric.latency)
+
+        for name, histogram in snapshot['histograms'].items():
+            if name not in histograms:
+                histograms[name] = Histogram(histogram.bounds)
+            merged = histograms[name]
+            if merged.bounds != histogram.bounds:
+                logger.warning(f'Skipping histogram {name} with mismatched bounds')
+                continue
+            merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+            merged.count += histogram.count
+            merged.total += histogram.total
+
+        for metric in snapshot['caches']:
+            merged = caches.setdefault(metric.name, CacheMetric(metric.name))
+            merged.hits += metric.hits
+            merged.misses += metric.misses
+            merged.evictions += metric.evictions
+            merged.tokens_saved += metric.tokens_saved
+
+        for metric in snapshot['connections']:
+            merged = connections.setdefault(metric.name, ConnectionMetric(metric.name))
+            merged.requests += metric.requests
+            merged.new_connections += metric.new_connections
+
+    return {
+        'counters': counters,
+        'gauges': gauges,
+        'histograms': histograms,
+        'caches': list(caches.values()),
+        'connections': list(connections.values()),
+        'endpoints': list(endpoints.values()),
+        'uptime': max((snapshot['uptime'] for snapshot in snapshots), default=0.0),
+    }
+
+
+def fold_retired(retired: dict | None, worker_id: str, snapshot: dict) -> dict:
+    """Add a stopped worker's encoded snapshot to the encoded retired entry.
+
+    Gauges are dropped, and the worker id is remembered for RETIRED_ID_TTL
+    seconds so a scrape that still finds its entry does not count it twice.
+    """
+    now = time.time()
+    snapshots = [decode_snapshot(snapshot)]
+    folded = {}
+    if retired is not None:
+        snapshots.append(decode_snapshot(retired))
+        folded = {w: t for w, t in (retired.get('folded') or {}).items() if now - t < RETIRED_ID_TTL}
+    merged = merge_snapshots([{**s, 'gauges': {}} for s in snapshots])
+    return {**encode_snapshot(merged), 'folded': {**folded, worker_id: now}}
+
+
 class MetricsService:
     """Service for tracking application metrics"""
 
-    def __init__(self, max_history: int = 300):  # 5 minutes at 1s intervals
+    def __init__(self, max_history: int = 300, interval: float = 1.0):  # 5 minutes at 1s intervals
         self._endpoints = {}
         self._lock = Lock()
         self._max_history = max_history
+        self._interval = interval
+        self._sampler = None
+        self._stop = Event()
+        self._store = None
+        self._worker_id = None
+        self._cpu_times = psutil.cpu_times()
+
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._caches = {}
+        self._connections = {}
+
+        # Encode batching distributions
+        self._batch_sizes = Histogram(BATCH_SIZE_BOUNDS)
+        self._queue_depths = Histogram(QUEUE_DEPTH_BOUNDS)
 
-        # Time series data stored as deques
-        self._cpu_usage = deque(maxlen=max_history)
-        self._memory_usage = deque(maxlen=max_history)
-        self._gpu_usage = deque(maxlen=max_history) if torch.cuda.is_available() else None
+        # Time series filled by the background sampler
+        self._cpu_usage = TimeSeries(max_history, interval)
+        self._memory_usage = TimeSeries(max_history, interval)
+        self._gpu_usage = TimeSeries(max_history, interval) if torch.cuda.is_available() else None
 
         # Start time for uptime calculation
         self._start_time = pendulum.now().timestamp()
@@ -39,68 +428,333 @@ class MetricsService:
         # Initialize with first datapoint
         self._record_system_metrics()
 
-    def track_request(self, path: str, method: str, duration: float):
-        """Track an endpoint request"""
+    def track_request(self, path: str, method: str, duration: float, request_bytes: int = 0,
+                      response_bytes: int = 0, status: int = 200):
+        """Track an endpoint request by route template.
+
+        Called from the event loop for every request, so it takes no lock;
+        `setdefault` keeps endpoint creation atomic.
+        """
+        key = (path, method)
+        metric = self._endpoints.get(key) or self._endpoints.setdefault(key, EndpointMetric(path, method))
+        metric.count += 1
+        metric.total_time += duration
+        metric.last_called = time.time()
+        metric.errors += status >= 500
+        metric.request_bytes += request_bytes
+        metric.response_bytes += response_bytes
+        metric.latency.record(duration * 1e9)
+
+    def track_batch(self, batch_size: int, queue_depth: int):
+        """Track a dispatched encode batch"""
+        with self._lock:
+            self._batch_sizes.observe(batch_size)
+            self._queue_depths.observe(queue_depth)
+
+    def increment(self, name: str, amount: int = 1):
+        """Increment a named event counter"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def adjust_gauge(self, name: str, delta: float):
+        """Move a named gauge up or down; event loop only, so no lock"""
+        self._gauges[name] = self._gauges.get(name, 0) + delta
+
+    def observe(self, name: str, value: float, bounds: tuple[float, ...] = LATENCY_BOUNDS):
+        """Record a value in a named histogram"""
         with self._lock:
-            key = (path, method)
-            if key not in self._endpoints:
-                self._endpoints[key] = EndpointMetric(path, method)
+            if name not in self._histograms:
+                self._histograms[name] = Histogram(bounds)
+            self._histograms[name].observe(value)
 
-            metric = self._endpoints[key]
-            metric.count += 1
-            metric.total_time += duration
-            metric.last_called = pendulum.now().in_timezone('local').timestamp()
+    def track_cache(self, name: str, hits: int = 0, misses: int = 0, evictions: int = 0, tokens_saved: int = 0):
+        """Track cache lookups and evictions"""
+        with self._lock:
+            if name not in self._caches:
+                self._caches[name] = CacheMetric(name)
+
+            metric = self._caches[name]
+            metric.hits += hits
+            metric.misses += misses
+            metric.evictions += evictions
+            metric.tokens_saved += tokens_saved
+
+    def track_connection(self, name: str, new_connection: bool):
+        """Track whether an outbound request reused a pooled connection"""
+        with self._lock:
+            if name not in self._connections:
+                self._connections[name] = ConnectionMetric(name)
+
+            metric = self._connections[name]
+            metric.requests += 1
+            metric.new_connections += int(new_connection)
+
+    def start_sampler(self, interval: float | None = None):
+        """Sample system metrics every `interval` seconds on a daemon thread"""
+        if self._sampler is not None and self._sampler.is_alive():
+            return
+        if interval is not None and interval != self._interval:
+            self._interval = interval
+            self._cpu_usage = TimeSeries(self._max_history, interval)
+            self._memory_usage = TimeSeries(self._max_history, interval)
+            self._gpu_usage = TimeSeries(self._max_history, interval) if self._gpu_usage is not None else None
+        self._stop.clear()
+        self._sampler = Thread(target=self._sample_forever, name='metrics-sampler', daemon=True)
+        self._sampler.start()
+
+    def stop_sampler(self):
+        """Stop the background sampler"""
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join(timeout=self._interval + 1)
+            self._sampler = None
+
+    def _sample_forever(self):
+        # schedule against the monotonic clock so slow samples do not drift the interval
+        next_sample = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self._record_system_metrics()
+                self.publish()
+            except Exception as e:
+                logger.warning(f'System metrics sample failed: {e}')
+            next_sample += self._interval
+            self._stop.wait(max(next_sample - time.monotonic(), 0))
+
+    def _cpu_percent(self) -> float:
+        """System CPU use since the previous sample.
+
+        Measured from our own baseline rather than psutil.cpu_percent(), whose
+        baseline is shared with every other caller in the process.
+        """
+        times, last = psutil.cpu_times(), self._cpu_times
+        self._cpu_times = times
+
+        def split(t):
+            # guest time is already counted in user time on Linux
+            return t.idle + getattr(t, 'iowait', 0), sum(t) - getattr(t, 'guest', 0) - getattr(t, 'guest_nice', 0)
+
+        (idle, total), (last_idle, last_total) = split(times), split(last)
+        idle, total = idle - last_idle, total - last_total
+        return max(0.0, min(100.0, (1 - idle / total) * 100)) if total > 0 else 0.0
 
     def _record_system_metrics(self):
         """Record current system metrics"""
-        # Get local timestamp
-        timestamp = pendulum.now().in_timezone('local').timestamp()
+        timestamp = time.time()
 
         # CPU and Memory
-        cpu_percent = psutil.cpu_percent()
+        cpu_percent = self._cpu_percent()
         memory = psutil.virtual_memory()
 
-        self._cpu_usage.append((timestamp, cpu_percent))
-        self._memory_usage.append((timestamp, memory.percent))
+        self._cpu_usage.append(timestamp, cpu_percent)
+        self._memory_usage.append(timestamp, memory.percent)
 
         # GPU if available
         if self._gpu_usage is not None:
             gpu_percent = torch.cuda.memory_allocated() / torch.cuda.get_device_properties(0).total_memory * 100
-            self._gpu_usage.append((timestamp, gpu_percent))
+            self._gpu_usage.append(timestamp, gpu_percent)
+
+    def share(self, store, worker_id: str | None = None):
+        """Publish to `store` and report totals over every worker publishing there.
+
+        `store` is a `lnlp.utils.aggregation.MetricsStore`. Snapshots are
+        published by the sampler each interval and whenever metrics are read.
+        """
+        self._store = store
+        self._worker_id = worker_id
+
+    @property
+    def worker_id(self) -> str:
+        """Name this process publishes under; computed late so forked workers get their own"""
+        return self._worker_id or f'{socket.gethostname()}:{os.getpid()}'
+
+    def publish(self, snapshot: dict | None = None):
+        """Publish this worker's snapshot to the shared store, if any"""
+        if self._store is not None:
+            self._store.publish(self.worker_id, encode_snapshot(snapshot or self.snapshot()))
+
+    def aggregate(self) -> tuple[dict, list[dict]]:
+        """Snapshot summed over every worker, with a per-worker breakdown.
+
+        Workers that stopped publishing still count towards the totals, so
+        counters never go backwards when a worker is replaced, but their
+        gauges are dropped and they are reported as down. Once silent for
+        WORKER_RETIRE_INTERVALS they are folded into a single retired entry,
+        so respawned workers do not add series forever.
+
+        Returns
+            Tuple of (merged snapshot, worker summaries)
+        """
+        snapshot = self.snapshot()
+        if self._store is None:
+            return snapshot, [self._worker_summary(self.worker_id, snapshot, time.time(), True)]
+
+        self.publish(snapshot)
+        now = time.time()
+        interval = max(self._interval, 1)
+        stale_before = now - WORKER_STALE_INTERVALS * interval
+        retire_before = now - WORKER_RETIRE_INTERVALS * interval
+        collected = self._store.collect()
+        retired = collected.get(RETIRED_WORKER)
+        folded = set((retired[1].get('folded') or {}) if retired else ())
+
+        snapshots, workers = [], []
+        for worker_id, (updated, data) in sorted(collected.items()):
+            if worker_id in folded:
+                continue
+            try:
+                worker = snapshot if worker_id == self.worker_id else decode_snapshot(data)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f'Ignoring unreadable metrics from worker {worker_id}: {e}')
+                continue
+            alive = worker_id != RETIRED_WORKER and updated >= stale_before
+            if not alive:
+                worker = {**worker, 'gauges': {}}
+            if worker_id not in {RETIRED_WORKER, self.worker_id} and updated < retire_before:
+                self._retire(worker_id, updated)
+            snapshots.append(worker)
+            workers.append(self._worker_summary(worker_id, worker, updated, alive))
+        return merge_snapshots(snapshots), workers
+
+    def _retire(self, worker_id: str, published_at: float):
+        try:
+            if self._store.retire(worker_id, published_at,
+                                  lambda retired, snapshot: fold_retired(retired, worker_id, snapshot)):
+                logger.info(f'Retired metrics of stopped worker {worker_id}')
+        except Exception as e:
+            logger.warning(f'Could not retire metrics of worker {worker_id}: {e}')
 
-    def get_metrics(self) -> dict:
-        """Get current metrics data"""
+    @staticmethod
+    def _worker_summary(worker_id: str, snapshot: dict, updated: float, alive: bool) -> dict:
+        process = snapshot.get('process') or {}
+        return {
+            'worker': worker_id,
+            'pid': process.get('pid'),
+            'alive': alive,
+            'updated': updated,
+            'uptime': snapshot['uptime'],
+            'requests': sum(metric.count for metric in snapshot['endpoints']),
+            'errors': sum(metric.errors for metric in snapshot['endpoints']),
+            'in_flight': snapshot['gauges'].get('http_requests_in_flight', 0),
+            'rss_bytes': process.get('rss_bytes', 0),
+            'cpu_seconds': process.get('cpu_seconds', 0.0)
+        }
+
+    def get_system_history(self, resolution: str | None = None) -> dict:
+        """CPU, memory and GPU series as raw samples or a named rollup such as '10s'"""
+        if resolution is not None and resolution not in self._cpu_usage.rollups:
+            raise ValueError(f'Unknown resolution {resolution!r}, expected one of {list(self._cpu_usage.rollups)}')
+        return {
+            'cpu_usage': self._cpu_usage.to_list(resolution),
+            'memory_usage': self._memory_usage.to_list(resolution),
+            'gpu_usage': self._gpu_usage.to_list(resolution) if self._gpu_usage else None
+        }
+
+    def get_metrics(self, resolution: str | None = None) -> dict:
+        """Get current metrics data, with system series at the given rollup resolution"""
+        # System series are snapshotted without the lock; the sampler thread fills them
+        uptime = pendulum.now().in_timezone('local').timestamp() - self._start_time
+        system = {
+            'uptime': uptime,
+            'uptime_formatted': str(pendulum.from_timestamp(uptime) - pendulum.from_timestamp(0)),
+            'sample_interval': self._interval,
+            'resolutions': list(self._cpu_usage.rollups),
+            **self.get_system_history(resolution)
+        }
+
+        merged, workers = self.aggregate()
+        histograms = dict(merged['histograms'])
+        batch_sizes = histograms.pop('encode_batch_size')
+        queue_depths = histograms.pop('encode_queue_depth')
+
+        return {
+            'system': system,
+            'workers': workers,
+            'batching': {
+                'batch_size': batch_sizes.to_dict(),
+                'queue_depth': queue_depths.to_dict()
+            },
+            'counters': dict(sorted(merged['counters'].items())),
+            'gauges': dict(sorted(merged['gauges'].items())),
+            'histograms': {name: histogram.to_dict() for name, histogram in sorted(histograms.items())},
+            'caches': [
+                {
+                    'name': metric.name,
+                    'hits': metric.hits,
+                    'misses': metric.misses,
+                    'evictions': metric.evictions,
+                    'tokens_saved': metric.tokens_saved,
+                    'hit_rate': metric.hit_rate
+                }
+                for metric in merged['caches']
+            ],
+            'connections': [
+                {
+                    'name': metric.name,
+                    'requests': metric.requests,
+                    'new_connections': metric.new_connections,
+                    'reuse_rate': metric.reuse_rate
+                }
+                for metric in merged['connections']
+            ],
+            'endpoints': [
+                self._endpoint_summary(metric)
+                for metric in sorted(
+                    merged['endpoints'],
+                    key=lambda x: x.count,
+                    reverse=True
+                )
+            ]
+        }
+
+    def snapshot(self) -> dict:
+        """Copy of the raw metric state for exposition.
+
+        Only copies are made under the lock and the system is not sampled, so
+        scrapes stay cheap and never hold up request tracking.
+        """
         with self._lock:
-            # Record latest metrics
-            self._record_system_metrics()
-
-            # Calculate uptime
-            uptime = pendulum.now().in_timezone('local').timestamp() - self._start_time
-
-            return {
-                'system': {
-                    'uptime': uptime,
-                    'uptime_formatted': str(pendulum.from_timestamp(uptime) - pendulum.from_timestamp(0)),
-                    'cpu_usage': list(self._cpu_usage),
-                    'memory_usage': list(self._memory_usage),
-                    'gpu_usage': list(self._gpu_usage) if self._gpu_usage else None
+            snapshot = {
+                'counters': dict(self._counters),
+                'histograms': {
+                    'encode_batch_size': replace(self._batch_sizes, counts=list(self._batch_sizes.counts)),
+                    'encode_queue_depth': replace(self._queue_depths, counts=list(self._queue_depths.counts)),
+                    **{name: replace(h, counts=list(h.counts)) for name, h in self._histograms.items()}
                 },
-                'endpoints': [
-                    {
-                        'path': metric.path,
-                        'method': metric.method,
-                        'count': metric.count,
-                        'avg_time': metric.avg_time,
-                        'total_time': metric.total_time,
-                        'last_called': metric.last_called
-                    }
-                    for metric in sorted(
-                        self._endpoints.values(),
-                        key=lambda x: x.count,
-                        reverse=True
-                    )
-                ]
+                'caches': [replace(metric) for metric in self._caches.values()],
+                'connections': [replace(metric) for metric in self._connections.values()],
             }
+        snapshot['gauges'] = dict(self._gauges)
+        snapshot['endpoints'] = [replace(metric, latency=metric.latency.copy())
+                                 for metric in list(self._endpoints.values())]
+        snapshot['uptime'] = pendulum.now().timestamp() - self._start_time
+        process = current_process()
+        cpu = process.cpu_times()
+        snapshot['process'] = {
+            'pid': process.pid,
+            'rss_bytes': process.memory_info().rss,
+            'cpu_seconds': round(cpu.user + cpu.system, 3)
+        }
+        return snapshot
+
+    @staticmethod
+    def _endpoint_summary(metric: EndpointMetric) -> dict:
+        p50, p90, p99 = (ns / 1e9 for ns in metric.latency.percentiles(0.5, 0.9, 0.99))
+        return {
+            'path': metric.path,
+            'method': metric.method,
+            'count': metric.count,
+            'errors': metric.errors,
+            'avg_time': metric.avg_time,
+            'total_time': metric.total_time,
+            'p50': p50,
+            'p90': p90,
+            'p99': p99,
+            'max_time': metric.latency.max / 1e9,
+            'request_bytes': metric.request_bytes,
+            'response_bytes': metric.response_bytes,
+            'last_called': metric.last_called
+        }
 
 
 # Singleton instance
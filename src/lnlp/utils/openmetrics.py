@@ -0,0 +1,202 @@
+import asyncio
+import re
+from bisect import bisect_left
+
+from lnlp.utils.metrics import LATENCY_BOUNDS, Histogram, LatencyHistogram, current_process
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+PREFIX = 'lnlp'
+
+
+def _name(name: str) -> str:
+    return re.sub(r'[^a-zA-Z0-9_]', '_', f'{PREFIX}_{name}')
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _number(value) -> str:
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Writer:
+    """Accumulates metric families in OpenMetrics text format"""
+
+    def __init__(self):
+        self.lines = []
+        self._families = set()
+
+    def family(self, name: str, kind: str, help: str):
+        if name not in self._families:
+            self._families.add(name)
+            self.lines.append(f'# HELP {name} {help}')
+            self.lines.append(f'# TYPE {name} {kind}')
+
+    def sample(self, name: str, value, **labels):
+        label_text = ','.join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+        self.lines.append(f'{name}{{{label_text}}} {_number(value)}' if labels else f'{name} {_number(value)}')
+
+    def histogram(self, name: str, bounds, cumulative: list[int], count: int, total: float, **labels):
+        for bound, below in zip(bounds, cumulative):
+            self.sample(f'{name}_bucket', below, **labels, le=f'{bound:g}')
+        self.sample(f'{name}_bucket', count, **labels, le='+Inf')
+        self.sample(f'{name}_count', count, **labels)
+        self.sample(f'{name}_sum', total, **labels)
+
+    def render(self) -> str:
+        return '\n'.join(self.lines + ['# EOF']) + '\n'
+
+
+def _cumulative(histogram: Histogram) -> list[int]:
+    counts, running = [], 0
+    for count in histogram.counts[:-1]:
+        running += count
+        counts.append(running)
+    return counts
+
+
+def _latency_cumulative(latency: LatencyHistogram, bounds_ns: list[int]) -> list[int]:
+    """Requests at or under each bound, counting a log bucket once its whole range fits"""
+    per_bound = [0] * (len(bounds_ns) + 1)
+    for upper, count in latency.upper_bounds():
+        per_bound[bisect_left(bounds_ns, upper - 1)] += count
+    cumulative, running = [], 0
+    for count in per_bound[:-1]:
+        running += count
+        cumulative.append(running)
+    return cumulative
+
+
+def runtime_state(splitter_manager=None) -> dict:
+    """Sample process, thread pool and model state at scrape time.
+
+    Must run on the event loop so the thread pools of the running loop are seen.
+    """
+    import anyio.to_thread
+
+    process = current_process()
+    cpu = process.cpu_times()
+    limiter = anyio.to_thread.current_default_thread_limiter().statistics()
+    executor = getattr(asyncio.get_running_loop(), '_default_executor', None)
+    work_queue = getattr(executor, '_work_queue', None)
+    threads = len(getattr(executor, '_threads', ()))
+    idle = getattr(getattr(executor, '_idle_semaphore', None), '_value', 0)
+
+    return {
+        'process': {
+            'rss_bytes': process.memory_info().rss,
+            'cpu_seconds': cpu.user + cpu.system,
+            'threads': process.num_threads(),
+        },
+        'threadpools': {
+            # sync endpoints run in anyio's pool, asyncio.to_thread in the loop's default executor
+            'anyio': {'busy': limiter.borrowed_tokens, 'size': limiter.total_tokens,
+                      'queued': limiter.tasks_waiting},
+            'asyncio': {'busy': max(threads - idle, 0),
+                        'size': getattr(executor, '_max_workers', 0),
+                        'queued': work_queue.qsize() if work_queue is not None else 0},
+        },
+        'models': splitter_manager.health_check() if splitter_manager is not None else {},
+    }
+
+
+def render_openmetrics(snapshot: dict, runtime: dict | None = None, workers: list[dict] | None = None) -> str:
+    """Render a metrics snapshot as OpenMetrics text.
+
+    `snapshot` may be a single process's `MetricsService.snapshot()` or the
+    merged snapshot from `aggregate()`, whose worker summaries are then
+    rendered as `worker`-labelled series alongside the totals.
+    """
+    out = _Writer()
+    bounds_ns = [int(bound * 1e9) for bound in LATENCY_BOUNDS]
+
+    requests = _name('http_requests')
+    errors = _name('http_request_errors')
+    latency = _name('http_request_duration_seconds')
+    received = _name('http_request_bytes')
+    sent = _name('http_response_bytes')
+    # every sample of a family must follow its header before the next family starts
+    for family, field, help in ((requests, 'count', 'HTTP requests by route template'),
+                                (errors, 'errors', 'HTTP requests answered with a 5xx status'),
+                                (received, 'request_bytes', 'HTTP request body bytes received'),
+                                (sent, 'response_bytes', 'HTTP response body bytes sent')):
+        out.family(family, 'counter', help)
+        for metric in snapshot['endpoints']:
+            out.sample(f'{family}_total', getattr(metric, field), route=metric.path, method=metric.method)
+    out.family(latency, 'histogram', 'HTTP request latency by route template')
+    for metric in snapshot['endpoints']:
+        out.histogram(latency, LATENCY_BOUNDS, _latency_cumulative(metric.latency, bounds_ns),
+                      metric.latency.count, metric.total_time, route=metric.path, method=metric.method)
+
+    for name, value in sorted(snapshot['gauges'].items()):
+        out.family(_name(name), 'gauge', name.replace('_', ' '))
+        out.sample(_name(name), value)
+
+    for name, value in sorted(snapshot['counters'].items()):
+        family = _name(name.removesuffix('_total'))
+        out.family(family, 'counter', name.replace('_', ' '))
+        out.sample(f'{family}_total', value)
+
+    for name, histogram in sorted(snapshot['histograms'].items()):
+        out.family(_name(name), 'histogram', name.replace('_', ' '))
+        out.histogram(_name(name), histogram.bounds, _cumulative(histogram), histogram.count, histogram.total)
+
+    cache_families = {'hits': 'Cache hits', 'misses': 'Cache misses', 'evictions': 'Cache evictions',
+                      'tokens_saved': 'LLM tokens served from cache'}
+    for field, help in cache_families.items():
+        family = _name(f'cache_{field}')
+        out.family(family, 'counter', help)
+        for metric in snapshot['caches']:
+            out.sample(f'{family}_total', getattr(metric, field), cache=metric.name)
+
+    for field, help in (('requests', 'Outbound HTTP requests'), ('new_connections', 'Outbound TCP connections opened')):
+        family = _name(f'upstream_{field}')
+        out.family(family, 'counter', help)
+        for metric in snapshot['connections']:
+            out.sample(f'{family}_total', getattr(metric, field), upstream=metric.name)
+
+    out.family(_name('uptime_seconds'), 'gauge', 'Seconds since the metrics service started')
+    out.sample(_name('uptime_seconds'), round(snapshot['uptime'], 3))
+
+    worker_families = (
+        ('up', 'gauge', 'alive', 'Whether the worker published metrics recently'),
+        ('http_requests', 'counter', 'requests', 'HTTP requests served by the worker'),
+        ('http_request_errors', 'counter', 'errors', 'HTTP 5xx responses from the worker'),
+        ('http_requests_in_flight', 'gauge', 'in_flight', 'HTTP requests in progress in the worker'),
+        ('resident_memory_bytes', 'gauge', 'rss_bytes', 'Resident set size of the worker'),
+        ('cpu_seconds', 'counter', 'cpu_seconds', 'User and system CPU time of the worker'),
+    )
+    for suffix, kind, field, help in worker_families if workers else ():
+        family = _name(f'worker_{suffix}')
+        out.family(family, kind, help)
+        for worker in workers:
+            out.sample(f'{family}_total' if kind == 'counter' else family, worker[field], worker=worker['worker'])
+
+    if runtime:
+        process = runtime['process']
+        out.family('process_resident_memory_bytes', 'gauge', 'Resident set size in bytes')
+        out.sample('process_resident_memory_bytes', process['rss_bytes'])
+        out.family('process_cpu_seconds', 'counter', 'User and system CPU time in seconds')
+        out.sample('process_cpu_seconds_total', round(process['cpu_seconds'], 3))
+        out.family('process_threads', 'gauge', 'OS threads in the process')
+        out.sample('process_threads', process['threads'])
+
+        for field, help in (('busy', 'Worker threads running a task'), ('size', 'Maximum worker threads'),
+                            ('queued', 'Tasks waiting for a worker thread')):
+            family = _name(f'threadpool_{field}')
+            out.family(family, 'gauge', help)
+            for pool, stats in runtime['threadpools'].items():
+                out.sample(family, stats[field], pool=pool)
+
+        family = _name('model_loaded')
+        out.family(family, 'gauge', 'Whether a splitter model is loaded')
+        for model, state in runtime['models'].items():
+            out.sample(family, state.get('loaded', False), model=model)
+
+    return out.render()
@@ -13,11 +13,114 @@ def render_dashboard(dashboard_data: dict, metrics_data: dict) -> str:
                 <div class="metric-details">
                     <span>Count: {endpoint['count']}</span>
                     <span>Avg Time: {endpoint['avg_time']:.3f}s</span>
+                    <span>p50/p90/p99: {endpoint.get('p50', 0):.3f}s / {endpoint.get('p90', 0):.3f}s / {endpoint.get('p99', 0):.3f}s</span>
+                    <span>Max: {endpoint.get('max_time', 0):.3f}s</span>
+                    <span>Bytes In/Out: {endpoint.get('request_bytes', 0):,} / {endpoint.get('response_bytes', 0):,}</span>
                     <span>Last Called: {last_called}</span>
                 </div>
             </div>
         """)
 
+    batching_html = []
+    histograms = {**(metrics_data.get('batching') or {}), **(metrics_data.get('histograms') or {})}
+    for name, histogram in histograms.items():
+        buckets = ' '.join(f'<span>{label}: {count}</span>' for label, count in histogram['buckets'].items())
+        batching_html.append(f"""
+            <div class="metric">
+                <span>{name.replace('_', ' ').title()} (count: {histogram['count']}, mean: {histogram['mean']:.3g})</span>
+                <div class="metric-details">{buckets}</div>
+            </div>
+        """)
+
+    caches_html = []
+    for cache in metrics_data.get('caches') or []:
+        caches_html.append(f"""
+            <div class="metric">
+                <span>{cache['name']}</span>
+                <div class="metric-details">
+                    <span>Hits: {cache['hits']}</span>
+                    <span>Misses: {cache['misses']}</span>
+                    <span>Evictions: {cache['evictions']}</span>
+                    <span>Hit Rate: {cache['hit_rate']:.1%}</span>
+                    {f"<span>Tokens Saved: {cache['tokens_saved']:,}</span>" if cache.get('tokens_saved') else ''}
+                </div>
+            </div>
+        """)
+
+    caches_card = f"""
+            <div class="card">
+                <h2>Caches</h2>
+                {''.join(caches_html)}
+            </div>
+    """ if caches_html else ''
+
+    connections_html = []
+    for pool in metrics_data.get('connections') or []:
+        connections_html.append(f"""
+            <div class="metric">
+                <span>{pool['name']}</span>
+                <div class="metric-details">
+                    <span>Requests: {pool['requests']}</span>
+                    <span>New Connections: {pool['new_connections']}</span>
+                    <span>Reuse Rate: {pool['reuse_rate']:.1%}</span>
+                </div>
+            </div>
+        """)
+
+    connections_card = f"""
+            <div class="card">
+                <h2>Outbound Connections</h2>
+                {''.join(connections_html)}
+            </div>
+    """ if connections_html else ''
+
+    workers_html = []
+    workers = metrics_data.get('workers') or []
+    for worker in workers if len(workers) > 1 else []:
+        workers_html.append(f"""
+            <div class="metric">
+                <span>{worker['worker']}{'' if worker['alive'] else ' (down)'}</span>
+                <div class="metric-details">
+                    <span>Requests: {worker['requests']:,}</span>
+                    <span>Errors: {worker['errors']:,}</span>
+                    <span>In Flight: {worker['in_flight']}</span>
+                    <span>RSS: {worker['rss_bytes'] / 1024**2:,.0f} MB</span>
+                    <span>CPU: {worker['cpu_seconds']:,.1f}s</span>
+                </div>
+            </div>
+        """)
+
+    workers_card = f"""
+            <div class="card">
+                <h2>Workers</h2>
+                {''.join(workers_html)}
+            </div>
+    """ if workers_html else ''
+
+    counters_html = [
+        f"""
+            <div class="metric">
+                <span>{name.replace('_', ' ').title()}</span>
+                <div class="metric-details"><span>{count:,}</span></div>
+            </div>
+        """
+        for name, count in (metrics_data.get('counters') or {}).items()
+    ]
+
+    counters_card = f"""
+            <div class="card">
+                <h2>Counters</h2>
+                {''.join(counters_html)}
+            </div>
+    """ if counters_html else ''
+
+    batching_card = f"""
+            <div class="card">
+                <h2>Distributions</h2>
+                {''.join(batching_html)}
+            </div>
+    """ if batching_html else ''
+
     cpu_data = [[int(t * 1000), v] for t, v in metrics_data['system']['cpu_usage']]
     memory_data = [[int(t * 1000), v] for t, v in metrics_data['system']['memory_usage']]
     gpu_data = [[int(t * 1000), v] for t, v in metrics_data['system']['gpu_usage']] if metrics_data['system']['gpu_usage'] else None
@@ -280,6 +383,11 @@ def render_dashboard(dashboard_data: dict, metrics_data: dict) -> str:
                 <h2>Endpoint Usage</h2>
                 {''.join(endpoints_html) if endpoints_html else '<div class="metric">No endpoints called yet</div>'}
             </div>
+            {batching_card}
+            {caches_card}
+            {workers_card}
+            {connections_card}
+            {counters_card}
         </div>
 
         <div class="footer">
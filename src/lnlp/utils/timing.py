@@ -0,0 +1,119 @@
+import functools
+import time
+from collections.abc import Callable
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+__all__ = [
+    'collect_stages',
+    'server_timing',
+    'set_enabled',
+    'span',
+    'timed',
+]
+
+# seconds; stages are often far shorter than a whole request
+STAGE_BOUNDS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_enabled = True
+
+# stage totals of the request being served; shared by reference with its worker threads
+_stages: ContextVar[dict[str, float] | None] = ContextVar('lnlp_stages', default=None)
+
+
+def set_enabled(enabled: bool):
+    """Turn stage timing on or off for the whole process"""
+    global _enabled
+    _enabled = enabled
+
+
+def _observe(name: str, seconds: float):
+    # imported on first use: lnlp.utils.metrics pulls in torch, which PDF
+    # parsing workers importing this module through lnlp.services.pdf must not pay for
+    from lnlp.utils.metrics import metrics_service
+    metrics_service.observe(f'stage_{name}', seconds, STAGE_BOUNDS)
+
+
+def _record(name: str, seconds: float):
+    stages = _stages.get()
+    if stages is None:
+        _observe(name, seconds)
+    else:
+        stages[name] = stages.get(name, 0.0) + seconds
+
+
+class _Span:
+    __slots__ = ('name', 'started')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        _record(self.name, (time.perf_counter_ns() - self.started) / 1e9)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name: str):
+    """Time a block as the named stage.
+
+    Inside `collect_stages` the time is added to the request's total for the
+    stage; otherwise it is recorded straight into the `stage_<name>`
+    histogram. Returns a shared no-op context manager when timing is off.
+    """
+    return _Span(name) if _enabled else _NO_SPAN
+
+
+def timed(name: str) -> Callable:
+    """Decorator timing every call of a function as the named stage"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def collect_stages():
+    """Sum stage times for one request and record each total once when it ends.
+
+    Yields the {stage: seconds} dict being filled, or None when timing is off.
+    Worker threads started with `asyncio.to_thread` inherit the collector.
+    """
+    if not _enabled:
+        yield None
+        return
+
+    stages = {}
+    token = _stages.set(stages)
+    try:
+        yield stages
+    finally:
+        _stages.reset(token)
+        for name, seconds in list(stages.items()):
+            _observe(name, seconds)
+
+
+def server_timing(stages: dict[str, float]) -> str:
+    """Format stage totals as a Server-Timing header value, in milliseconds"""
+    return ', '.join(f'{name};dur={seconds * 1000:.3f}' for name, seconds in stages.items())
@@ -17,7 +17,7 @@ import pytest
 logging.getLogger('pdfminer').setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
-pytest_plugins = ['tests.fixtures.docker']
+pytest_plugins = ['tests.fixtures.docker', 'tests.fixtures.openrouter']
 
 
 @pytest.fixture(scope='session')
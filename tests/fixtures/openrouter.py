@@ -0,0 +1,115 @@
+"""Fake OpenRouter server fixtures."""
+import json
+import threading
+import time
+from collections import deque
+from collections.abc import Generator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+FAKE_MODELS = [
+    {'id': 'anthropic/claude-haiku-4.5', 'name': 'Anthropic: Claude Haiku 4.5', 'context_length': 200000,
+     'created': 1760000000, 'object': 'model', 'owned_by': 'anthropic'},
+]
+
+
+class FakeOpenRouter:
+    """Scriptable stand-in for the OpenRouter chat completions API.
+
+    Each chat completion request pops the next scripted reply; once the
+    script is empty requests succeed immediately.
+    """
+
+    def __init__(self):
+        self.script = deque()
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f'http://{host}:{port}/api/v1'
+
+    def fail(self, status: int, times: int = 1, retry_after: float | None = None):
+        """Answer the next `times` completions with an error status"""
+        for _ in range(times):
+            self.script.append({'status': status, 'retry_after': retry_after})
+
+    def delay(self, seconds: float, times: int = 1):
+        """Answer the next `times` completions successfully after a pause"""
+        for _ in range(times):
+            self.script.append({'status': 200, 'delay': seconds})
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _next(self) -> dict:
+        with self._lock:
+            self.requests += 1
+            return self.script.popleft() if self.script else {'status': 200}
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: dict, headers: dict | None = None):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                if self.path.endswith('/models'):
+                    self._send(200, {'data': FAKE_MODELS})
+                else:
+                    self._send(404, {'error': {'message': 'not found'}})
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                reply = fake._next()
+                time.sleep(reply.get('delay', 0))
+
+                if reply['status'] != 200:
+                    headers = {'Retry-After': str(reply['retry_after'])} if reply.get('retry_after') is not None else {}
+                    self._send(reply['status'], {'error': {'message': 'upstream error', 'code': reply['status']}}, headers)
+                    return
+
+                self._send(200, {
+                    'id': f'gen-{fake.requests}',
+                    'object': 'chat.completion',
+                    'created': int(time.time()),
+                    'model': body['model'],
+                    'choices': [{
+                        'index': 0,
+                        'message': {'role': 'assistant', 'content': 'ok'},
+                        'finish_reason': 'stop',
+                    }],
+                    'usage': {'prompt_tokens': 5, 'completion_tokens': 1, 'total_tokens': 6},
+                })
+
+        return Handler
+
+
+@pytest.fixture
+def fake_openrouter() -> Generator[FakeOpenRouter, None, None]:
+    """Run a fake OpenRouter server on a free local port"""
+    server = FakeOpenRouter()
+    server.start()
+    yield server
+    server.stop()
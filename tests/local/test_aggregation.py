@@ -0,0 +1,157 @@
+"""Local cross-worker metrics aggregation tests - no API required."""
+import time
+
+import pytest
+from lnlp.utils.aggregation import RETIRED_WORKER, DirectoryMetricsStore, MemoryMetricsStore, RedisMetricsStore
+from lnlp.utils.metrics import MetricsService
+from lnlp.utils.openmetrics import render_openmetrics
+
+
+class FakeRedis:
+    """Synchronous stand-in for the redis hash commands the store uses"""
+
+    def __init__(self):
+        self.hashes = {}
+        self.strings = {}
+        self.expiry = {}
+
+    def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field.encode()] = value.encode()
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def hmget(self, key, fields):
+        return [self.hashes.get(key, {}).get(field.encode()) for field in fields]
+
+    def hdel(self, key, field):
+        self.hashes.get(key, {}).pop(field.encode(), None)
+
+    def expire(self, key, seconds):
+        self.expiry[key] = seconds
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and key in self.strings:
+            return None
+        self.strings[key] = value
+        return True
+
+    def delete(self, key):
+        self.strings.pop(key, None)
+
+
+def make_store(kind, tmp_path):
+    return {'memory': MemoryMetricsStore, 'directory': lambda: DirectoryMetricsStore(tmp_path),
+            'redis': lambda: RedisMetricsStore(client=FakeRedis())}[kind]()
+
+
+def make_workers(store, count=2):
+    """Metrics services standing in for forked workers sharing one store"""
+    workers = []
+    for i in range(count):
+        service = MetricsService(max_history=5)
+        service.share(store, worker_id=f'host:{100 + i}')
+        workers.append(service)
+    return workers
+
+
+@pytest.mark.parametrize('store', ['memory', 'directory', 'redis'])
+def test_totals_summed_across_workers(store, tmp_path):
+    """Test every worker reports whole-task totals whichever store they share."""
+    store = make_store(store, tmp_path)
+    first, second = make_workers(store)
+
+    for _ in range(3):
+        first.track_request('/split/spacy', 'POST', 0.1, request_bytes=10)
+    second.track_request('/split/spacy', 'POST', 0.4, request_bytes=10)
+    second.track_request('/health', 'GET', 0.001)
+    first.increment('openrouter_retries')
+    second.increment('openrouter_retries', 2)
+    first.track_cache('embeddings', hits=1)
+    second.track_cache('embeddings', misses=1)
+    second.publish()
+
+    metrics = first.get_metrics()
+    split = next(e for e in metrics['endpoints'] if e['path'] == '/split/spacy')
+    assert split['count'] == 4
+    assert split['request_bytes'] == 40
+    assert split['max_time'] == pytest.approx(0.4, rel=0.04)
+    assert metrics['counters']['openrouter_retries'] == 3
+    assert metrics['caches'][0]['hit_rate'] == 0.5
+
+    workers = {w['worker']: w for w in metrics['workers']}
+    assert workers['host:100']['requests'] == 3
+    assert workers['host:101']['requests'] == 2
+    assert all(w['alive'] for w in workers.values())
+
+
+def test_stale_worker_keeps_counts_but_not_gauges():
+    """Test a worker that stopped publishing still counts but is reported down."""
+    store = MemoryMetricsStore()
+    live, dead = make_workers(store)
+
+    dead.track_request('/health', 'GET', 0.01)
+    dead.adjust_gauge('http_requests_in_flight', 3)
+    dead.publish()
+    published_at, snapshot = store._snapshots['host:101']
+    store._snapshots['host:101'] = (published_at - 3600, snapshot)
+
+    merged, workers = live.aggregate()
+
+    assert sum(m.count for m in merged['endpoints']) == 1
+    assert merged['gauges'].get('http_requests_in_flight', 0) == 0
+    assert {w['worker']: w['alive'] for w in workers} == {'host:100': True, 'host:101': False}
+
+
+@pytest.mark.parametrize('store', ['memory', 'directory', 'redis'])
+def test_stopped_workers_folded_into_retired(store, tmp_path, monkeypatch):
+    """Test long-dead workers are replaced by one retired entry without changing the totals."""
+    store = make_store(store, tmp_path)
+    live, *dead = make_workers(store, count=3)
+    live.track_request('/health', 'GET', 0.01)
+    for worker in dead:
+        worker.track_request('/health', 'GET', 0.01)
+        worker.increment('openrouter_retries')
+        worker.adjust_gauge('http_requests_in_flight', 2)
+        with monkeypatch.context() as m:
+            m.setattr(time, 'time', lambda now=time.time(): now - 3600)
+            worker.publish()
+
+    for _ in range(2):
+        merged, workers = live.aggregate()
+        assert sum(m.count for m in merged['endpoints']) == 3
+        assert merged['counters']['openrouter_retries'] == 2
+        assert merged['gauges'].get('http_requests_in_flight', 0) == 0
+
+    assert sorted(store.collect()) == ['host:100', RETIRED_WORKER]
+    assert {w['worker']: w['alive'] for w in workers} == {'host:100': True, RETIRED_WORKER: False}
+
+
+def test_unshared_service_reports_itself():
+    """Test a service without a store aggregates to its own numbers."""
+    service = MetricsService()
+    service.track_request('/health', 'GET', 0.01)
+
+    merged, workers = service.aggregate()
+
+    assert merged['endpoints'][0].count == 1
+    assert len(workers) == 1 and workers[0]['requests'] == 1
+
+
+def test_openmetrics_worker_breakdown():
+    """Test the exposition carries worker-labelled series next to the totals."""
+    first, second = make_workers(MemoryMetricsStore())
+    first.track_request('/health', 'GET', 0.01)
+    second.track_request('/health', 'GET', 0.01)
+    second.publish()
+
+    merged, workers = first.aggregate()
+    text = render_openmetrics(merged, workers=workers)
+
+    assert 'lnlp_http_requests_total{route="/health",method="GET"} 2' in text
+    assert 'lnlp_worker_http_requests_total{worker="host:100"} 1' in text
+    assert 'lnlp_worker_up{worker="host:101"} 1' in text
+
+
+if __name__ == '__main__':
+    __import__('pytest').main([__file__, '-v'])
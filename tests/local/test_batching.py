@@ -0,0 +1,94 @@
+"""Local encode batching tests - no API required."""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+import numpy as np
+import pytest
+from lnlp.services.batching import EncodeBatcher
+
+
+class FakeModel:
+    """Encodes each sentence as [len(sentence), call number]"""
+
+    def __init__(self):
+        self.calls = []
+        self._lock = Lock()
+
+    def encode(self, sentences):
+        with self._lock:
+            self.calls.append(list(sentences))
+            call = len(self.calls)
+        return np.array([[len(s), call] for s in sentences], dtype=np.float32)
+
+
+def test_encode_returns_caller_embeddings():
+    """Test a single caller gets one row per sentence in order."""
+    batcher = EncodeBatcher(FakeModel(), max_batch_size=16, max_wait_ms=1)
+    try:
+        result = batcher.encode(['a', 'bbb', 'cc'])
+        assert result[:, 0].tolist() == [1, 3, 2]
+    finally:
+        batcher.close()
+
+
+def test_concurrent_callers_share_batches():
+    """Test concurrent requests are coalesced into fewer encode calls."""
+    model = FakeModel()
+    batcher = EncodeBatcher(model, max_batch_size=1000, max_wait_ms=50)
+    requests = [['x' * (i + 1)] * 3 for i in range(8)]
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(batcher.encode, requests))
+    finally:
+        batcher.close()
+
+    assert len(model.calls) < len(requests)
+    for request, result in zip(requests, results):
+        assert result.shape == (3, 2)
+        assert result[:, 0].tolist() == [len(request[0])] * 3
+
+
+def test_encode_errors_propagate():
+    """Test model failures reach every waiting caller."""
+    class BrokenModel:
+        def encode(self, sentences):
+            raise ValueError('boom')
+
+    batcher = EncodeBatcher(BrokenModel(), max_wait_ms=1)
+    try:
+        with pytest.raises(ValueError, match='boom'):
+            batcher.encode(['a'])
+    finally:
+        batcher.close()
+
+
+def test_encode_after_close():
+    """Test a closed batcher rejects new work."""
+    batcher = EncodeBatcher(FakeModel(), max_wait_ms=1)
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.encode(['a'])
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='requires fork')
+def test_batcher_restarts_worker_after_fork():
+    """Test a batcher created before fork still serves in the child."""
+    batcher = EncodeBatcher(FakeModel(), max_wait_ms=1)
+    batcher.encode(['warm'])
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            ok = batcher.encode(['child'])[0, 0] == 5
+        except Exception:
+            ok = False
+        os._exit(0 if ok else 1)
+
+    _, status = os.waitpid(pid, 0)
+    batcher.close()
+    assert os.waitstatus_to_exitcode(status) == 0
+
+
+if __name__ == '__main__':
+    __import__('pytest').main([__file__, '-v'])
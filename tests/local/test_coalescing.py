@@ -0,0 +1,83 @@
+"""Local request coalescing tests - no API required."""
+import asyncio
+
+import pytest
+from lnlp.services.coalescing import SingleFlight
+
+
+class Upstream:
+    """Counts calls and answers after a short delay"""
+
+    def __init__(self, error=None):
+        self.calls = 0
+        self.cancelled = False
+        self.error = error
+
+    async def __call__(self, value='result'):
+        self.calls += 1
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            raise self.error
+        return value
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_share_one_call():
+    """Test concurrent callers with one key get one upstream call."""
+    flight = SingleFlight('test')
+    upstream = Upstream()
+
+    results = await asyncio.gather(*(flight.do('key', upstream) for _ in range(5)))
+
+    assert upstream.calls == 1
+    assert results == ['result'] * 5
+    assert flight.in_flight() == 0
+
+
+@pytest.mark.asyncio
+async def test_distinct_keys_and_sequential_calls_are_not_shared():
+    """Test only concurrent calls with the same key are coalesced."""
+    flight = SingleFlight('test')
+    upstream = Upstream()
+
+    await asyncio.gather(flight.do('a', upstream), flight.do('b', upstream))
+    await flight.do('a', upstream)
+
+    assert upstream.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiter():
+    """Test an upstream failure is raised to all coalesced callers."""
+    flight = SingleFlight('test')
+    upstream = Upstream(error=RuntimeError('429'))
+
+    results = await asyncio.gather(*(flight.do('key', upstream) for _ in range(3)), return_exceptions=True)
+
+    assert upstream.calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_last_waiter_cancelling_aborts_call():
+    """Test the upstream call is cancelled once nobody is waiting."""
+    flight = SingleFlight('test')
+    upstream = Upstream()
+
+    waiter = asyncio.create_task(flight.do('key', upstream))
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    await asyncio.sleep(0)
+
+    assert upstream.cancelled
+    assert flight.in_flight() == 0
+
+
+if __name__ == '__main__':
+    __import__('pytest').main([__file__, '-v'])
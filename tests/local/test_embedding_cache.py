@@ -0,0 +1,61 @@
+"""Local embedding cache tests - no API required."""
+import numpy as np
+from lnlp.services.embedding_cache import EmbeddingCache, sentence_key
+
+
+def test_sentence_key_is_content_addressed():
+    """Test identical text maps to the same key."""
+    assert sentence_key('Thank you.') == sentence_key('Thank you.')
+    assert sentence_key('Thank you.') != sentence_key('Thank you')
+
+
+def test_memory_hits_and_misses():
+    """Test lookups return stored embeddings and None for misses."""
+    cache = EmbeddingCache()
+    cache.put_many('model', ['a', 'b'], np.array([[1.0, 2.0], [3.0, 4.0]], dtype=np.float32))
+
+    result = cache.get_many('model', ['b', 'c', 'a'])
+
+    assert result[0].tolist() == [3.0, 4.0]
+    assert result[1] is None
+    assert result[2].tolist() == [1.0, 2.0]
+
+    # keys are scoped per model
+    assert cache.get_many('other-model', ['a']) == [None]
+
+
+def test_lru_byte_budget_evicts_oldest():
+    """Test the memory tier stays within its byte budget."""
+    row_bytes = np.zeros(4, dtype=np.float32).nbytes
+    cache = EmbeddingCache(max_bytes=2 * row_bytes)
+
+    cache.put_many('model', ['a', 'b'], np.ones((2, 4), dtype=np.float32))
+    cache.get_many('model', ['a'])  # touch 'a' so 'b' is least recent
+    cache.put_many('model', ['c'], np.ones((1, 4), dtype=np.float32))
+
+    assert cache.stats()['entries'] == 2
+    assert cache.stats()['bytes'] <= 2 * row_bytes
+    hits = cache.get_many('model', ['a', 'b', 'c'])
+    assert hits[0] is not None
+    assert hits[1] is None
+    assert hits[2] is not None
+
+
+def test_disk_tier_survives_memory_clear(tmp_path):
+    """Test embeddings are reloaded from the disk tier at full precision."""
+    embedding = np.array([[0.1, -1 / 3]], dtype=np.float32)
+    cache = EmbeddingCache(cache_dir=tmp_path)
+    cache.put_many('org/model', ['hello', 'world'], np.vstack([embedding, embedding]))
+    cache.clear()
+
+    result = EmbeddingCache(cache_dir=tmp_path).get_many('org/model', ['hello', 'missing', 'hello'])
+
+    assert result[0].dtype == np.float32
+    np.testing.assert_array_equal(result[0], embedding[0])
+    assert result[1] is None
+    np.testing.assert_array_equal(result[2], embedding[0])
+    assert [p.name for p in tmp_path.glob('*.sqlite3')] == ['org--model.sqlite3']
+
+
+if __name__ == '__main__':
+    __import__('pytest').main([__file__, '-v'])
@@ -0,0 +1,161 @@
+"""Local map-reduce pipeline tests - no API required."""
+import asyncio
+
+import pytest
+from lnlp.schemas.chat import ProviderResponse
+from lnlp.services.mapreduce import MapReduceError, MapReducePipeline
+
+MODEL = 'anthropic/claude-haiku-4.5'
+
+
+class SentenceSplitter:
+    """Splits on full stops and packs sentences up to chunk_size by length_function"""
+
+    def split_text(self, text, chunk_size=4000, chunk_overlap=0, length_function=len):
+        chunks, current = [], ''
+        for sentence in (s.strip() + '.' for s in text.split('.') if s.strip()):
+            candidate = f'{current} {sentence}'.strip()
+            if current and length_function(candidate) > chunk_size:
+                chunks.append(current)
+                candidate = sentence
+            current = candidate
+        return chunks + [current] if current else chunks
+
+
+class Splitters:
+
+    def get_spacy_splitter(self):
+        return SentenceSplitter()
+
+
+class EchoProvider:
+    """Answers map prompts with the chunk's first word and reduce prompts by joining"""
+
+    def __init__(self, fail_on=(), context=None):
+        self.fail_on = set(fail_on)
+        self.context = context
+        self.calls = []
+        self.running = self.peak = 0
+
+    async def context_length(self, model):
+        return self.context
+
+    async def query(self, request):
+        content = request.messages[0].content
+        self.calls.append(content)
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+
+        prompt, body = content.split('\n\n', 1)
+        if any(word in body for word in self.fail_on):
+            raise RuntimeError('upstream failed')
+        answer = body.split()[0] if prompt == 'MAP' else '+'.join(p.strip() for p in body.split('---'))
+        return ProviderResponse(
+            id='gen', model=MODEL, created=0,
+            choices=[{'message': {'role': 'assistant', 'content': answer}}],
+            usage={'prompt_tokens': 10, 'completion_tokens': 1, 'total_tokens': 11}
+        )
+
+
+TEXT = ' '.join(f'Word{i} and some more filler text here.' for i in range(12))
+
+
+@pytest.mark.asyncio
+async def test_map_then_hierarchical_reduce():
+    """Test every chunk is mapped and partials reduce level by level to one answer."""
+    provider = EchoProvider()
+    pipeline = MapReducePipeline(provider, Splitters(), chunk_tokens=20, max_concurrency=4)
+
+    result = await pipeline.run(TEXT, MODEL, 'MAP', 'REDUCE', chunk_tokens=20)
+
+    assert result.chunks > 2
+    assert result.levels >= 1
+    assert result.content.split('+') == [chunk.split()[0] for chunk in pipeline.split(TEXT, MODEL, 20)]
+    assert result.usage['total_tokens'] == 11 * len(provider.calls)
+    assert provider.peak <= 4
+
+
+@pytest.mark.asyncio
+async def test_single_chunk_needs_no_reduce():
+    """Test text that fits one chunk is answered by the map call alone."""
+    provider = EchoProvider()
+    pipeline = MapReducePipeline(provider, Splitters(), chunk_tokens=10000)
+
+    result = await pipeline.run('Short text.', MODEL, 'MAP', 'REDUCE')
+
+    assert result.content == 'Short'
+    assert result.levels == 0
+    assert len(provider.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_only_reruns_failed_chunks():
+    """Test a failed chunk fails the run and a retry reuses the cached partials."""
+    provider = EchoProvider(fail_on={'Word5'})
+    pipeline = MapReducePipeline(provider, Splitters(), chunk_tokens=20)
+
+    with pytest.raises(MapReduceError) as exc:
+        await pipeline.run(TEXT, MODEL, 'MAP', 'REDUCE')
+    assert exc.value.stage == 'map'
+    assert len(exc.value.failed) == 1
+    map_calls = len(provider.calls)
+
+    provider.fail_on.clear()
+    provider.calls.clear()
+    await pipeline.run(TEXT, MODEL, 'MAP', 'REDUCE')
+
+    assert sum(call.startswith('MAP') for call in provider.calls) == 1
+    assert map_calls > 1
+
+
+@pytest.mark.asyncio
+async def test_chunk_budget_beyond_context_rejected():
+    """Test chunk_tokens that cannot fit the model context fail before any call."""
+    provider = EchoProvider(context=4096)
+    pipeline = MapReducePipeline(provider, Splitters())
+
+    with pytest.raises(ValueError, match='context'):
+        await pipeline.run(TEXT, MODEL, 'MAP', 'REDUCE', max_tokens=1024, chunk_tokens=4000)
+    assert provider.calls == []
+
+    result = await pipeline.run(TEXT, MODEL, 'MAP', 'REDUCE', max_tokens=1024, chunk_tokens=2000)
+    assert result.chunks == 1
+
+
+def test_group_packs_partials_under_budget():
+    """Test partials are grouped in order without exceeding the budget."""
+    pipeline = MapReducePipeline(EchoProvider(), Splitters())
+    partials = ['alpha beta', 'gamma delta', 'epsilon zeta', 'eta theta']
+
+    groups = pipeline.group(partials, MODEL, budget=6)
+
+    assert [p for g in groups for p in g] == partials
+    assert 1 < len(groups) < len(partials)
+
+
+def test_group_always_makes_progress():
+    """Test partials larger than the budget are still reduced in pairs."""
+    pipeline = MapReducePipeline(EchoProvider(), Splitters())
+    partials = ['one two three four'] * 4
+
+    assert len(pipeline.group(partials, MODEL, budget=1)) == 2
+
+
+
+def test_group_never_exceeds_budget_with_oversized_partial():
+    """Test a partial larger than the budget is truncated rather than paired."""
+    from lnlp.services.tokens import token_counter
+    pipeline = MapReducePipeline(EchoProvider(), Splitters())
+    partials = ['alpha beta', ' '.join(['word'] * 200), 'gamma delta', ' '.join(['more'] * 200)]
+
+    groups = pipeline.group(partials, MODEL, budget=20)
+
+    assert len(groups) < len(partials)
+    assert all(sum(token_counter.count(p, MODEL) for p in g) <= 20 for g in groups)
+    assert groups[0][0] == 'alpha beta'
+
+
+if __name__ == '__main__':
+    __import__('pytest').main([__file__, '-v'])
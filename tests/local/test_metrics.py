@@ -2,7 +2,7 @@
 import time
 
 import pytest
-from lnlp.utils.metrics import EndpointMetric, MetricsService
+from lnlp.utils.metrics import EndpointMetric, Histogram, LatencyHistogram, MetricsService, RingBuffer, TimeSeries
 
 
 def test_endpoint_metric_initialization():
@@ -95,6 +95,46 @@ def test_max_history_limit():
     assert len(metrics['system']['memory_usage']) <= 4
 
 
+def test_ring_buffer_wraps_in_order():
+    """Test the ring buffer keeps the newest points in time order."""
+    ring = RingBuffer(3)
+    for t in range(5):
+        ring.append(float(t), t * 10.0)
+
+    assert len(ring) == 3
+    assert ring.to_list() == [(2.0, 20.0), (3.0, 30.0), (4.0, 40.0)]
+    assert RingBuffer(3).to_list() == []
+
+
+def test_rollups_average_each_period():
+    """Test rollups emit the mean of each completed period."""
+    series = TimeSeries(capacity=100, interval=1)
+    for t in range(25):
+        series.append(float(t), float(t))
+
+    assert '1s' not in series.rollups
+    assert series.to_list('10s') == [(0.0, 4.5), (10.0, 14.5)]
+    assert series.to_list('60s') == []
+
+
+def test_sampler_records_at_interval():
+    """Test the background sampler fills the history and get_metrics does not sample."""
+    service = MetricsService(max_history=50)
+    before = len(service.get_metrics()['system']['cpu_usage'])
+    assert len(service.get_metrics()['system']['cpu_usage']) == before
+
+    service.start_sampler(0.02)
+    time.sleep(0.2)
+    service.stop_sampler()
+
+    points = service.get_metrics()['system']['cpu_usage']
+    assert len(points) >= 5
+    assert all(b[0] > a[0] for a, b in zip(points, points[1:]))
+    assert service.get_metrics(resolution='1s')['system']['resolutions'] == ['1s', '10s', '60s']
+    with pytest.raises(ValueError):
+        service.get_metrics(resolution='5m')
+
+
 def test_endpoint_sorting():
     """Test that endpoints are sorted by count."""
     service = MetricsService()
@@ -118,6 +158,145 @@ def test_endpoint_sorting():
     assert endpoints[2]['count'] == 1
 
 
+def test_latency_histogram_percentiles():
+    """Test log-bucketed percentiles stay within the bucket precision and max is exact."""
+    histogram = LatencyHistogram()
+
+    for ms in range(1, 1001):
+        histogram.record(ms * 1_000_000)
+
+    p50, p90, p99 = histogram.percentiles(0.5, 0.9, 0.99)
+    assert p50 == pytest.approx(500_000_000, rel=0.04)
+    assert p90 == pytest.approx(900_000_000, rel=0.04)
+    assert p99 == pytest.approx(990_000_000, rel=0.04)
+    assert histogram.max == 1_000_000_000
+    assert LatencyHistogram().percentiles(0.5) == [0]
+
+
+def test_track_request_percentiles_and_bytes():
+    """Test endpoint summaries include latency percentiles and body sizes."""
+    service = MetricsService()
+
+    for _ in range(99):
+        service.track_request('/chat/{provider}', 'POST', 0.1, request_bytes=200, response_bytes=1000)
+    service.track_request('/chat/{provider}', 'POST', 3.0, request_bytes=200, response_bytes=0, status=502)
+
+    endpoint = service.get_metrics()['endpoints'][0]
+    assert endpoint['p50'] == pytest.approx(0.1, rel=0.04)
+    assert endpoint['p99'] == pytest.approx(0.1, rel=0.04)
+    assert endpoint['max_time'] == pytest.approx(3.0)
+    assert endpoint['request_bytes'] == 20_000
+    assert endpoint['response_bytes'] == 99_000
+    assert endpoint['errors'] == 1
+
+
+@pytest.mark.asyncio
+async def test_middleware_labels_route_template(monkeypatch):
+    """Test the ASGI middleware records by route template and counts body bytes."""
+    import httpx
+    from fastapi import FastAPI
+    from lnlp.api import app as app_module
+
+    service = MetricsService()
+    monkeypatch.setattr(app_module, 'metrics_service', service)
+    app = FastAPI()
+    app.add_middleware(app_module.MetricsMiddleware)
+
+    @app.post('/items/{item_id}')
+    async def echo(item_id: str, body: dict):
+        return body
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        await client.post('/items/1', json={'a': 1})
+        await client.post('/items/2', json={'a': 2})
+        await client.get('/missing')
+
+    endpoints = {(e['method'], e['path']): e for e in service.get_metrics()['endpoints']}
+    item = endpoints[('POST', '/items/{item_id}')]
+    assert item['count'] == 2
+    assert item['request_bytes'] == item['response_bytes'] == 2 * len(b'{"a":1}')
+    assert ('GET', app_module.UNMATCHED_ROUTE) in endpoints
+
+
+def test_histogram_buckets():
+    """Test histogram bucket assignment and summary."""
+    histogram = Histogram((1, 8, 32))
+
+    for value in (1, 5, 8, 20, 100):
+        histogram.observe(value)
+
+    data = histogram.to_dict()
+    assert data['buckets'] == {'<=1': 1, '<=8': 2, '<=32': 1, '>32': 1}
+    assert data['count'] == 5
+    assert data['mean'] == pytest.approx(26.8)
+
+
+def test_track_batch():
+    """Test encode batch statistics are reported."""
+    service = MetricsService()
+
+    service.track_batch(batch_size=40, queue_depth=3)
+    service.track_batch(batch_size=4, queue_depth=1)
+
+    batching = service.get_metrics()['batching']
+    assert batching['batch_size']['count'] == 2
+    assert batching['batch_size']['mean'] == 22
+    assert batching['queue_depth']['buckets']['<=4'] == 1
+
+
+def test_track_cache():
+    """Test cache counters and hit rate."""
+    service = MetricsService()
+
+    service.track_cache('embeddings', hits=3, misses=1)
+    service.track_cache('embeddings', evictions=2)
+
+    cache = service.get_metrics()['caches'][0]
+    assert cache['name'] == 'embeddings'
+    assert cache['hits'] == 3
+    assert cache['misses'] == 1
+    assert cache['evictions'] == 2
+    assert cache['hit_rate'] == 0.75
+
+
+def test_track_connection():
+    """Test outbound connection reuse rate."""
+    service = MetricsService()
+
+    service.track_connection('openrouter', new_connection=True)
+    for _ in range(3):
+        service.track_connection('openrouter', new_connection=False)
+
+    pool = service.get_metrics()['connections'][0]
+    assert pool['requests'] == 4
+    assert pool['new_connections'] == 1
+    assert pool['reuse_rate'] == 0.75
+
+
+def test_increment_counters():
+    """Test named event counters."""
+    service = MetricsService()
+
+    service.increment('openrouter_coalesced')
+    service.increment('openrouter_coalesced', 2)
+
+    assert service.get_metrics()['counters'] == {'openrouter_coalesced': 3}
+
+
+def test_observe_histogram():
+    """Test named latency histograms."""
+    service = MetricsService()
+
+    service.observe('ratelimit_opus_queue_wait', 0.004)
+    service.observe('ratelimit_opus_queue_wait', 2.0)
+
+    histogram = service.get_metrics()['histograms']['ratelimit_opus_queue_wait']
+    assert histogram['count'] == 2
+    assert histogram['buckets']['<=0.005'] == 1
+    assert histogram['buckets']['<=2.5'] == 1
+
+
 def test_uptime_calculation():
     """Test uptime calculation."""
     service = MetricsService()
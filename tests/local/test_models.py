@@ -0,0 +1,120 @@
+"""Local model resolution tests - no API required."""
+import asyncio
+
+import pytest
+from lnlp.services.models import CatalogueSnapshot, ModelCatalogue, _latest_in_family
+
+MODELS = [
+    {'id': 'anthropic/claude-3-haiku', 'created': 100},
+    {'id': 'anthropic/claude-haiku-4.5', 'created': 300},
+    {'id': 'anthropic/claude-sonnet-4', 'created': 200},
+    {'id': 'openai/gpt-4o', 'created': 400},
+]
+
+
+class FakeFetch:
+    """Counts calls and returns a model list after a short delay"""
+
+    def __init__(self, models=MODELS, error=None):
+        self.calls = 0
+        self.models = models
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.error:
+            raise self.error
+        return list(self.models)
+
+
+def test_latest_in_family():
+    """Test the newest model in a family is chosen."""
+    assert _latest_in_family(MODELS, 'haiku') == 'anthropic/claude-haiku-4.5'
+    with pytest.raises(ValueError):
+        _latest_in_family(MODELS, 'opus')
+
+
+def test_snapshot_indexes_ids_and_aliases():
+    """Test snapshot lookups by id and openrouter/ alias."""
+    snapshot = CatalogueSnapshot.build(MODELS)
+
+    assert snapshot.lookup('openai/gpt-4o')['created'] == 400
+    assert snapshot.lookup('openrouter/openai/gpt-4o') is snapshot.lookup('openai/gpt-4o')
+    assert snapshot.lookup('missing/model') is None
+    assert snapshot.latest == {'haiku': 'anthropic/claude-haiku-4.5', 'sonnet': 'anthropic/claude-sonnet-4'}
+    assert snapshot.available[0] == ('openrouter/anthropic/claude-3-haiku', None)
+    assert snapshot.listing[3].name == 'openrouter/openai/gpt-4o'
+    assert snapshot.listing[3].provider == 'openrouter'
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_fetch():
+    """Test a cold cache is filled by a single in-flight fetch."""
+    cache = ModelCatalogue(ttl=lambda: 3600)
+    fetch = FakeFetch()
+
+    results = await asyncio.gather(*(cache.get(fetch) for _ in range(10)))
+
+    assert fetch.calls == 1
+    assert all(result is results[0] for result in results)
+    assert results[0].models == MODELS
+
+
+@pytest.mark.asyncio
+async def test_stale_list_served_while_refreshing():
+    """Test an expiring list is returned immediately and refreshed in the background."""
+    cache = ModelCatalogue(ttl=lambda: 0, refresh_ahead=0)
+    await cache.get(FakeFetch())
+
+    refresh = FakeFetch(models=MODELS[:1])
+    assert (await cache.get(refresh)).models == MODELS
+
+    await asyncio.sleep(0.05)
+    assert refresh.calls == 1
+    assert cache.snapshot.models == MODELS[:1]
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_cached_list():
+    """Test a refresh failure does not drop the cached list."""
+    cache = ModelCatalogue(ttl=lambda: 0, refresh_ahead=0)
+    await cache.get(FakeFetch())
+
+    assert (await cache.get(FakeFetch(error=RuntimeError('down')))).models == MODELS
+    await asyncio.sleep(0.05)
+    assert cache.snapshot.models == MODELS
+
+
+
+@pytest.mark.asyncio
+async def test_short_ttl_not_refreshed_on_every_call():
+    """Test a TTL shorter than refresh_ahead still serves the snapshot for half the TTL."""
+    cache = ModelCatalogue(ttl=lambda: 60, refresh_ahead=300)
+    await cache.get(FakeFetch())
+
+    refresh = FakeFetch()
+    await cache.get(refresh)
+    await asyncio.sleep(0.02)
+    assert refresh.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_backs_off():
+    """Test requests after a failed refresh do not start another fetch until the backoff passes."""
+    cache = ModelCatalogue(ttl=lambda: 0, refresh_ahead=0, retry_delay=60)
+    await cache.get(FakeFetch())
+
+    failing = FakeFetch(error=RuntimeError('down'))
+    await cache.get(failing)
+    await asyncio.sleep(0.05)
+    for _ in range(5):
+        await cache.get(failing)
+    await asyncio.sleep(0.05)
+
+    assert failing.calls == 1
+    assert cache.snapshot.models == MODELS
+
+
+if __name__ == '__main__':
+    __import__('pytest').main([__file__, '-v'])
@@ -0,0 +1,104 @@
+"""Local OpenMetrics exposition tests - no API required."""
+import re
+
+import pytest
+from lnlp.utils.metrics import MetricsService
+from lnlp.utils.openmetrics import render_openmetrics, runtime_state
+
+
+def samples(text):
+    """Map of sample name with labels to value"""
+    return {line.rsplit(' ', 1)[0]: float(line.rsplit(' ', 1)[1])
+            for line in text.splitlines() if line and not line.startswith('#')}
+
+
+@pytest.fixture
+def service():
+    service = MetricsService()
+    for duration in (0.004, 0.02, 0.02, 0.3, 4.0):
+        service.track_request('/chat/{provider}', 'POST', duration, request_bytes=100, response_bytes=50)
+    service.track_request('/health', 'GET', 0.001, status=503)
+    service.increment('openrouter_retries', 2)
+    service.observe('openrouter_upstream_latency', 0.2)
+    service.adjust_gauge('http_requests_in_flight', 1)
+    return service
+
+
+def test_route_counters_and_histogram(service):
+    """Test per-route counters and cumulative latency buckets."""
+    text = render_openmetrics(service.snapshot())
+    values = samples(text)
+    labels = 'route="/chat/{provider}",method="POST"'
+
+    assert values[f'lnlp_http_requests_total{{{labels}}}'] == 5
+    assert values[f'lnlp_http_request_bytes_total{{{labels}}}'] == 500
+    assert values['lnlp_http_request_errors_total{route="/health",method="GET"}'] == 1
+    assert values[f'lnlp_http_request_duration_seconds_bucket{{{labels},le="0.005"}}'] == 1
+    assert values[f'lnlp_http_request_duration_seconds_bucket{{{labels},le="0.025"}}'] == 3
+    assert values[f'lnlp_http_request_duration_seconds_bucket{{{labels},le="0.5"}}'] == 4
+    assert values[f'lnlp_http_request_duration_seconds_bucket{{{labels},le="+Inf"}}'] == 5
+    assert values[f'lnlp_http_request_duration_seconds_sum{{{labels}}}'] == pytest.approx(4.344)
+
+    buckets = [v for k, v in values.items() if k.startswith('lnlp_http_request_duration_seconds_bucket{route="/chat')]
+    assert buckets == sorted(buckets)
+
+
+def test_counters_gauges_and_histograms(service):
+    """Test named counters, gauges and histograms follow OpenMetrics naming."""
+    text = render_openmetrics(service.snapshot())
+    values = samples(text)
+
+    assert '# TYPE lnlp_openrouter_retries counter' in text
+    assert values['lnlp_openrouter_retries_total'] == 2
+    assert values['lnlp_http_requests_in_flight'] == 1
+    assert values['lnlp_openrouter_upstream_latency_bucket{le="0.25"}'] == 1
+    assert values['lnlp_openrouter_upstream_latency_count'] == 1
+    assert text.endswith('# EOF\n')
+
+
+def test_label_values_escaped():
+    """Test quotes, backslashes and newlines in labels are escaped."""
+    service = MetricsService()
+    service.track_request('/a"b\\c\n', 'GET', 0.1)
+
+    assert r'route="/a\"b\\c\n"' in render_openmetrics(service.snapshot())
+
+
+@pytest.mark.asyncio
+async def test_runtime_state_rendered(service):
+    """Test process, thread pool and model state are exposed."""
+    class Splitters:
+        def health_check(self):
+            return {'spacy': {'loaded': True}, 'similarity': {'loaded': False}}
+
+    text = render_openmetrics(service.snapshot(), runtime_state(Splitters()))
+    values = samples(text)
+
+    assert values['process_resident_memory_bytes'] > 0
+    assert 'process_cpu_seconds_total' in values
+    assert values['lnlp_model_loaded{model="spacy"}'] == 1
+    assert values['lnlp_model_loaded{model="similarity"}'] == 0
+    assert re.search(r'^lnlp_threadpool_queued\{pool="anyio"\} \d+$', text, re.MULTILINE)
+
+
+
+@pytest.mark.asyncio
+async def test_exposition_parses_as_openmetrics(service):
+    """Test the whole exposition round-trips through a real OpenMetrics parser."""
+    parser = pytest.importorskip('prometheus_client.openmetrics.parser')
+    from lnlp.utils.aggregation import MemoryMetricsStore
+    service.track_cache('embeddings', hits=2, misses=1)
+    service.share(MemoryMetricsStore(), worker_id='host:1')
+    merged, workers = service.aggregate()
+
+    text = render_openmetrics(merged, runtime_state(), workers=workers)
+    families = {family.name: family for family in parser.text_string_to_metric_families(text)}
+
+    assert families['lnlp_http_requests'].type == 'counter'
+    assert len(families['lnlp_http_requests'].samples) == 2
+    assert families['lnlp_http_request_duration_seconds'].type == 'histogram'
+    assert families['lnlp_worker_up'].samples[0].labels == {'worker': 'host:1'}
+
+
+if __name__ == '__main__':
+    __import__('pytest').main([__file__, '-v'])
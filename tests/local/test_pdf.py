@@ -1,7 +1,9 @@
 """Local PDF extraction tests - no API required."""
 import os
 
-from lnlp.services.pdf import PDFTextExtractor
+import pdfplumber
+from lnlp.services.pdf import PDFTextExtractor, _page_ranges
+from lnlp.services.pdf import shutdown_process_pool
 
 
 def verify_pdf_content(html_content: str):
@@ -64,5 +66,54 @@ def test_pdf_extraction(test_data_dir):
     verify_pdf_content(extracted_html)
 
 
+def test_word_store_parsed_once(test_data_dir, monkeypatch):
+    """Lines and HTML extraction share a single pass over the PDF"""
+    pdf_path = os.path.join(test_data_dir, 'transcripts', 'SPOT.pdf')
+    extractor = PDFTextExtractor(pdf_path)
+
+    opened = []
+    original_open = pdfplumber.open
+
+    def counting_open(*args, **kwargs):
+        opened.append(args)
+        return original_open(*args, **kwargs)
+
+    monkeypatch.setattr(pdfplumber, 'open', counting_open)
+
+    lines = extractor.extract_lines()
+    html = extractor.extract_html()
+
+    assert len(opened) == 1
+    assert len(extractor.load_pages()) == 16
+    assert lines
+    verify_pdf_content(html)
+
+
+def test_page_ranges():
+    """Page ranges cover every page exactly once in order"""
+    assert _page_ranges(10, 3) == [(0, 4), (4, 8), (8, 10)]
+    assert _page_ranges(2, 4) == [(0, 1), (1, 2)]
+    assert _page_ranges(16, 1) == [(0, 16)]
+
+
+def test_parallel_extraction_matches_serial(test_data_dir):
+    """Page-parallel parsing produces the same output as in-process parsing"""
+    pdf_path = os.path.join(test_data_dir, 'transcripts', 'SPOT.pdf')
+    with open(pdf_path, 'rb') as f:
+        content = f.read()
+
+    serial = PDFTextExtractor(content)
+    parallel = PDFTextExtractor(content, workers=2, parallel_min_pages=1)
+    assert parallel._should_parallelize(16)
+    assert not PDFTextExtractor(content, workers=2)._should_parallelize(16)
+
+    try:
+        assert parallel.load_pages() == serial.load_pages()
+        assert parallel.extract_lines() == serial.extract_lines()
+        assert parallel.extract_html() == serial.extract_html()
+    finally:
+        shutdown_process_pool()
+
+
 if __name__ == '__main__':
     __import__('pytest').main([__file__])
@@ -1,6 +1,7 @@
 """Local PDF extraction edge case tests - no API required."""
+import numpy as np
 import pytest
-from lnlp.services.pdf import PDFTextExtractor
+from lnlp.services.pdf import LineFilter, PageWords, PDFTextExtractor, _page_ranges
 
 
 def test_text_cleaning():
@@ -95,6 +96,56 @@ def test_cluster_positions():
     assert len(clusters[1]) == 2  # 0.5, 0.51
 
 
+def test_cluster_vertical_positions():
+    """Test running-statistics vertical position clustering."""
+    extractor = PDFTextExtractor(b'dummy')
+
+    tops = np.array([0.5, 0.1, 0.101, 0.502, 0.9, 0.102])
+    means = extractor._cluster_vertical_positions(tops, threshold=0.01)
+
+    # 0.9 is a singleton and falls below min_cluster_size
+    assert len(means) == 2
+    assert means[0] == pytest.approx(0.101)
+    assert means[1] == pytest.approx(0.501)
+
+
+def test_analyze_vertical_positions_assigns_clusters():
+    """Test cluster IDs are assigned to repeated text positions."""
+    extractor = PDFTextExtractor(b'dummy')
+    pages = [
+        PageWords(page_num=num, width=612, height=792, words=[
+            {'text': 'HEADER', 'top': 10 + num * 0.1, 'fontname': 'F', 'size': 9},
+            {'text': f'body {num}', 'top': 400, 'fontname': 'F', 'size': 11},
+        ])
+        for num in range(1, 5)
+    ]
+
+    positions = extractor._analyze_vertical_positions(pages)
+
+    assert [pos['cluster'] for pos in positions['HEADER']] == [0, 0, 0, 0]
+    assert positions['body 1'][0]['cluster'] is None
+
+
+def test_line_filter_matches_individual_patterns():
+    """Test combined line filter agrees with per-pattern regex checks."""
+    import re
+    line_filter = LineFilter({'ACME Corp'}, {'Quarterly Report'},
+                             PDFTextExtractor.FOOTER_PATTERNS,
+                             PDFTextExtractor.PAGE_NUMBER_PATTERNS)
+    lines = ['42', 'Page 3 of 10', 'see page 7 here', 'Copyright 2024 ACME',
+             'all rights reserved', 'ACME Corp', 'ACME Corp news', 'Revenue grew',
+             'Quarterly Report', 'The 2024 outlook', '- 12 -']
+
+    for line in lines:
+        assert line_filter.is_footer_pattern(line) == any(
+            re.search(pattern, line, re.IGNORECASE) for pattern in PDFTextExtractor.FOOTER_PATTERNS)
+        assert line_filter.is_page_number(line) == any(
+            re.match(pattern, line, re.IGNORECASE) for pattern in PDFTextExtractor.PAGE_NUMBER_PATTERNS)
+        assert line_filter.contains_header_footer(line) == any(
+            text in line for text in ('ACME Corp', 'Quarterly Report'))
+        assert line_filter.is_header_footer(line) == (line in {'ACME Corp', 'Quarterly Report'})
+
+
 def test_config_override():
     """Test configuration override."""
     extractor = PDFTextExtractor(
@@ -127,5 +178,17 @@ def test_is_list_item():
     assert not extractor._is_list_item('', indent=100, page_width=600)
 
 
+
+def test_page_ranges_empty_and_short_documents():
+    """Test sharding handles empty PDFs and fewer pages than workers."""
+    assert _page_ranges(0, 4) == []
+    assert _page_ranges(3, 8) == [(0, 1), (1, 2), (2, 3)]
+    assert _page_ranges(10, 4) == [(0, 3), (3, 6), (6, 9), (9, 10)]
+
+    extractor = PDFTextExtractor(b'dummy', workers=4, parallel_min_pages=0)
+    assert not extractor._should_parallelize(0)
+    assert extractor._load_pages_parallel(0) == []
+
+
 if __name__ == '__main__':
     __import__('pytest').main([__file__, '-v'])
@@ -0,0 +1,269 @@
+"""Local provider tests - no API required."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from lnlp.schemas.chat import ChatMessage, ProviderRequest
+from lnlp.services.provider import LLMProvider
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    """Create a provider with a placeholder API key"""
+    from lnlp.config import get_settings
+    monkeypatch.setenv('OPENROUTER_API_KEY', 'test-key')
+    get_settings.cache_clear()
+    yield LLMProvider()
+    get_settings.cache_clear()
+
+
+def test_client_shared_within_event_loop(provider):
+    """Test one pooled client is reused for every call on a loop."""
+    async def get_twice():
+        first = provider._get_client()
+        second = provider._get_client()
+        await provider.aclose()
+        return first, second
+
+    first, second = asyncio.run(get_twice())
+    assert first is second
+
+
+def test_client_per_event_loop(provider):
+    """Test separate event loops get separate clients."""
+    async def get_client():
+        return provider._get_client()
+
+    assert asyncio.run(get_client()) is not asyncio.run(get_client())
+
+
+def test_aclose_releases_client(provider):
+    """Test closing drops the loop's client so the next call builds a new one."""
+    async def close_and_reopen():
+        first = provider._get_client()
+        await provider.aclose()
+        second = provider._get_client()
+        await provider.aclose()
+        return first, second
+
+    first, second = asyncio.run(close_and_reopen())
+    assert first is not second
+
+
+class FakeStream:
+    """Async iterator of chat completion chunks that records closing"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.closed = False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for chunk in self.chunks:
+            yield chunk
+
+    async def close(self):
+        self.closed = True
+
+
+def make_chunk(content=None, finish_reason=None, usage=None):
+    choices = [] if content is None and finish_reason is None else [
+        SimpleNamespace(delta=SimpleNamespace(content=content), finish_reason=finish_reason)
+    ]
+    return SimpleNamespace(
+        id='gen-1', model='anthropic/claude-haiku-4.5', choices=choices,
+        usage=SimpleNamespace(model_dump=lambda: usage) if usage else None
+    )
+
+
+@pytest.fixture
+def streaming_provider(provider, monkeypatch):
+    """Provider whose upstream returns a canned token stream"""
+    upstream = FakeStream([
+        make_chunk('Hel'),
+        make_chunk('lo'),
+        make_chunk(finish_reason='stop'),
+        make_chunk(usage={'prompt_tokens': 3, 'completion_tokens': 2, 'total_tokens': 5}),
+    ])
+    captured = {}
+
+    async def create(**params):
+        captured.update(params)
+        return upstream
+
+    async def no_model_info(model):
+        return None
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(provider, '_get_client', lambda: client)
+    monkeypatch.setattr(provider, '_get_model_info', no_model_info)
+    return provider, upstream, captured
+
+
+def test_stream_relays_deltas_and_usage(streaming_provider):
+    """Test streamed deltas arrive in order followed by a usage event."""
+    provider, upstream, captured = streaming_provider
+    request = ProviderRequest(model='openrouter/anthropic/claude-haiku-4.5', messages=[ChatMessage(content='hi')])
+
+    async def collect():
+        return [event async for event in provider.stream(request)]
+
+    events = asyncio.run(collect())
+
+    assert [e['content'] for e in events if e['event'] == 'delta'] == ['Hel', 'lo']
+    assert events[-1]['event'] == 'done'
+    assert events[-1]['finish_reason'] == 'stop'
+    assert events[-1]['usage']['total_tokens'] == 5
+    assert captured['stream'] is True
+    assert captured['model'] == 'anthropic/claude-haiku-4.5'
+    assert upstream.closed
+
+
+def test_stream_closing_early_closes_upstream(streaming_provider):
+    """Test abandoning the stream closes the upstream request."""
+    provider, upstream, _ = streaming_provider
+    request = ProviderRequest(model='anthropic/claude-haiku-4.5', messages=[ChatMessage(content='hi')])
+
+    async def first_then_close():
+        events = provider.stream(request)
+        first = await anext(events)
+        await events.aclose()
+        return first
+
+    assert asyncio.run(first_then_close())['content'] == 'Hel'
+    assert upstream.closed
+
+
+def test_stream_retry_takes_a_slot_per_attempt(streaming_provider, monkeypatch):
+    """Test a retried stream releases its slot between attempts and holds one while streaming."""
+    import httpx
+    import openai
+    provider, upstream, _ = streaming_provider
+    provider.resilience.base_delay = 0.001
+    limiter = provider.rate_limiter.for_model('anthropic/claude-haiku-4.5')
+    acquire = limiter.acquire
+    acquired, in_use = [], []
+
+    def counting_acquire(tokens=0):
+        acquired.append(tokens)
+        return acquire(tokens)
+
+    monkeypatch.setattr(limiter, 'acquire', counting_acquire)
+
+    request_500 = httpx.Request('POST', 'http://test/chat/completions')
+    failures = [openai.APIStatusError('upstream error', response=httpx.Response(500, request=request_500), body=None)]
+
+    async def create(**params):
+        in_use.append(limiter.max_concurrency - limiter._semaphore._value)
+        if failures:
+            raise failures.pop()
+        return upstream
+
+    provider._get_client().chat.completions.create = create
+    request = ProviderRequest(model='anthropic/claude-haiku-4.5', messages=[ChatMessage(content='hi')])
+
+    async def collect():
+        held = []
+        async for event in provider.stream(request):
+            if event['event'] == 'delta':
+                held.append(limiter.max_concurrency - limiter._semaphore._value)
+        return held
+
+    held = asyncio.run(collect())
+
+    assert len(acquired) == 2
+    assert in_use == [1, 1]
+    assert set(held) == {1}
+    assert limiter._semaphore._value == limiter.max_concurrency
+
+
+@pytest.fixture
+def catalogued_provider(provider, monkeypatch):
+    """Provider whose catalogue knows one model with a small context"""
+    async def model_info(model):
+        return {'id': model, 'context_length': 1000, 'top_provider': {'max_completion_tokens': 300}}
+
+    monkeypatch.setattr(provider, '_get_model_info', model_info)
+    return provider
+
+
+def test_max_tokens_clamped_to_remaining_context(catalogued_provider):
+    """Test max_tokens never exceeds the context left after the prompt or the completion limit."""
+    def params_for(content, max_tokens=None):
+        request = ProviderRequest(model='anthropic/claude-haiku-4.5', messages=[ChatMessage(content=content)],
+                                  max_tokens=max_tokens)
+        return asyncio.run(catalogued_provider._openrouter_params(request))
+
+    params, prompt_tokens = params_for('hello')
+    assert params['max_tokens'] == 300
+
+    params, prompt_tokens = params_for('word ' * 800)
+    assert params['max_tokens'] == 1000 - prompt_tokens
+
+    params, _ = params_for('hello', max_tokens=50)
+    assert params['max_tokens'] == 50
+
+    with pytest.raises(ValueError, match='exceeds'):
+        params_for('word ' * 2000)
+
+
+def test_query_batch_bounded_and_in_completion_order(provider, monkeypatch):
+    """Test batch items run under the concurrency cap, arrive as they finish and fail individually."""
+    running = peak = 0
+
+    async def query(request):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(float(request.messages[0].content))
+        running -= 1
+        if request.model == 'broken':
+            raise ValueError('bad model')
+        return request.messages[0].content
+
+    monkeypatch.setattr(provider, 'query', query)
+    delays = ['0.2', '0.01', '0.05', '0.1']
+    requests = [ProviderRequest(model='broken' if i == 2 else 'm', messages=[ChatMessage(content=d)])
+                for i, d in enumerate(delays)]
+
+    async def collect():
+        return [item async for item in provider.query_batch(requests, max_concurrency=2)]
+
+    results = asyncio.run(collect())
+
+    assert peak == 2
+    assert [index for index, _ in results] == [1, 2, 3, 0]
+    assert isinstance(dict(results)[2], ValueError)
+    assert dict(results)[3] == '0.1'
+
+
+def test_query_batch_close_cancels_running(provider, monkeypatch):
+    """Test closing the batch early cancels requests still in flight."""
+    cancelled = 0
+
+    async def query(request):
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(float(request.messages[0].content))
+        except asyncio.CancelledError:
+            cancelled += 1
+            raise
+        return request
+
+    monkeypatch.setattr(provider, 'query', query)
+    requests = [ProviderRequest(model='m', messages=[ChatMessage(content=d)]) for d in ['0', '5', '5']]
+
+    async def first_then_close():
+        results = provider.query_batch(requests, max_concurrency=3)
+        first = await anext(results)
+        await results.aclose()
+        return first
+
+    assert asyncio.run(first_then_close())[0] == 0
+    assert cancelled == 2
+
+
+if __name__ == '__main__':
+    __import__('pytest').main([__file__, '-v'])
@@ -0,0 +1,98 @@
+"""Local rate limiter tests - no API required."""
+import asyncio
+import time
+
+import pytest
+from lnlp.services.ratelimit import ModelLimiter, RateLimiter, RateLimitExceeded, TokenBucket, model_family
+
+
+def test_model_family():
+    """Test models map to their configured family."""
+    assert model_family('openrouter/anthropic/claude-haiku-4.5') == 'haiku'
+    assert model_family('anthropic/claude-opus-4') == 'opus'
+    assert model_family('openai/gpt-4o') == 'openai'
+    assert model_family('local-model') == 'default'
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cap():
+    """Test no more than max_concurrency calls run at once."""
+    limiter = ModelLimiter('test', max_concurrency=2, max_wait=5)
+    running = peak = 0
+
+    async def call():
+        nonlocal running, peak
+        async with limiter.acquire():
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+
+    await asyncio.gather(*(call() for _ in range(6)))
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_with_429():
+    """Test requests beyond the queue bound are rejected immediately."""
+    limiter = ModelLimiter('test', max_concurrency=1, max_queue=1, max_wait=5)
+    held = asyncio.Event()
+    release = asyncio.Event()
+
+    async def hold():
+        async with limiter.acquire():
+            held.set()
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await held.wait()
+    waiter = asyncio.create_task(hold())
+    # acquire() counts the waiter as queued before it first suspends
+    await asyncio.sleep(0)
+    assert limiter._waiting == 1
+
+    with pytest.raises(RateLimitExceeded) as exc:
+        async with limiter.acquire():
+            pass
+    assert exc.value.status_code == 429
+    assert exc.value.retry_after >= 1
+
+    release.set()
+    await asyncio.gather(holder, waiter)
+
+
+@pytest.mark.asyncio
+async def test_queue_wait_timeout_returns_503():
+    """Test a request that cannot get a slot in time is rejected with 503."""
+    limiter = ModelLimiter('test', max_concurrency=1, max_wait=0.02)
+
+    async with limiter.acquire():
+        with pytest.raises(RateLimitExceeded) as exc:
+            async with limiter.acquire():
+                pass
+    assert exc.value.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_budget():
+    """Test the token bucket rejects requests it cannot fund before the deadline."""
+    bucket = TokenBucket(tokens_per_minute=600)
+
+    await bucket.acquire(600, deadline=time.monotonic() + 1)
+    assert bucket.wait_time(60) == pytest.approx(6, rel=0.05)
+
+    with pytest.raises(RateLimitExceeded):
+        await bucket.acquire(60, deadline=time.monotonic() + 0.1)
+
+
+def test_family_overrides():
+    """Test per-family overrides are applied on top of defaults."""
+    limiter = RateLimiter(max_concurrency=8, overrides={'opus': {'max_concurrency': 2}})
+
+    assert limiter.for_model('anthropic/claude-opus-4').max_concurrency == 2
+    assert limiter.for_model('anthropic/claude-haiku-4.5').max_concurrency == 8
+    assert limiter.for_model('anthropic/claude-opus-4') is limiter.for_model('openrouter/anthropic/claude-opus-4.1')
+
+
+if __name__ == '__main__':
+    __import__('pytest').main([__file__, '-v'])
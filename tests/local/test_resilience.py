@@ -0,0 +1,193 @@
+"""Local resilience tests - no API required."""
+import asyncio
+
+import httpx
+import openai
+import pytest
+from lnlp.schemas.chat import ChatMessage, ProviderRequest
+from lnlp.services.resilience import CircuitBreaker, CircuitOpenError, Resilience, is_retryable
+
+
+def status_error(status: int, headers: dict | None = None) -> openai.APIStatusError:
+    request = httpx.Request('POST', 'http://test/chat/completions')
+    response = httpx.Response(status, headers=headers, request=request)
+    return openai.APIStatusError('upstream error', response=response, body=None)
+
+
+class Flaky:
+    """Coroutine factory that fails a set number of times before succeeding"""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return 'ok'
+
+
+def test_is_retryable():
+    """Test only rate limits, server errors and timeouts are retried."""
+    assert is_retryable(status_error(429))
+    assert is_retryable(status_error(502))
+    assert is_retryable(TimeoutError())
+    assert not is_retryable(status_error(400))
+    assert not is_retryable(ValueError('bad request'))
+
+
+def test_backoff_honours_retry_after():
+    """Test backoff is jittered under the cap but never shorter than Retry-After."""
+    resilience = Resilience(base_delay=0.5, max_delay=2)
+    assert all(0 <= resilience.backoff(attempt) <= 2 for attempt in range(1, 10))
+    assert resilience.backoff(1, status_error(429, {'retry-after': '3'})) == 3
+
+
+@pytest.mark.asyncio
+async def test_retries_transient_errors():
+    """Test transient failures are retried until a call succeeds."""
+    resilience = Resilience(max_attempts=3, base_delay=0.001)
+    call = Flaky(status_error(503), status_error(429))
+    assert await resilience.call('model', call) == 'ok'
+    assert call.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_does_not_retry_client_errors():
+    """Test a 400 is returned on the first attempt."""
+    resilience = Resilience(max_attempts=3, base_delay=0.001)
+    call = Flaky(status_error(400))
+    with pytest.raises(openai.APIStatusError):
+        await resilience.call('model', call)
+    assert call.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_attempts():
+    """Test the last error is raised once attempts run out."""
+    resilience = Resilience(max_attempts=2, base_delay=0.001)
+    call = Flaky(status_error(500), status_error(500), status_error(500))
+    with pytest.raises(openai.APIStatusError):
+        await resilience.call('model', call)
+    assert call.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_deadline_bounds_slow_attempts():
+    """Test an attempt running past the request deadline is abandoned."""
+    resilience = Resilience(max_attempts=5, deadline=0.05)
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    with pytest.raises(TimeoutError):
+        await resilience.call('model', hang)
+
+
+def test_circuit_opens_and_probes():
+    """Test the circuit opens after repeated failures and lets one probe through after reset."""
+    breaker = CircuitBreaker('model', failure_threshold=2, reset_timeout=0)
+    breaker.record_failure()
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast():
+    """Test calls are rejected without reaching upstream while the circuit is open."""
+    resilience = Resilience(max_attempts=1, failure_threshold=1, reset_timeout=60)
+    with pytest.raises(openai.APIStatusError):
+        await resilience.call('model', Flaky(status_error(500)))
+
+    call = Flaky()
+    with pytest.raises(CircuitOpenError) as exc:
+        await resilience.call('model', call)
+    assert exc.value.status_code == 503
+    assert call.calls == 0
+
+    assert await resilience.call('other-model', call) == 'ok'
+
+
+@pytest.mark.asyncio
+async def test_hedge_wins_over_slow_request():
+    """Test a slow first request is raced by a hedge and the loser is cancelled."""
+    resilience = Resilience(hedge=True, hedge_min_delay=0.01)
+    for _ in range(20):
+        resilience._tracker('model').record(0.01)
+
+    started = 0
+    cancelled = []
+
+    async def call():
+        nonlocal started
+        started += 1
+        delay = 1 if started == 1 else 0
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(started)
+            raise
+        return f'reply-{started}'
+
+    assert await resilience.call('model', call) == 'reply-2'
+    assert started == 2
+    assert len(cancelled) == 1
+
+
+@pytest.fixture
+def fake_provider(monkeypatch, fake_openrouter):
+    """Create a provider pointed at the fake OpenRouter server"""
+    from lnlp.config import get_settings
+    from lnlp.services.provider import LLMProvider
+    monkeypatch.setenv('OPENROUTER_API_KEY', 'test-key')
+    monkeypatch.setenv('OPENROUTER_BASE_URL', fake_openrouter.url)
+    monkeypatch.setenv('LLM_RETRY_BASE_DELAY', '0.01')
+    monkeypatch.setenv('LLM_CIRCUIT_FAILURES', '3')
+    get_settings.cache_clear()
+    yield LLMProvider()
+    get_settings.cache_clear()
+
+
+def haiku_request() -> ProviderRequest:
+    return ProviderRequest(model='anthropic/claude-haiku-4.5', messages=[ChatMessage(content='hi')], max_tokens=10)
+
+
+@pytest.mark.asyncio
+async def test_provider_retries_against_fake_server(fake_provider, fake_openrouter):
+    """Test the provider recovers from a 429 and a 500 from upstream."""
+    fake_openrouter.fail(429, retry_after=0)
+    fake_openrouter.fail(500)
+
+    response = await fake_provider.query(haiku_request())
+    await fake_provider.aclose()
+
+    assert response.choices[0]['message']['content'] == 'ok'
+    assert fake_openrouter.requests == 3
+
+
+@pytest.mark.asyncio
+async def test_provider_circuit_opens_against_fake_server(fake_provider, fake_openrouter):
+    """Test a persistently failing model trips its circuit."""
+    fake_openrouter.fail(503, times=10)
+
+    with pytest.raises(openai.APIStatusError):
+        await fake_provider.query(haiku_request())
+    with pytest.raises(CircuitOpenError):
+        await fake_provider.query(haiku_request())
+    await fake_provider.aclose()
+
+    assert fake_openrouter.requests == 3
+
+
+if __name__ == '__main__':
+    __import__('pytest').main([__file__, '-v'])
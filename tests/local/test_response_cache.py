@@ -0,0 +1,115 @@
+"""Local chat response cache tests - no API required."""
+import time
+
+import pytest
+from lnlp.schemas.chat import ProviderRequest, ProviderResponse
+from lnlp.services.response_cache import MemoryCacheBackend, RedisCacheBackend, ResponseCache
+from pydantic import ValidationError
+
+
+class FakeRedis:
+    """Local stand-in for the redis.asyncio client"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and time.monotonic() >= expires_at:
+            return None
+        return value
+
+    async def set(self, key, value, px=None):
+        self.data[key] = (value.encode(), time.monotonic() + px / 1000 if px else None)
+
+
+def make_response(total_tokens=30):
+    return ProviderResponse(
+        id='gen-1',
+        model='anthropic/claude-haiku-4.5',
+        choices=[{'index': 0, 'message': {'role': 'assistant', 'content': 'ok'}}],
+        usage={'prompt_tokens': 20, 'completion_tokens': total_tokens - 20, 'total_tokens': total_tokens},
+        created=1700000000
+    )
+
+
+PARAMS = {
+    'model': 'anthropic/claude-haiku-4.5',
+    'messages': [{'role': 'user', 'content': 'hello'}],
+    'temperature': 0.1,
+    'max_tokens': 100,
+}
+
+
+def test_make_key_is_order_independent_and_exact():
+    """Test keys ignore dict ordering but change with any parameter."""
+    reordered = {key: PARAMS[key] for key in reversed(PARAMS)}
+    assert ResponseCache.make_key(PARAMS) == ResponseCache.make_key(reordered)
+    assert ResponseCache.make_key(PARAMS) != ResponseCache.make_key({**PARAMS, 'max_tokens': 101})
+    assert ResponseCache.make_key(PARAMS) != ResponseCache.make_key(
+        {**PARAMS, 'messages': [{'role': 'user', 'content': 'hello!'}]})
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('backend', [
+    MemoryCacheBackend(),
+    RedisCacheBackend(client=FakeRedis()),
+])
+async def test_round_trip(backend):
+    """Test responses survive storage in each backend."""
+    cache = ResponseCache(backend)
+    key = cache.make_key(PARAMS)
+
+    assert await cache.get(key) is None
+    await cache.set(key, make_response())
+
+    assert await cache.get(key) == make_response()
+
+
+@pytest.mark.asyncio
+async def test_ttl_expiry():
+    """Test entries expire after their ttl."""
+    cache = ResponseCache(MemoryCacheBackend())
+    await cache.set('key', make_response(), ttl=0.01)
+    time.sleep(0.02)
+    assert await cache.get('key') is None
+
+
+@pytest.mark.asyncio
+async def test_zero_ttl_is_not_stored():
+    """Test a ttl of zero means no caching rather than caching forever."""
+    cache = ResponseCache(MemoryCacheBackend())
+    await cache.set('key', make_response(), ttl=0)
+    assert await cache.get('key') is None
+
+    with pytest.raises(ValidationError):
+        ProviderRequest(model='m', messages=[], cache_ttl=0)
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_lru():
+    """Test the memory backend evicts the least recently used entry."""
+    backend = MemoryCacheBackend(max_entries=2)
+    await backend.set('a', '1')
+    await backend.set('b', '2')
+    await backend.get('a')
+    await backend.set('c', '3')
+
+    assert await backend.get('a') == '1'
+    assert await backend.get('b') is None
+    assert await backend.get('c') == '3'
+
+
+@pytest.mark.asyncio
+async def test_backend_errors_are_misses():
+    """Test a failing backend does not break requests."""
+    class BrokenBackend(MemoryCacheBackend):
+        async def get(self, key):
+            raise ConnectionError('redis down')
+
+    cache = ResponseCache(BrokenBackend())
+    assert await cache.get('key') is None
+
+
+if __name__ == '__main__':
+    __import__('pytest').main([__file__, '-v'])
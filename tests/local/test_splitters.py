@@ -60,6 +60,25 @@ def test_activate_similarities(chunker, sample_similarities):
     assert len(result) == 3
 
 
+def test_similarity_bands_match_full_matrix(chunker):
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(40, 16)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+    bands = chunker._similarity_bands(embeddings, p_size=10)
+    assert bands.shape == (10, 40)
+
+    # reference: the original padded full-matrix diagonal sum
+    similarities = (embeddings @ embeddings.T).astype(np.float64)
+    n = similarities.shape[0]
+    weights = np.pad(1 / (1 + np.exp(0.5 * np.linspace(-10, 10, 10))), (0, n - 10))
+    diagonals = np.stack([np.pad(similarities.diagonal(k), (0, k)) for k in range(n)])
+    expected = np.sum(diagonals * weights.reshape(-1, 1), axis=0)
+
+    result = chunker._activate_bands(bands, p_size=10)
+    np.testing.assert_allclose(result, expected, rtol=1e-5, atol=1e-5)
+
+
 def test_split_text_long(chunker, sample_text_long):
     result = chunker.split_text(sample_text_long)
     assert isinstance(result, list)
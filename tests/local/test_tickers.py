@@ -0,0 +1,160 @@
+"""Local ticker resolution tests - no API required."""
+import asyncio
+import json
+import os
+import re
+from types import SimpleNamespace
+
+import pytest
+from lnlp.services.tickers import TickerCache, find_company_name, find_exchange_ticker, normalise_company
+from lnlp.services.tickers import parse_ticker_reply, same_company
+
+
+@pytest.fixture(scope='module')
+def spot_text(test_data_dir):
+    """Plain text of the SPOT transcript"""
+    with open(os.path.join(test_data_dir, 'transcripts', 'SPOT.html')) as f:
+        html = f.read()
+    return re.sub(r'\s+', ' ', re.sub(r'<[^>]+>', ' ', html)).strip()
+
+
+@pytest.mark.parametrize(('text', 'expected'), [
+    ('Spotify Technology S.A. (NYSE: SPOT) today reported', ('SPOT', 'Spotify Technology S.A.')),
+    ('Results call (NASDAQ:AAPL) transcript', ('AAPL', None)),
+    ('SPOT US Equity Q4 2024 Earnings Call', ('SPOT', None)),
+    ('Ticker: BRK.B', ('BRK.B', None)),
+    ('Good Morning And Welcome. Spotify Technology S.A. (NYSE: SPOT) Fourth Quarter 2024',
+     ('SPOT', 'Spotify Technology S.A.')),
+    ('No listing in this text at all.', (None, None)),
+])
+def test_find_exchange_ticker(text, expected):
+    """Test explicit listings in the header are recognised."""
+    assert find_exchange_ticker(text) == expected
+
+
+def test_find_company_name_in_spot_greeting(spot_text):
+    """Test the company is read from the operator's greeting in the SPOT transcript."""
+    assert find_company_name(spot_text) == 'Spotify'
+
+
+def test_find_company_name_in_title():
+    """Test a title line names the company, but a bare period does not."""
+    assert find_company_name('Acme Widgets Inc Q3 2024 Earnings Call') == 'Acme Widgets Inc'
+    assert find_company_name('Q4 2024 Earnings Call Company Participants') is None
+
+
+def test_normalise_company():
+    """Test name variants share one cache key."""
+    assert normalise_company("Spotify's") == 'spotify'
+    assert normalise_company('Apple Inc.') == normalise_company('apple') == 'apple'
+    assert normalise_company('Spotify Technology S.A.') == 'spotify technology'
+
+
+def test_parse_ticker_reply():
+    """Test JSON replies are parsed and prose replies fall back to the ticker heuristics."""
+    assert parse_ticker_reply('{"company_name": "Spotify", "ticker": "SPOT"}') == ('SPOT', 'Spotify')
+    assert parse_ticker_reply('Sure: {"company_name": "Apple Inc.", "ticker": "NASDAQ: AAPL"}') == ('AAPL', 'Apple Inc.')
+    assert parse_ticker_reply('The ticker is (MSFT).') == ('MSFT', None)
+    assert parse_ticker_reply('{"company_name": null, "ticker": null}') == (None, None)
+
+
+def test_same_company():
+    """Test only names of the same company are accepted as aliases."""
+    assert same_company('Spotify', 'Spotify Technology S.A.')
+    assert same_company("Spotify's", 'Spotify Technology')
+    assert not same_company('Our', 'Spotify Technology S.A.')
+    assert not same_company('Spot', 'Spotify Technology S.A.')
+    assert not same_company('Technology', 'Spotify Technology S.A.')
+
+
+@pytest.mark.asyncio
+async def test_ticker_cache_persists_and_merges(tmp_path):
+    """Test entries survive a reload and concurrent writers keep each other's entries."""
+    path = tmp_path / 'tickers.json'
+    first, second = TickerCache(path), TickerCache(path)
+
+    await asyncio.gather(first.set('SPOT', 'Spotify Technology S.A.', 'Spotify'), second.set('AAPL', 'Apple Inc.'))
+
+    reloaded = TickerCache(path)
+    assert reloaded.get("Spotify's") == ('SPOT', 'Spotify Technology S.A.')
+    assert reloaded.get('apple') == ('AAPL', 'Apple Inc.')
+    assert reloaded.by_ticker('SPOT') == 'Spotify Technology S.A.'
+    assert len(json.loads(path.read_text())) == 3
+
+
+@pytest.fixture
+def ticker_provider(monkeypatch):
+    """Provider with an in-memory ticker cache and a counted fake LLM"""
+    from lnlp.config import get_settings
+    from lnlp.services.provider import LLMProvider
+    monkeypatch.setenv('OPENROUTER_API_KEY', 'test-key')
+    monkeypatch.setenv('TICKER_CACHE_DISK', 'false')
+    get_settings.cache_clear()
+    provider = LLMProvider()
+    get_settings.cache_clear()
+
+    calls = []
+
+    async def latest(family):
+        return 'anthropic/claude-haiku-4.5'
+
+    async def model_info(model):
+        return {'supported_parameters': ['structured_outputs']}
+
+    async def create(params):
+        calls.append(params)
+        message = SimpleNamespace(content='{"company_name": "Spotify Technology S.A.", "ticker": "SPOT"}')
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    monkeypatch.setattr(provider, 'get_latest_model', latest)
+    monkeypatch.setattr(provider, '_get_model_info', model_info)
+    monkeypatch.setattr(provider, '_create_completion', create)
+    return provider, calls
+
+
+@pytest.mark.asyncio
+async def test_listing_needs_no_llm_call(ticker_provider):
+    """Test an explicit listing resolves without calling the model."""
+    provider, calls = ticker_provider
+    assert await provider.extract_ticker('Spotify Technology S.A. (NYSE: SPOT) Q4 call') == \
+        ('SPOT', 'Spotify Technology S.A.')
+    assert calls == []
+
+
+@pytest.mark.asyncio
+async def test_listing_after_greeting_keeps_company_name(ticker_provider, spot_text):
+    """Test the sentence before a listing does not leak into the company name or the cache."""
+    provider, calls = ticker_provider
+    text = f'Good Morning And Welcome. Spotify Technology S.A. (NYSE: SPOT) {spot_text}'
+
+    assert await provider.extract_ticker(text) == ('SPOT', 'Spotify Technology S.A.')
+    assert provider.ticker_cache.by_ticker('SPOT') == 'Spotify Technology S.A.'
+    assert calls == []
+
+
+@pytest.mark.asyncio
+async def test_llm_called_once_then_cached(ticker_provider, spot_text):
+    """Test one structured call resolves a new company and the next transcript hits the cache."""
+    provider, calls = ticker_provider
+
+    assert await provider.extract_ticker(spot_text) == ('SPOT', 'Spotify Technology S.A.')
+    assert len(calls) == 1
+    assert calls[0]['response_format']['type'] == 'json_schema'
+
+    assert await provider.extract_ticker(spot_text) == ('SPOT', 'Spotify Technology S.A.')
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_unrelated_greeting_name_not_cached(ticker_provider):
+    """Test a greeting match that is not the company does not become a cache alias."""
+    provider, calls = ticker_provider
+    text = 'Good morning, and welcome to Our Fourth Quarter 2024 Earnings Call.'
+
+    assert await provider.extract_ticker(text) == ('SPOT', 'Spotify Technology S.A.')
+    assert await provider.extract_ticker(text) == ('SPOT', 'Spotify Technology S.A.')
+    assert len(calls) == 2
+
+
+if __name__ == '__main__':
+    __import__('pytest').main([__file__, '-v'])
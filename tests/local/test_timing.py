@@ -0,0 +1,131 @@
+"""Local stage timing tests - no API required."""
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+from lnlp.utils import metrics, timing
+from lnlp.utils.metrics import MetricsService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """Fresh metrics service receiving stage timings, with timing enabled"""
+    service = MetricsService()
+    monkeypatch.setattr(metrics, 'metrics_service', service)
+    timing.set_enabled(True)
+    yield service
+    timing.set_enabled(True)
+
+
+def stage_counts(service):
+    return {name: h['count'] for name, h in service.get_metrics()['histograms'].items()}
+
+
+def test_span_outside_request_records_directly(service):
+    """Test a span with no request collector is recorded straight away."""
+    with timing.span('work'):
+        time.sleep(0.002)
+
+    histogram = service.get_metrics()['histograms']['stage_work']
+    assert histogram['count'] == 1
+    assert histogram['mean'] >= 0.002
+
+
+def test_collect_stages_sums_per_request(service):
+    """Test repeated spans in one request are summed and recorded once, including from threads."""
+    @timing.timed('decorated')
+    def work(value):
+        return value * 2
+
+    async def request():
+        with timing.collect_stages() as stages:
+            for _ in range(3):
+                with timing.span('loop'):
+                    pass
+            assert await asyncio.to_thread(work, 21) == 42
+            return dict(stages)
+
+    stages = asyncio.run(request())
+
+    assert set(stages) == {'loop', 'decorated'}
+    assert stage_counts(service) == {'stage_loop': 1, 'stage_decorated': 1}
+    assert work.__name__ == 'work'
+
+
+def test_disabled_timing_records_nothing(service):
+    """Test spans, decorators and collectors are no-ops when timing is off."""
+    timing.set_enabled(False)
+
+    @timing.timed('decorated')
+    def work():
+        return 'done'
+
+    with timing.collect_stages() as stages, timing.span('work'):
+        assert work() == 'done'
+
+    assert stages is None
+    assert timing.span('a') is timing.span('b')
+    assert stage_counts(service) == {}
+
+
+def test_server_timing_format():
+    """Test stage totals render as a Server-Timing header in milliseconds."""
+    assert timing.server_timing({'pdf_parse': 0.0125, 'pdf_format': 0.001}) == \
+        'pdf_parse;dur=12.500, pdf_format;dur=1.000'
+
+
+def test_pdf_extraction_stages(service, test_data_dir):
+    """Test PDF extraction reports each of its stages."""
+    from lnlp.services.pdf import PDFTextExtractor
+    extractor = PDFTextExtractor(os.path.join(test_data_dir, 'transcripts', 'SPOT.pdf'))
+
+    with timing.collect_stages() as stages:
+        extractor.extract_lines()
+        extractor.extract_html()
+
+    assert {'pdf_parse', 'pdf_vertical_positions', 'pdf_header_footer', 'pdf_line_grouping',
+            'pdf_format'} <= set(stages)
+
+
+@pytest.mark.asyncio
+async def test_middleware_returns_server_timing(service, monkeypatch):
+    """Test a request asking for stage timing gets a Server-Timing header."""
+    import httpx
+    from fastapi import FastAPI
+    from lnlp.api import app as app_module
+
+    monkeypatch.setattr(app_module, 'metrics_service', MetricsService())
+    app = FastAPI()
+    app.add_middleware(app_module.MetricsMiddleware)
+
+    @app.get('/work')
+    async def work():
+        await asyncio.to_thread(lambda: timing.span('threaded').__enter__().__exit__())
+        with timing.span('inline'):
+            pass
+        return {}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        plain = await client.get('/work')
+        timed = await client.get('/work', headers={'X-Stage-Timing': '1'})
+
+    assert 'server-timing' not in plain.headers
+    assert timed.headers['server-timing'].startswith('threaded;dur=')
+    assert 'inline;dur=' in timed.headers['server-timing']
+    assert stage_counts(service) == {'stage_threaded': 2, 'stage_inline': 2}
+
+
+
+def test_pdf_import_does_not_load_torch():
+    """Test PDF parsing workers can import the extractor without torch."""
+    code = 'import sys, lnlp.services.pdf; sys.exit("torch" in sys.modules)'
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(sys.path)}
+    assert subprocess.run([sys.executable, '-c', code], env=env, timeout=60).returncode == 0
+
+
+if __name__ == '__main__':
+    __import__('pytest').main([__file__, '-v'])
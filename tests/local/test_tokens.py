@@ -0,0 +1,71 @@
+"""Local token counting tests - no API required."""
+import pytest
+from lnlp.services import tokens
+from lnlp.services.tokens import TokenCounter, approximate_tokens
+
+TEXT = 'Spotify Technology S.A. reported 1,234 million euros in revenue for Q3 2024.'
+
+
+class WordEncoding:
+    """Stand-in tiktoken encoding with one token per whitespace-separated word"""
+
+    def encode(self, text, disallowed_special=()):
+        return text.split(' ')
+
+    def decode(self, tokens):
+        return ' '.join(tokens)
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    """Token counter with no tokenizer available"""
+    monkeypatch.setattr(tokens, '_load_encoding', lambda name: None)
+    return TokenCounter()
+
+
+@pytest.fixture
+def encoded(monkeypatch):
+    """Token counter backed by the word encoding"""
+    monkeypatch.setattr(tokens, '_load_encoding', lambda name: WordEncoding())
+    return TokenCounter()
+
+
+def test_approximation_tracks_words_not_characters():
+    """Test the fallback counts short words as single tokens."""
+    assert approximate_tokens('the cat sat on the mat') == 6
+    assert approximate_tokens('') == 0
+    assert approximate_tokens('a' * 60) == 10
+
+
+def test_fallback_used_without_tokenizer(offline):
+    """Test counts fall back to the approximation when tiktoken is unavailable."""
+    assert offline.count(TEXT, 'anthropic/claude-haiku-4.5') == approximate_tokens(TEXT)
+
+
+def test_vendor_correction_factor(encoded):
+    """Test Anthropic counts are scaled up from the proxy encoding and OpenAI counts are not."""
+    words = len(TEXT.split(' '))
+    assert encoded.count(TEXT, 'openai/gpt-4o') == words
+    assert encoded.count(TEXT, 'openrouter/anthropic/claude-haiku-4.5') > words
+
+
+def test_count_messages_includes_overhead(encoded):
+    """Test message formatting overhead is added per message."""
+    messages = [{'content': 'one two'}, {'content': 'three'}]
+    assert encoded.count_messages(messages, 'openai/gpt-4o') == 3 + 2 * tokens.MESSAGE_OVERHEAD + tokens.REPLY_OVERHEAD
+
+
+@pytest.mark.parametrize('counter', ['offline', 'encoded'])
+def test_truncate_respects_budget(counter, request):
+    """Test truncation keeps a prefix within the token budget."""
+    counter = request.getfixturevalue(counter)
+    model = 'anthropic/claude-haiku-4.5'
+    truncated = counter.truncate(TEXT * 20, 50, model)
+
+    assert TEXT.startswith(truncated[:len(TEXT)])
+    assert counter.count(truncated, model) <= 50
+    assert counter.truncate(TEXT, 1000, model) == TEXT
+
+
+if __name__ == '__main__':
+    __import__('pytest').main([__file__, '-v'])